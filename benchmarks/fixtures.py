@@ -0,0 +1,283 @@
+import os
+import random
+
+# fixture sizes, picked to match the largest hosts we run on
+CPU_SOCKETS = 2
+CPU_CORES_PER_SOCKET = 64
+CPU_THREADS_PER_CORE = 2
+DISK_COUNT = 500
+INTERFACE_COUNT = 5000
+DMESG_SIZE = 16 * 1024 * 1024
+USB_DEVICE_COUNT = 64
+PCI_DEVICE_COUNT = 256
+
+CPU_FLAGS = ('fpu vme de pse tsc msr pae mce cx8 apic sep mtrr pge mca cmov pat pse36 clflush mmx fxsr sse sse2 '
+             'ht syscall nx pdpe1gb rdtscp lm constant_tsc rep_good nopl xtopology nonstop_tsc cpuid '
+             'aperfmperf pni pclmulqdq monitor ssse3 fma cx16 sse4_1 sse4_2 x2apic movbe popcnt aes xsave '
+             'avx f16c rdrand lahf_lm cmp_legacy svm extapic cr8_legacy abm sse4a misalignsse 3dnowprefetch '
+             'osvw ibs skinit wdt tce topoext perfctr_core perfctr_nb bpext perfctr_llc mwaitx cpb cat_l3 '
+             'cdp_l3 hw_pstate ssbd mba ibrs ibpb stibp vmmcall fsgsbase bmi1 avx2 smep bmi2 erms invpcid '
+             'cqm rdt_a rdseed adx smap clflushopt clwb sha_ni xsaveopt xsavec xgetbv1 xsaves cqm_llc '
+             'cqm_occup_llc cqm_mbm_total cqm_mbm_local clzero irperf xsaveerptr rdpru wbnoinvd amd_ppin')
+
+# every file written by generate(), relative to the fixture root
+FIXTURE_FILES = ('proc/cpuinfo', 'proc/stat', 'proc/meminfo', 'proc/diskstats', 'proc/net/dev', 'proc/version',
+                 'etc/os-release', 'dev/kmsg', 'dmesg.txt', 'lsusb.txt', 'lspci.txt')
+
+# sysfs directories written by generate(), the probes scan them through the filesystem root
+FIXTURE_TREES = ('sys/bus/pci/devices', 'sys/bus/usb/devices', 'sys/block')
+
+
+def _cpuinfo():
+    blocks = []
+    processor = 0
+    for thread in range(CPU_THREADS_PER_CORE):
+        for socket in range(CPU_SOCKETS):
+            for core in range(CPU_CORES_PER_SOCKET):
+                blocks.append(
+                    f"processor\t: {processor}\n"
+                    "vendor_id\t: AuthenticAMD\n"
+                    "cpu family\t: 25\n"
+                    "model\t\t: 1\n"
+                    "model name\t: AMD EPYC 7763 64-Core Processor\n"
+                    "stepping\t: 1\n"
+                    "cpu MHz\t\t: 2450.000\n"
+                    "cache size\t: 512 KB\n"
+                    f"physical id\t: {socket}\n"
+                    f"siblings\t: {CPU_CORES_PER_SOCKET * CPU_THREADS_PER_CORE}\n"
+                    f"core id\t\t: {core}\n"
+                    f"cpu cores\t: {CPU_CORES_PER_SOCKET}\n"
+                    f"apicid\t\t: {socket * 256 + core * 2 + thread}\n"
+                    "fpu\t\t: yes\n"
+                    "cpuid level\t: 16\n"
+                    f"flags\t\t: {CPU_FLAGS}\n"
+                    "bogomips\t: 4900.00\n"
+                    "TLB size\t: 2560 4K pages\n"
+                    "clflush size\t: 64\n"
+                    "address sizes\t: 48 bits physical, 48 bits virtual\n"
+                    "power management: ts ttp tm hwpstate cpb eff_freq_ro [13] [14]\n")
+                processor += 1
+    return "\n".join(blocks) + "\n"
+
+
+def _stat(rng):
+    threads = CPU_SOCKETS * CPU_CORES_PER_SOCKET * CPU_THREADS_PER_CORE
+    lines = []
+    for cpu in range(threads):
+        counters = ' '.join(str(rng.randrange(10 ** 6, 10 ** 9)) for _ in range(10))
+        lines.append(f'cpu{cpu} {counters}')
+    total = ' '.join(str(rng.randrange(10 ** 9, 10 ** 11)) for _ in range(10))
+    return f'cpu  {total}\n' + "\n".join(lines) + "\nintr 1 2 3\nctxt 4\nbtime 5\nprocesses 6\n"
+
+
+def _meminfo(rng):
+    keys = ('MemTotal', 'MemFree', 'MemAvailable', 'Buffers', 'Cached', 'SwapCached', 'Active', 'Inactive',
+            'Active(anon)', 'Inactive(anon)', 'Active(file)', 'Inactive(file)', 'Unevictable', 'Mlocked',
+            'SwapTotal', 'SwapFree', 'Zswap', 'Zswapped', 'Dirty', 'Writeback', 'AnonPages', 'Mapped', 'Shmem',
+            'KReclaimable', 'Slab', 'SReclaimable', 'SUnreclaim', 'KernelStack', 'PageTables', 'SecPageTables',
+            'NFS_Unstable', 'Bounce', 'WritebackTmp', 'CommitLimit', 'Committed_AS', 'VmallocTotal',
+            'VmallocUsed', 'VmallocChunk', 'Percpu', 'HardwareCorrupted', 'AnonHugePages', 'ShmemHugePages',
+            'ShmemPmdMapped', 'FileHugePages', 'FilePmdMapped', 'Unaccepted', 'Hugetlb', 'DirectMap4k',
+            'DirectMap2M', 'DirectMap1G')
+    lines = [f'{key + ":":<16}{rng.randrange(0, 2 ** 31):>10} kB' for key in keys]
+    lines += ['HugePages_Total:       0', 'HugePages_Free:        0', 'Hugepagesize:       2048 kB']
+    return "\n".join(lines) + "\n"
+
+
+def _disk_names():
+    names = [f'nvme{index}n1' for index in range(32)]
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    index = 0
+    while len(names) < DISK_COUNT:
+        # sda..sdz, sdaa..sdzz like the kernel names them
+        name = letters[index] if index < 26 else letters[index // 26 - 1] + letters[index % 26]
+        names.append(f'sd{name}')
+        index += 1
+    return names
+
+
+def _diskstats(rng):
+    lines = []
+    for minor, name in enumerate(_disk_names()):
+        counters = ' '.join(str(rng.randrange(0, 10 ** 9)) for _ in range(17))
+        lines.append(f'{8:4d} {minor:7d} {name} {counters}')
+    return "\n".join(lines) + "\n"
+
+
+def _net_dev(rng):
+    lines = ['Inter-|   Receive                                                |  Transmit',
+             ' face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed',
+             '    lo: 25796025    2628    0    0    0     0          0         0 25796025    2628    0    0    0     0       0          0']
+    for index in range(INTERFACE_COUNT):
+        name = 'eth0' if index == 0 else f'veth{index:05x}'
+        counters = ' '.join(str(rng.randrange(0, 10 ** 12)) for _ in range(16))
+        lines.append(f'{name:>14}: {counters}')
+    return "\n".join(lines) + "\n"
+
+
+def _dmesg(rng):
+    messages = ('EXT4-fs (nvme0n1p2): re-mounted. Quota mode: none.',
+                'audit: type=1400 audit(1700000000.000:123): apparmor="STATUS" operation="profile_load"',
+                'IPv6: ADDRCONF(NETDEV_CHANGE): veth1a2b3c: link becomes ready',
+                'br0: port 2(veth1a2b3c) entered forwarding state',
+                'nvme nvme0: 32/0/0 default/read/poll queues')
+    hotplug = ('usb 3-2: new full-speed USB device number 5 using xhci_hcd',
+               'usb 3-2: USB disconnect, device number 5')
+
+    lines = []
+    size = 0
+    timestamp = 0.0
+    while size < DMESG_SIZE:
+        timestamp += rng.random()
+        message = rng.choice(hotplug) if rng.random() < 0.001 else rng.choice(messages)
+        line = f'[{timestamp:12.6f}] {message}'
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def _kmsg(rng):
+    """
+    the kernel log as a snapshot stores it: one "<prefix>,<sequence>,<timestamp_us>,<flags>;<message>" record per line,
+    device dictionary lines of a record start with a space
+    """
+    messages = ('EXT4-fs (nvme0n1p2): re-mounted. Quota mode: none.',
+                'audit: type=1400 audit(1700000000.000:123): apparmor="STATUS" operation="profile_load"',
+                'IPv6: ADDRCONF(NETDEV_CHANGE): veth1a2b3c: link becomes ready',
+                'br0: port 2(veth1a2b3c) entered forwarding state',
+                'nvme nvme0: 32/0/0 default/read/poll queues')
+    hotplug = ('usb 3-2: new full-speed USB device number 5 using xhci_hcd',
+               'usb 3-2: USB disconnect, device number 5')
+
+    records = []
+    size = 0
+    timestamp_us = 0
+    sequence = 0
+    while size < DMESG_SIZE:
+        timestamp_us += rng.randrange(1, 1000000)
+        if rng.random() < 0.001:
+            record = f'6,{sequence},{timestamp_us},-;{rng.choice(hotplug)}\n SUBSYSTEM=usb\n DEVICE=c189:260\n'
+        else:
+            record = f'6,{sequence},{timestamp_us},-;{rng.choice(messages)}\n'
+        records.append(record)
+        size += len(record)
+        sequence += 1
+    return ''.join(records)
+
+
+def _pci_devices():
+    """
+    {relative path: content} of /sys/bus/pci/devices, one GPU every 64 devices like the lspci fixture
+    """
+    files = {}
+    for index in range(PCI_DEVICE_COUNT):
+        base = f'sys/bus/pci/devices/0000:{index // 32:02x}:{index % 32:02x}.0'
+        if index % 64 == 1:
+            attributes = {'class': '0x030000', 'vendor': '0x10de', 'device': '0x2235', 'revision': '0xa1'}
+        else:
+            attributes = {'class': '0x020000', 'vendor': '0x15b3', 'device': '0x101d', 'revision': '0x00'}
+        for name, value in attributes.items():
+            files[f'{base}/{name}'] = value + '\n'
+    return files
+
+
+def _usb_devices():
+    """
+    {relative path: content} of /sys/bus/usb/devices, every device has one interface entry,
+    every fourth one has no string descriptors and is named from usb.ids
+    """
+    files = {}
+    for index in range(USB_DEVICE_COUNT):
+        bus, port = index // 8 + 1, index % 8 + 1
+        base = f'sys/bus/usb/devices/{bus}-{port}'
+        attributes = {'idVendor': '046d', 'idProduct': 'c52b', 'speed': '12', 'busnum': str(bus), 'devnum': str(port + 1)}
+        if index % 4:
+            attributes.update({'manufacturer': 'Logitech', 'product': 'USB Receiver'})
+        for name, value in attributes.items():
+            files[f'{base}/{name}'] = value + '\n'
+        files[f'{base}:1.0/bInterfaceClass'] = '03\n'
+    return files
+
+
+def _block_devices():
+    """
+    {relative path: content} of /sys/block, the disks of the diskstats fixture plus loop devices the probe skips
+    """
+    files = {}
+    for name in _disk_names():
+        base = f'sys/block/{name}'
+        files[f'{base}/size'] = '7501476528\n'
+        files[f'{base}/queue/rotational'] = '0\n' if name.startswith('nvme') else '1\n'
+        files[f'{base}/device/model'] = 'SAMSUNG MZQL23T8HCLS-00A07\n'
+    for index in range(8):
+        files[f'sys/block/loop{index}/size'] = '0\n'
+    return files
+
+
+def _lsusb():
+    lines = []
+    for index in range(USB_DEVICE_COUNT):
+        lines.append(f'Bus {index // 8 + 1:03d} Device {index % 8 + 1:03d}: ID 046d:c52b Logitech, Inc. Unifying Receiver')
+    return "\n".join(lines) + "\n"
+
+
+def _lspci():
+    lines = []
+    for index in range(PCI_DEVICE_COUNT):
+        slot = f'{index // 32:02x}:{index % 32:02x}.0'
+        if index % 64 == 1:
+            lines.append(f'{slot} VGA compatible controller: NVIDIA Corporation GA102GL [A40] (rev a1)')
+        else:
+            lines.append(f'{slot} Ethernet controller: Mellanox Technologies MT2892 Family [ConnectX-6 Dx]')
+    return "\n".join(lines) + "\n"
+
+
+def generate(root, seed=0):
+    """
+    writes a synthetic fixture tree under root (laid out like /proc, /sys, /dev and /etc)
+    the same seed always produces the same files, so results stay comparable across commits
+    """
+    rng = random.Random(seed)
+    contents = {
+        'proc/cpuinfo': _cpuinfo(),
+        'proc/stat': _stat(rng),
+        'proc/meminfo': _meminfo(rng),
+        'proc/diskstats': _diskstats(rng),
+        'proc/net/dev': _net_dev(rng),
+        'proc/version': 'Linux version 6.8.0-45-generic (buildd@lcy02-amd64-075) (gcc 13.2.0) '
+                        '#45-Ubuntu SMP PREEMPT_DYNAMIC Fri Aug 30 12:02:04 UTC 2024\n',
+        'etc/os-release': 'NAME="Ubuntu"\nVERSION_ID="24.04"\nPRETTY_NAME="Ubuntu 24.04.1 LTS"\nID=ubuntu\n',
+        'dmesg.txt': _dmesg(rng),
+        'lsusb.txt': _lsusb(),
+        'lspci.txt': _lspci()
+    }
+    # generated after the older fixtures so their content doesn't change with the seed
+    contents['dev/kmsg'] = _kmsg(rng)
+    contents.update(_pci_devices())
+    contents.update(_usb_devices())
+    contents.update(_block_devices())
+
+    for name, content in contents.items():
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+
+def load(root):
+    """
+    returns {relative path: content} of every fixture file present under root,
+    sysfs directories are listed with their absolute path instead of a content
+    a captured tree only needs the files of the benchmarks that should run
+    """
+    fixtures = {}
+    for name in FIXTURE_FILES:
+        path = os.path.join(root, name)
+        if os.path.exists(path):
+            with open(path) as f:
+                fixtures[name] = f.read()
+    for name in FIXTURE_TREES:
+        path = os.path.join(root, name)
+        if os.path.isdir(path):
+            fixtures[name] = os.path.abspath(path)
+    return fixtures
@@ -0,0 +1,349 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import fixtures as fixture_tree
+from src.core.kmsg import is_hotplug_event, parse_record, split_records
+from src.core.utils import set_root
+from src.probes.cpu import CpuProbe, CpuTimes
+from src.probes.disk import DiskProbe, DiskStats
+from src.probes.gpu import GpuProbe
+from src.probes.memory import MemoryProbe, parse_meminfo
+from src.probes.network import NetworkProbe, NetDevStats
+from src.probes.os_probe import OsProbe
+from src.probes.usb import UsbProbe
+
+
+# every benchmark: (name, fixture files it needs, setup)
+# setup receives {fixture: content} and returns the zero argument callable that is timed
+# sysfs scanners and the kernel log reader run on the fixture tree, set as the filesystem root by main()
+def _cpu_parse(fixtures):
+    probe = CpuProbe()
+    lines = fixtures['proc/cpuinfo'].split("\n")
+    return lambda: probe._parse_cpu_data(lines)
+
+
+def _cpu_parse_full_topology(fixtures):
+    probe = CpuProbe(full_topology=True)
+    lines = fixtures['proc/cpuinfo'].split("\n")
+    return lambda: probe._parse_cpu_data(lines)
+
+
+def _cpu_utilization(fixtures):
+    probe = CpuProbe()
+    content = fixtures['proc/stat']
+
+    def run():
+        # the same snapshot twice costs the same as two real ones, only the deltas are zero
+        before = CpuTimes.parse(content, taken_at=0.0)
+        after = CpuTimes.parse(content, taken_at=1.0)
+        return probe._compute_utilization(before, after)
+    return run
+
+
+def _memory_parse(fixtures):
+    probe = MemoryProbe()
+    content = fixtures['proc/meminfo']
+    return lambda: probe._parse_memory_data(content)
+
+
+def _memory_parse_raw(fixtures):
+    content = fixtures['proc/meminfo']
+    return lambda: parse_meminfo(content)
+
+
+def _disk_io(fixtures):
+    probe = DiskProbe()
+    content = fixtures['proc/diskstats']
+
+    def run():
+        before = DiskStats.parse(content, taken_at=0.0)
+        after = DiskStats.parse(content, taken_at=1.0)
+        return probe._compute_io(before, after)
+    return run
+
+
+def _disk_columns(fixtures):
+    probe = DiskProbe()
+    names = sorted(os.listdir(fixtures['sys/block']))
+    return lambda: probe.collect_columns(names).to_dict()
+
+
+def _disk_scan(fixtures):
+    # listing, filtering and the attribute sweep of every block device
+    probe = DiskProbe()
+    return probe.run_probe
+
+
+def _network_rates(fixtures):
+    probe = NetworkProbe()
+    content = fixtures['proc/net/dev']
+
+    def run():
+        before = NetDevStats.parse(content, taken_at=0.0)
+        after = NetDevStats.parse(content, taken_at=1.0)
+        return probe._compute_rates(before, after)
+    return run
+
+
+def _network_filter(fixtures):
+    probe = NetworkProbe(include=['eth*', 'veth0*'], exclude=['veth00*'])
+    names = NetDevStats.parse(fixtures['proc/net/dev']).names
+    return lambda: [name for name in names if probe._is_selected(name)]
+
+
+def _usb_kmsg(fixtures):
+    # hotplug search over the whole kernel log, replayed from dev/kmsg like a snapshot
+    probe = UsbProbe()
+
+    status = probe.get_hotplug_events()['status']
+    if status != 'Active':
+        raise RuntimeError(f'usb.kmsg did not read the fixture (status: {status})')
+    return probe.get_hotplug_events
+
+
+def _kmsg_parse(fixtures):
+    # record parsing alone, the per record cost of streaming /dev/kmsg
+    raws = list(split_records(fixtures['dev/kmsg'].splitlines(keepends=True)))
+    return lambda: [record for record in map(parse_record, raws) if is_hotplug_event(record.message)]
+
+
+def _usb_dmesg(fixtures):
+    # fallback when /dev/kmsg can't be read
+    probe = UsbProbe()
+    content = fixtures['dmesg.txt']
+
+    def run():
+        with patch('src.probes.usb.iter_command_lines', return_value=iter(content.split("\n"))):
+            return probe._get_dmesg_hotplug_events()
+
+    # a patch that misses the probe runs the host's dmesg instead of the fixture
+    status = run()['status']
+    if status != 'Active':
+        raise RuntimeError(f'usb.dmesg_fallback did not parse the fixture (status: {status})')
+    return run
+
+
+def _dmesg_scan(fixtures):
+    # full pass over the buffer, the cost of a hotplug search with no recent events
+    content = fixtures['dmesg.txt']
+    return lambda: [line for line in content.split("\n") if is_hotplug_event(line)]
+
+
+def _usb_scan(fixtures):
+    probe = UsbProbe()
+    return probe._scan_sysfs
+
+
+def _usb_parse(fixtures):
+    # lsusb fallback, used without sysfs
+    probe = UsbProbe()
+    content = fixtures['lsusb.txt']
+    return lambda: probe._parse_usb_data(content)
+
+
+def _gpu_scan(fixtures):
+    probe = GpuProbe()
+    return probe._scan_sysfs
+
+
+def _gpu_parse(fixtures):
+    # lspci fallback, used without sysfs
+    probe = GpuProbe()
+    content = fixtures['lspci.txt']
+    return lambda: probe._parse_gpu_data(content)
+
+
+def _os_parse(fixtures):
+    probe = OsProbe()
+    kernel, distro = fixtures['proc/version'], fixtures['etc/os-release']
+    return lambda: (probe._parse_kernel_data(kernel), probe._parse_distro_data(distro))
+
+
+BENCHMARKS = (
+    ('cpu.parse', ('proc/cpuinfo',), _cpu_parse),
+    ('cpu.parse_full_topology', ('proc/cpuinfo',), _cpu_parse_full_topology),
+    ('cpu.utilization', ('proc/stat',), _cpu_utilization),
+    ('memory.parse', ('proc/meminfo',), _memory_parse),
+    ('memory.parse_raw', ('proc/meminfo',), _memory_parse_raw),
+    ('disk.io', ('proc/diskstats',), _disk_io),
+    ('disk.columns', ('sys/block',), _disk_columns),
+    ('disk.scan', ('sys/block',), _disk_scan),
+    ('network.rates', ('proc/net/dev',), _network_rates),
+    ('network.filter', ('proc/net/dev',), _network_filter),
+    ('usb.kmsg', ('dev/kmsg',), _usb_kmsg),
+    ('usb.kmsg_parse', ('dev/kmsg',), _kmsg_parse),
+    ('usb.dmesg_fallback', ('dmesg.txt',), _usb_dmesg),
+    ('usb.dmesg_scan', ('dmesg.txt',), _dmesg_scan),
+    ('usb.scan', ('sys/bus/usb/devices',), _usb_scan),
+    ('usb.parse_lsusb', ('lsusb.txt',), _usb_parse),
+    ('gpu.scan', ('sys/bus/pci/devices',), _gpu_scan),
+    ('gpu.parse_lspci', ('lspci.txt',), _gpu_parse),
+    ('os.parse', ('proc/version', 'etc/os-release'), _os_parse)
+)
+
+
+def _percentile(sorted_values, percent):
+    """
+    nearest-rank percentile
+    """
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def measure(func, iterations, warmup=1):
+    """
+    returns latency percentiles in ms and the memory cost of one call
+    the tracemalloc pass runs separately, tracing slows the timed calls down
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - started) / 1e6)
+    samples.sort()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # blocks still alive after the call belong to the returned result
+    retained = [stat for stat in after.compare_to(before, 'filename') if stat.count_diff > 0]
+    del result
+
+    return {
+        'iterations': iterations,
+        'min_ms': round(samples[0], 4),
+        'p50_ms': round(_percentile(samples, 50), 4),
+        'p90_ms': round(_percentile(samples, 90), 4),
+        'p99_ms': round(_percentile(samples, 99), 4),
+        'max_ms': round(samples[-1], 4),
+        'peak_bytes': peak,
+        'retained_blocks': sum(stat.count_diff for stat in retained),
+        'retained_bytes': sum(stat.size_diff for stat in retained)
+    }
+
+
+def _git_commit():
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return output.stdout.strip() if output.returncode == 0 else None
+    except OSError:
+        return None
+
+
+def run_benchmarks(fixtures, iterations, only=None):
+    results = {}
+    for name, required, setup in BENCHMARKS:
+        if only and not any(name.startswith(prefix) for prefix in only): continue
+        missing = [fixture for fixture in required if fixture not in fixtures]
+        if missing:
+            results[name] = {'skipped': f"missing fixtures: {', '.join(missing)}"}
+            continue
+        results[name] = measure(setup(fixtures), iterations)
+    return results
+
+
+def compare(baseline, results, threshold):
+    """
+    prints the p50 change of every benchmark against a previous run
+    returns the names slower than `threshold` percent
+    """
+    regressions = []
+    print(f"{'benchmark':<26}{'base p50':>12}{'p50':>12}{'change':>10}")
+    for name, result in results.items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if not base or 'p50_ms' not in base or 'p50_ms' not in result: continue
+
+        change = (result['p50_ms'] - base['p50_ms']) * 100 / base['p50_ms'] if base['p50_ms'] else 0.0
+        print(f"{name:<26}{base['p50_ms']:>12.4f}{result['p50_ms']:>12.4f}{change:>9.1f}%")
+        if threshold is not None and change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PySysCheck probe benchmarks')
+    parser.add_argument('--fixtures', metavar='DIR', default=None,
+                        help="Fixture tree to replay, generated there if empty (default: a temporary directory)")
+    parser.add_argument('--iterations', '-n', type=int, default=20,
+                        help="Timed calls per benchmark (default: 20)")
+    parser.add_argument('--only', action='append', default=None, metavar='PREFIX',
+                        help="Only run benchmarks whose name starts with PREFIX, e.g. 'disk' (repeatable)")
+    parser.add_argument('--output', '-o', default=None,
+                        help="Write the results as JSON to this file")
+    parser.add_argument('--compare', metavar='FILE', default=None,
+                        help="Previous results file to compare p50 latencies against")
+    parser.add_argument('--threshold', type=float, default=None, metavar='PERCENT',
+                        help="With --compare, exit with status 1 if a benchmark got slower by more than PERCENT")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.fixtures or tmp
+        if not os.path.exists(os.path.join(root, 'proc')):
+            print(f'[*] Generating fixtures in {root}...', file=sys.stderr)
+            fixture_tree.generate(root)
+        fixtures = fixture_tree.load(root)
+
+        # the sysfs trees and dev/kmsg are read through the probes' own file access
+        set_root(root)
+        try:
+            results = run_benchmarks(fixtures, args.iterations, args.only)
+        finally:
+            set_root(None)
+
+    print(f"{'benchmark':<26}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'peak KB':>10}{'blocks':>9}")
+    for name, result in results.items():
+        if 'skipped' in result:
+            print(f"{name:<26}  skipped ({result['skipped']})")
+            continue
+        print(f"{name:<26}{result['p50_ms']:>10.3f}{result['p90_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+              f"{result['peak_bytes'] / 1024:>10.1f}{result['retained_blocks']:>9}")
+
+    report = {
+        'meta': {
+            'timestamp': str(datetime.datetime.now()),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': args.iterations
+        },
+        'benchmarks': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f'[*] Results saved: {args.output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        if regressions:
+            print(f"[!] Slower than {args.threshold}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,28 @@
+import time
+_import_started = time.perf_counter()
+
 import argparse
+import contextlib
 import json
 import datetime
+import os
 import sys
 
+# everything else (thread pool, cache, sampler, writers, snapshots) is imported by the mode that needs it
+from src.core import perf
+from src.core.utils import (enable_handle_cache, disable_handle_cache, set_root, start_recording,
+                            stop_recording)
+from src.probes.registry import PROBE_MODULES, ProbeRegistry
+
+# import time of this module, reported by --startup-profile
+IMPORT_MS = round((time.perf_counter() - _import_started) * 1000, 3)
 
-from src.probes.cpu import CpuProbe
-from src.probes.memory import MemoryProbe
-from src.probes.disk import DiskProbe
-from src.probes.network import NetworkProbe
-from src.probes.usb import UsbProbe
-from src.probes.gpu import GpuProbe
-from src.probes.os_probe import OsProbe
 
 class PySysCheck:
-    def __init__(self):
+    def __init__(self, jobs=1, timeout=None, cache=None, hotplug_state=None, sample_interval=None,
+                 full_topology=False, iface_include=None, iface_exclude=None, net_backend='sysfs',
+                 raw_memory=False, top=10, cgroup_depth=2, cgroup_filter=None, startup_profile=False,
+                 profile=False):
         # init the initial json data
         self.report = {
             'timestamp': str(datetime.datetime.now()),
@@ -21,16 +30,32 @@ class PySysCheck:
             'device_info': {}
         }
 
-        # probes map
-        self.probes = {
-            'cpu': CpuProbe(),
-            'memory': MemoryProbe(),
-            'disk': DiskProbe(),
-            'network': NetworkProbe(),
-            'usb': UsbProbe(),
-            'gpu': GpuProbe(),
-            'os': OsProbe()
-        }
+        # probes map, a probe is imported and constructed only when it is selected
+        self.probes = ProbeRegistry({
+            'cpu': {'sample_interval': sample_interval, 'full_topology': full_topology},
+            'memory': {'raw': raw_memory},
+            'disk': {'sample_interval': sample_interval},
+            'network': {'sample_interval': sample_interval, 'include': iface_include, 'exclude': iface_exclude,
+                        'backend': net_backend},
+            'usb': {'hotplug_state': hotplug_state},
+            'process': {'top': top, 'sample_interval': sample_interval},
+            'cgroup': {'max_depth': cgroup_depth, 'path_filter': cgroup_filter}
+        })
+        # report per probe import and construction time
+        self.startup_profile = startup_profile
+        # report per probe timing, file read and subprocess counters under "_perf"
+        self.profile = profile
+
+        # execution settings
+        # jobs: number of probes allowed to run at the same time
+        # timeout: per probe wall-clock deadline in seconds (None = no deadline)
+        self.jobs = max(1, jobs)
+        self.timeout = timeout
+        # {name: thread} of the last run of every probe started on a thread
+        self._in_flight = {}
+
+        # optional StaticCache serving probes that define a cache_ttl
+        self.cache = cache
 
     def perform_health_checks(self):
         """
@@ -58,7 +83,8 @@ class PySysCheck:
         usb_list = dev_info.get('usb', [])
         
         # error handling
-        has_usb_devices = usb_list and isinstance(usb_list, list) and 'error' not in str(usb_list[0]).lower()
+        # device records are dicts, error entries carry an 'error' key
+        has_usb_devices = usb_list and isinstance(usb_list, list) and 'error' not in usb_list[0]
 
         if has_usb_devices or is_hotplug_active:
             checks['usb_subsystem_active'] = 'PASS'
@@ -87,31 +113,272 @@ class PySysCheck:
         
         self.report['test_results'] = checks
 
-    def run_check(self, check_type='all'):
+    def _run_probe(self, name):
+        """
+        runs a single probe, converting unexpected exceptions into an error entry
+        """
+        if perf.collector is not None:
+            with perf.probe_scope(name):
+                return self._run_probe_unprofiled(name)
+        return self._run_probe_unprofiled(name)
+
+    def _run_probe_unprofiled(self, name):
+        try:
+            probe = self.probes[name]
+            if self.cache is None or probe.cache_ttl is None:
+                return probe.run_probe()
+
+            # static part comes from cache when possible, volatile part is always measured
+            key = probe.cache_key(name)
+            static_data = self.cache.get(key, probe.cache_ttl)
+            if static_data is None:
+                static_data = probe.run_static()
+                self.cache.put(key, static_data)
+            return probe.run_volatile(static_data)
+
+        except Exception as e:
+            return {'error': str(e)}
+
+    def _timeout_entry(self):
+        """
+        structured entry stored for probes that missed their deadline
+        """
+        return {'error': f'Probe timed out after {self.timeout}s', 'timed_out': True, 'timeout': self.timeout}
+
+    def _stalled_entry(self):
+        """
+        structured entry stored for probes still running from a previous run that timed out
+        """
+        entry = self._timeout_entry()
+        entry['error'] = 'Probe is still running from a previous run that timed out'
+        entry['stalled'] = True
+        return entry
+
+    def _run_parallel(self, names, on_result=None):
+        """
+        runs the given probes on daemon threads, at most `jobs` at a time
+        each probe gets its own deadline counted from the moment it starts,
+        probes missing it are reported as timed out instead of blocking the report
+        a timed out probe is abandoned: its thread doesn't keep the process alive,
+        and it is not started again (watch mode) until that thread has finished
+        on_result(name, data) is called as soon as each probe finishes or times out
+        """
+        import queue
+        import threading
+
+        results = {}
+        finished = queue.Queue()
+        # {name: start time} of the probes started by this call and not reported yet
+        running = {}
+
+        def report(name, data):
+            results[name] = data
+            if on_result: on_result(name, data)
+
+        def task(name):
+            finished.put((name, self._run_probe(name)))
+
+        waiting = []
+        for name in names:
+            thread = self._in_flight.get(name)
+            if thread is not None and thread.is_alive():
+                report(name, self._stalled_entry())
+            else:
+                waiting.append(name)
+
+        while waiting or running:
+            while waiting and len(running) < self.jobs:
+                name = waiting.pop(0)
+                thread = threading.Thread(target=task, args=(name,), name=f'probe-{name}', daemon=True)
+                self._in_flight[name] = thread
+                running[name] = time.monotonic()
+                thread.start()
+
+            wait_for = None
+            if self.timeout is not None:
+                now = time.monotonic()
+
+                # expire running probes that passed their deadline, their slot goes to the next probe
+                for name, started in list(running.items()):
+                    if now - started >= self.timeout:
+                        del running[name]
+                        report(name, self._timeout_entry())
+                if not running: continue
+
+                # sleep until the closest deadline
+                wait_for = max(min(running.values()) + self.timeout - now, 0)
+
+            try:
+                name, data = finished.get(timeout=wait_for)
+            except queue.Empty:
+                continue
+
+            # results of probes that already timed out are discarded
+            if name in running:
+                del running[name]
+                report(name, data)
+
+        return results
+
+    def _collect(self, names, on_result=None):
+        """
+        runs the given probes and returns {name: data}
+        """
+        # thread pool is only needed for concurrency or deadlines
+        if self.jobs > 1 or self.timeout is not None:
+            return self._run_parallel(names, on_result)
+
+        results = {}
+        for name in names:
+            results[name] = self._run_probe(name)
+            if on_result: on_result(name, results[name])
+        return results
+
+    def _load_probes(self, names):
+        """
+        imports and constructs the selected probes up front, on the main thread,
+        so import time is not counted against the probe deadlines
+        """
+        for name in names:
+            self.probes[name]
+
+        if self.startup_profile and isinstance(self.probes, ProbeRegistry):
+            timings = {name: self.probes.timings[name] for name in names if name in self.probes.timings}
+            probes_ms = sum(t['import_ms'] + t['construct_ms'] for t in timings.values())
+            self.report['startup'] = {
+                'orchestrator_import_ms': IMPORT_MS,
+                'probes': timings,
+                'total_ms': round(IMPORT_MS + probes_ms, 3)
+            }
+            print(f"[*] Startup orchestrator: import {IMPORT_MS} ms")
+            for name, timing in timings.items():
+                print(f"[*] Startup {name}: import {timing['import_ms']} ms, construct {timing['construct_ms']} ms")
+
+    def run_check(self, check_type='all', writer=None):
         """
         executes selected probes
+        with a writer (ndjson) every probe result is written as its own line as soon as it completes
         """
         if check_type == 'all':
             print("[*] Running all checks...")
-            for name, probe in self.probes.items():
-                try:
-                    self.report['device_info'][name] = probe.run_probe()
-                except Exception as e:
-                    self.report['device_info'][name] = {'error': str(e)}
+            names = list(self.probes)
 
         elif check_type in self.probes:
             print(f"[*] Running {check_type.upper()} check...")
-            try:
-                self.report['device_info'][check_type] = self.probes[check_type].run_probe()
-            except Exception as e:
-                self.report['device_info'][check_type] = {'error': str(e)}
+            names = [check_type]
         else:
             print(f"[!] Unknown check type: {check_type}")
+            names = []
+
+        self._load_probes(names)
+
+        if self.profile:
+            perf.enable()
+            started = time.perf_counter()
+
+        on_result = None
+        if writer is not None:
+            writer.write({'type': 'report', 'report_name': self.report['report_name'], 'timestamp': self.report['timestamp']})
+            if 'startup' in self.report:
+                writer.write({'type': 'startup', 'data': self.report['startup']})
+
+            def on_result(name, data):
+                writer.write({'type': 'probe', 'probe': name, 'timestamp': str(datetime.datetime.now()), 'data': data})
+
+        if names:
+            results = self._collect(names, on_result)
+
+            # keep the report in probe order regardless of completion order
+            for name in names:
+                self.report['device_info'][name] = results[name]
+
+        if self.cache is not None:
+            self.cache.save()
+            self.report['cache'] = self.cache.stats()
+            print(f"[*] Static cache: {self.report['cache']['hits']} hits, {self.report['cache']['misses']} misses")
+            if writer is not None:
+                writer.write({'type': 'cache', 'data': self.report['cache']})
 
         
         if check_type == 'all':
             print('[*] Performing health analysis...')
-            self.perform_health_checks()
+            # the health analysis re-reads the kernel log, count it separately from the probes
+            with perf.probe_scope('health_checks') if self.profile else contextlib.nullcontext():
+                self.perform_health_checks()
+            if writer is not None:
+                writer.write({'type': 'test_results', 'data': self.report['test_results']})
+
+        if self.profile:
+            self.report['_perf'] = {
+                'total_ms': round((time.perf_counter() - started) * 1000, 3),
+                'probes': perf.disable().to_dict()
+            }
+            if writer is not None:
+                writer.write({'type': '_perf', 'data': self.report['_perf']})
+
+    def watch(self, interval, check_type='all', history=60, count=None, series=None, writer=None):
+        """
+        keeps the probes alive and re-samples them every `interval` seconds
+        every sample is printed (or written to `writer`) as a single JSON line as soon as it is taken
+        with a time-series writer the numeric metrics of every tick are appended to it instead,
+        and only the first tick is kept in the JSON report as the inventory
+        """
+        if check_type == 'all':
+            names = list(self.probes)
+        elif check_type in self.probes:
+            names = [check_type]
+        else:
+            print(f"[!] Unknown check type: {check_type}")
+            return None
+
+        from src.core.sampler import Sampler
+        from src.core.timeseries import flatten_metrics
+
+        self._load_probes(names)
+
+        def emit(sample):
+            if writer is not None:
+                writer.write(sample)
+            else:
+                print(json.dumps(sample), flush=True)
+
+        def collect(names, on_result=None):
+            results = self._collect(names, on_result)
+            if not self.report['device_info']:
+                self.report['device_info'] = dict(results)
+            dropped = series.append(time.time(), flatten_metrics(results))
+            if dropped:
+                # the field list of a file is fixed, devices and cgroups appearing later can't be stored
+                shown = ', '.join(dropped[:5]) + (', ...' if len(dropped) > 5 else '')
+                print(f'[!] {len(dropped)} new fields are not in {series.path} and are dropped: {shown}')
+            return results
+
+        # hot /proc and /sys files are re-read every tick, keep their descriptors open
+        enable_handle_cache()
+
+        if series is None:
+            sampler = Sampler(names, self._collect, interval, history=history, emit=emit)
+        else:
+            sampler = Sampler(names, collect, interval, history=history)
+        try:
+            sampler.run(count)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            disable_handle_cache()
+            if self.cache is not None:
+                self.cache.save()
+        return sampler
+
+    def close(self):
+        """
+        releases what probes keep open between runs (the netlink socket of the network probe)
+        """
+        names = self.probes.loaded() if isinstance(self.probes, ProbeRegistry) else list(self.probes)
+        for name in names:
+            close = getattr(self.probes[name], 'close', None)
+            if close is not None:
+                close()
 
     def save_report(self, filename):
         """
@@ -131,38 +398,279 @@ class PySysCheck:
         print(json.dumps(self.report, indent=4))
 
 
+def save_snapshot(path):
+    """
+    writes the files recorded since start_recording() into a snapshot archive
+    """
+    from src.core.snapshot import write_snapshot
+
+    try:
+        count = write_snapshot(path, stop_recording())
+        print(f'[*] Snapshot saved: {path} ({count} files)')
+    except Exception as e:
+        print(f'[!] Error saving snapshot: {e}')
+
+
+def aggregate_main(argv):
+    """
+    pysyscheck.py aggregate: summarizes the reports collected from a fleet, and diffs two collection rounds
+    """
+    # imported here, a single host run never needs multiprocessing
+    from src.core.aggregate import SAMPLE_LIMIT, aggregate
+
+    parser = argparse.ArgumentParser(prog='pysyscheck.py aggregate',
+                                     description='PySysCheck: summarize and diff a directory of reports')
+    parser.add_argument('directory',
+                        help='Directory of JSON/NDJSON reports, searched recursively')
+    parser.add_argument('--previous', metavar='DIR', default=None,
+                        help='Reports of the previous round, diff the inventory against them')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Report parsing processes (default: CPU count, 1 = parse in this process)')
+    parser.add_argument('--samples', type=int, default=SAMPLE_LIMIT,
+                        help=f'Changes and hosts listed by name in the diff (default: {SAMPLE_LIMIT})')
+    parser.add_argument('--output', '-o', default=None,
+                        help='Output filename (default: aggregate_<timestamp>.json)')
+    parser.add_argument('--no-file', action='store_true',
+                        help='Print the result to console instead of saving')
+    args = parser.parse_args(argv)
+
+    for directory in (args.directory, args.previous):
+        if directory is not None and not os.path.isdir(directory):
+            parser.error(f'not a directory: {directory}')
+
+    # with --no-file the result goes to stdout, status messages go to stderr
+    with contextlib.redirect_stdout(sys.stderr) if args.no_file else contextlib.nullcontext():
+        print(f'[*] Aggregating reports in {args.directory}...')
+        result = {'timestamp': str(datetime.datetime.now()), 'report_name': 'PySysCheck Fleet Summary'}
+        result.update(aggregate(args.directory, previous=args.previous, workers=args.workers,
+                                sample_limit=args.samples))
+        print(f"[*] {result['summary']['hosts']} hosts, {result['summary']['unreadable']} unreadable reports")
+
+    if args.no_file:
+        print(json.dumps(result, indent=4))
+        return
+
+    output = args.output or f"aggregate_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    try:
+        with open(output, 'w') as f:
+            json.dump(result, f, indent=4)
+        print(f'[*] Fleet summary saved successfully: {output}')
+    except Exception as e:
+        print(f'[!] Error saving fleet summary: {e}')
+
+
 def main():
+    # the fleet mode is a subcommand with its own arguments
+    if sys.argv[1:2] == ['aggregate']:
+        return aggregate_main(sys.argv[2:])
+
     parser = argparse.ArgumentParser(description='PySysCheck: Linux Hardware Probing Tool')
 
     # CLI Arguments
     parser.add_argument('--check', '-c', 
-                        choices=['all', 'cpu', 'memory', 'disk', 'network', 'usb', 'gpu', 'os'], 
+                        choices=['all'] + list(PROBE_MODULES), 
                         default='all', 
                         help="Specific hardware to check (default: all)")
 
     parser.add_argument('--output', '-o', 
                         help="Custom output filename", 
-                        default=f"report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+                        default=None)
+
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                        help="json: one indented report at the end, ndjson: one line per probe as soon as it completes (default: json)")
     
     parser.add_argument('--no-file', action='store_true', 
                         help="Don't save to file, print to console only")
     
     parser.add_argument('--verbose', '-v', action='store_true', 
                         help="Print output to console even if saving to file")
+
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="Number of probes to run concurrently (default: 1)")
+
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="Per probe deadline in seconds, slower probes are reported as timed out")
+    
+    parser.add_argument('--watch', type=float, metavar='INTERVAL', default=None,
+                        help="Keep running and re-sample every INTERVAL seconds, one JSON line per sample")
+
+    parser.add_argument('--history', type=int, default=60,
+                        help="Number of samples kept per probe in watch mode (default: 60)")
+
+    parser.add_argument('--count', type=int, default=None,
+                        help="Stop watch mode after COUNT samples (default: run forever)")
+
+    parser.add_argument('--timeseries', metavar='FILE', default=None,
+                        help="In watch mode, append numeric metrics to the binary time-series FILE instead of printing JSON lines "
+                             "(implies --raw-memory)")
+    
+    parser.add_argument('--sample-interval', type=float, default=None, metavar='SECONDS',
+                        help="Enable load sampling (CPU utilization, disk I/O, network rates, process CPU) measured over SECONDS")
+
+    parser.add_argument('--top', type=int, default=10,
+                        help="Number of processes listed by the process probe (default: 10)")
+
+    parser.add_argument('--cgroup-depth', type=int, default=2, metavar='LEVELS',
+                        help="Levels below the cgroup root walked by the cgroup probe (default: 2)")
+
+    parser.add_argument('--cgroup-filter', action='append', default=None, metavar='PATTERN',
+                        help="Only report cgroups whose path matches the glob PATTERN, e.g. '/system.slice/*' (repeatable)")
+
+    parser.add_argument('--raw-memory', action='store_true',
+                        help="Report every /proc/meminfo counter in kB plus pressure stall and paging counters")
+
+    parser.add_argument('--iface-include', action='append', default=None, metavar='PATTERN',
+                        help="Only report network interfaces matching the glob PATTERN (repeatable)")
+
+    parser.add_argument('--iface-exclude', action='append', default=None, metavar='PATTERN',
+                        help="Skip network interfaces matching the glob PATTERN (repeatable)")
+
+    parser.add_argument('--full-topology', action='store_true',
+                        help="Count sockets, cores and threads across all CPUs instead of the first one")
+
+    parser.add_argument('--profile', action='store_true',
+                        help="Add per probe wall time, file read and subprocess counters to the report under _perf")
+
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="Report import and construction time of every selected probe")
+
+    parser.add_argument('--refresh', action='store_true',
+                        help="Ignore the static data cache and re-measure every probe")
+
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Disable the static data cache entirely")
+    
+    parser.add_argument('--follow-hotplug', action='store_true',
+                        help="Print USB attach/detach events as JSON lines as they happen")
+
+    parser.add_argument('--net-backend', choices=['sysfs', 'netlink'], default='sysfs',
+                        help="Source of network link state: sysfs polling or rtnetlink events (default: sysfs)")
+
+    parser.add_argument('--follow-links', action='store_true',
+                        help="Print network link up/down events as JSON lines as they happen")
+
+    parser.add_argument('--root', metavar='PATH', default=None,
+                        help="Read /proc, /sys, /etc and /dev under PATH, a mounted host root or a snapshot archive (disables command fallbacks)")
+
+    parser.add_argument('--snapshot', metavar='FILE', default=None,
+                        help="Archive every file the probes read into a gzip compressed tarball FILE (replay it with --root FILE)")
+
+    # const is resolved after parsing, kmsg is only imported when the option is used
+    parser.add_argument('--hotplug-state', nargs='?', const='', default=None, metavar='FILE',
+                        help="Only report hotplug events newer than the previous run, cursor is kept in FILE "
+                             "(default: ~/.local/state/pysyscheck/hotplug_cursor.json)")
     
     args = parser.parse_args()
 
+    if args.hotplug_state == '':
+        from src.core.kmsg import default_cursor_path
+        args.hotplug_state = default_cursor_path()
+
+    if args.timeseries and args.watch is None:
+        parser.error('--timeseries records watch mode samples, it requires --watch')
+
+    if args.snapshot and (args.watch is not None or args.follow_hotplug or args.follow_links):
+        parser.error('--snapshot records a single run, it can not be combined with --watch or --follow-*')
+
+    # keeps the extracted snapshot alive until exit
+    snapshot_root = None
+    if args.root:
+        from src.core.snapshot import extract_snapshot, is_snapshot
+
+        if is_snapshot(args.root):
+            import tempfile
+            snapshot_root = tempfile.TemporaryDirectory(prefix='pysyscheck-root-')
+            set_root(extract_snapshot(args.root, snapshot_root.name))
+        elif os.path.isdir(args.root):
+            set_root(args.root)
+        else:
+            parser.error(f'--root must be a directory or a snapshot archive: {args.root}')
 
     # application logic
-    app = PySysCheck()
-    app.run_check(args.check)
+    # a snapshot must see every read, cached static data would skip them
+    # the cache is keyed by boot id, which a mounted root or a container shares with the live host
+    cache = None
+    if not (args.no_cache or args.snapshot or args.root):
+        from src.core.cache import StaticCache
+        cache = StaticCache(refresh=args.refresh)
+    # the formatted memory summary has no numbers to store in a time-series
+    raw_memory = args.raw_memory or args.timeseries is not None
+    app = PySysCheck(jobs=args.jobs, timeout=args.timeout, cache=cache, hotplug_state=args.hotplug_state,
+                     sample_interval=args.sample_interval, full_topology=args.full_topology,
+                     iface_include=args.iface_include, iface_exclude=args.iface_exclude,
+                     net_backend=args.net_backend, raw_memory=raw_memory, top=args.top,
+                     cgroup_depth=args.cgroup_depth, cgroup_filter=args.cgroup_filter,
+                     startup_profile=args.startup_profile, profile=args.profile)
 
-    if args.no_file:
-        app.print_stdout()
-    else:
-        app.save_report(args.output)
-        if args.verbose:
+    # probes may keep sockets open between runs
+    with contextlib.closing(app):
+        if args.follow_hotplug:
+            try:
+                for event in app.probes['usb'].follow_hotplug_events():
+                    print(json.dumps(event), flush=True)
+            except KeyboardInterrupt:
+                pass
+            except OSError as e:
+                print(f'[!] Cannot read kernel log: {e}')
+            return
+
+        if args.follow_links:
+            try:
+                for event in app.probes['network'].follow_link_events():
+                    print(json.dumps(event), flush=True)
+            except KeyboardInterrupt:
+                pass
+            except OSError as e:
+                print(f'[!] Cannot open netlink socket: {e}')
+            return
+
+        if args.output is None:
+            args.output = f"report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.{args.format}"
+
+        if args.format == 'ndjson' and args.timeseries is None:
+            # with --no-file the lines go to stdout, status messages move to stderr to keep the stream clean
+            from src.core.stream import NdjsonWriter
+
+            target = '-' if args.no_file else args.output
+            with NdjsonWriter.open(target) as writer:
+                status = contextlib.redirect_stdout(sys.stderr) if target == '-' else contextlib.nullcontext()
+                with status:
+                    if args.watch is not None:
+                        app.watch(args.watch, args.check, history=args.history, count=args.count, writer=writer)
+                    else:
+                        if args.snapshot: start_recording()
+                        app.run_check(args.check, writer=writer)
+                        if args.snapshot: save_snapshot(args.snapshot)
+            if target != '-':
+                print(f'[*] Report streamed to: {target}')
+            return
+
+        if args.watch is not None:
+            if args.timeseries is None:
+                app.watch(args.watch, args.check, history=args.history, count=args.count)
+                return
+
+            from src.core.timeseries import TimeSeriesWriter
+
+            with TimeSeriesWriter(args.timeseries) as series:
+                app.watch(args.watch, args.check, history=args.history, count=args.count, series=series)
+            print(f'[*] Time-series appended: {args.timeseries}')
+
+            # the static inventory of the first tick stays in the JSON report
+            if not args.no_file:
+                app.save_report(args.output)
+            return
+
+        if args.snapshot: start_recording()
+        app.run_check(args.check)
+        if args.snapshot: save_snapshot(args.snapshot)
+
+        if args.no_file:
             app.print_stdout()
+        else:
+            app.save_report(args.output)
+            if args.verbose:
+                app.print_stdout()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,323 @@
+import collections
+import contextlib
+import json
+import multiprocessing
+import os
+
+REPORT_EXTENSIONS = ('.json', '.ndjson')
+
+# changes, added and removed hosts listed by name in the diff
+SAMPLE_LIMIT = 20
+
+# reports handed to a worker process at once
+CHUNK_SIZE = 16
+
+# inventory fields compared between two rounds
+INVENTORY_FIELDS = ('cpu_model', 'cpu_threads', 'memory_total', 'distro', 'kernel', 'disks', 'gpus', 'network', 'usb')
+
+
+def find_reports(directory):
+    """
+    lists the reports of a collection round as [(host key, path)] sorted by host key
+    a host is keyed by its report path relative to the round without the extension,
+    timestamped reports in a host directory (host-a/report_<time>.json) are keyed by the directory and the newest one is used
+    """
+    reports = {}
+    for dirpath, dirnames, filenames in os.walk(directory):
+        for name in filenames:
+            if not name.endswith(REPORT_EXTENSIONS): continue
+
+            path = os.path.join(dirpath, name)
+            relative = os.path.relpath(path, directory)
+            parent = os.path.dirname(relative)
+            key = parent if name.startswith('report_') and parent else os.path.splitext(relative)[0]
+
+            # report_YYYYmmdd_HHMMSS names sort by time
+            if key not in reports or path > reports[key]:
+                reports[key] = path
+    return sorted(reports.items())
+
+
+def load_report(path):
+    """
+    reads a JSON report, or rebuilds one from an NDJSON stream (the last line of every probe wins)
+    """
+    with open(path) as f:
+        if not path.endswith('.ndjson'):
+            return json.load(f)
+
+        report = {'device_info': {}}
+        for line in f:
+            if not line.strip(): continue
+            record = json.loads(line)
+            if record.get('type') == 'probe':
+                report['device_info'][record['probe']] = record['data']
+            elif record.get('type') == 'test_results':
+                report['test_results'] = record['data']
+        return report
+
+
+def _section(device_info, name):
+    # failed probes report {'error': ...}, they count as missing
+    section = device_info.get(name)
+    if isinstance(section, dict) and 'error' not in section:
+        return section
+    return {}
+
+
+def _devices(device_info, name):
+    devices = device_info.get(name)
+    if not isinstance(devices, list):
+        return []
+    return [device for device in devices if isinstance(device, dict) and 'error' not in device]
+
+
+def summarize_report(report):
+    """
+    compact inventory of one host, the only part of a report the fleet summary and the diff look at
+    """
+    device_info = report.get('device_info', {})
+    cpu = _section(device_info, 'cpu')
+    memory = _section(device_info, 'memory')
+    os_info = _section(device_info, 'os')
+
+    disks = {}
+    for name, disk in _section(device_info, 'disk').items():
+        if isinstance(disk, dict):
+            disks[name] = {'type': disk.get('type'), 'size': disk.get('size'), 'model': disk.get('model')}
+
+    network = {}
+    for name, iface in _section(device_info, 'network').items():
+        if isinstance(iface, dict):
+            network[name] = iface.get('mac')
+
+    # the default memory summary is formatted, --raw-memory reports integers (kB)
+    memory_total = memory.get('mem_total')
+    if memory_total is None and isinstance(memory.get('meminfo_kb'), dict):
+        memory_total = memory['meminfo_kb'].get('MemTotal')
+
+    return {
+        'cpu_model': cpu.get('model_name'),
+        'cpu_threads': (cpu.get('topology') or {}).get('logical_threads'),
+        'memory_total': memory_total,
+        'distro': os_info.get('distro'),
+        'kernel': os_info.get('version'),
+        'disks': disks,
+        'gpus': sorted(str(gpu.get('model')) for gpu in _devices(device_info, 'gpu')),
+        'network': network,
+        'usb': sorted(f"{device.get('vendor_id')}:{device.get('product_id')}" for device in _devices(device_info, 'usb')),
+        'test_results': report.get('test_results') or {}
+    }
+
+
+def diff_inventory(old, new):
+    """
+    returns [(field, old value, new value)] for every inventory field that changed
+    disks and interfaces are compared one by one ("disks.sda")
+    """
+    changes = []
+    for field in INVENTORY_FIELDS:
+        before, after = old.get(field), new.get(field)
+        if before == after: continue
+
+        if isinstance(before, dict) and isinstance(after, dict):
+            for name in sorted(set(before) | set(after)):
+                if before.get(name) != after.get(name):
+                    changes.append((f'{field}.{name}', before.get(name), after.get(name)))
+        else:
+            changes.append((field, before, after))
+    return changes
+
+
+def join_rounds(previous, current):
+    """
+    merge-joins two report lists sorted by host key, yields (host key, previous path, current path)
+    the path of the round a host is missing from is None
+    """
+    previous, current = iter(previous), iter(current)
+    old, new = next(previous, None), next(current, None)
+
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            yield old[0], old[1], None
+            old = next(previous, None)
+        elif old is None or new[0] < old[0]:
+            yield new[0], None, new[1]
+            new = next(current, None)
+        else:
+            yield new[0], old[1], new[1]
+            old, new = next(previous, None), next(current, None)
+
+
+def _process_host(item):
+    """
+    parses the reports of one host (on a worker process), only the compact summary and changes go back
+    returns (item, summary, changes, error, previous error), errors of the current and the previous round are kept apart
+    """
+    key, previous_path, current_path = item
+    if current_path is None:
+        return item, None, None, None, None
+
+    try:
+        summary = summarize_report(load_report(current_path))
+    except Exception as e:
+        return item, None, None, f'{current_path}: {e}', None
+
+    if previous_path is None:
+        return item, summary, None, None, None
+
+    try:
+        changes = diff_inventory(summarize_report(load_report(previous_path)), summary)
+    except Exception as e:
+        return item, summary, None, None, f'{previous_path}: {e}'
+    return item, summary, changes, None, None
+
+
+class FleetSummary:
+    """
+    per field counts over the hosts of a round
+    memory grows with the number of distinct values (cpu models, kernels...), not with the number of hosts
+    """
+
+    def __init__(self, sample_limit=SAMPLE_LIMIT):
+        self.sample_limit = sample_limit
+        self.hosts = 0
+        self.cpu_models = collections.Counter()
+        self.distros = collections.Counter()
+        self.kernels = collections.Counter()
+        self.disk_types = collections.Counter()
+        self.test_results = collections.defaultdict(collections.Counter)
+        self.unreadable = 0
+        self.errors = []
+
+    def add(self, summary):
+        self.hosts += 1
+        self.cpu_models[summary['cpu_model'] or 'Unknown'] += 1
+        self.distros[summary['distro'] or 'Unknown'] += 1
+        self.kernels[summary['kernel'] or 'Unknown'] += 1
+        for disk in summary['disks'].values():
+            self.disk_types[disk['type'] or 'Unknown'] += 1
+        for test, result in summary['test_results'].items():
+            self.test_results[test][result] += 1
+
+    def add_error(self, error):
+        self.unreadable += 1
+        if len(self.errors) < self.sample_limit:
+            self.errors.append(error)
+
+    def to_dict(self):
+        tests = {}
+        for test in sorted(self.test_results):
+            counts = self.test_results[test]
+            total = sum(counts.values())
+            tests[test] = {
+                'pass': counts['PASS'],
+                'fail': counts['FAIL'],
+                'pass_rate': round(counts['PASS'] / total, 4) if total else None
+            }
+
+        return {
+            'hosts': self.hosts,
+            'unreadable': self.unreadable,
+            'errors': self.errors,
+            'cpu_models': dict(self.cpu_models.most_common()),
+            'distros': dict(self.distros.most_common()),
+            'kernels': dict(self.kernels.most_common()),
+            'disk_types': dict(self.disk_types.most_common()),
+            'test_results': tests
+        }
+
+
+class FleetDiff:
+    """
+    inventory changes between two rounds, counted per field with a bounded sample of the changes themselves
+    """
+
+    def __init__(self, sample_limit=SAMPLE_LIMIT):
+        self.sample_limit = sample_limit
+        self.unchanged = 0
+        self.changed = 0
+        self.added = []
+        self.added_count = 0
+        self.removed = []
+        self.removed_count = 0
+        self.fields = collections.Counter()
+        self.changes = []
+        # hosts in both rounds that couldn't be compared, by the round whose report is unreadable
+        self.unreadable_previous = 0
+        self.unreadable_current = 0
+        self.errors = []
+
+    def add(self, key, previous_path, current_path, changes, previous_error=None):
+        """
+        counts one joined host, every host in both rounds lands in exactly one of
+        changed, unchanged, unreadable_previous and unreadable_current
+        """
+        if previous_path is None:
+            self.added_count += 1
+            if len(self.added) < self.sample_limit: self.added.append(key)
+        elif current_path is None:
+            self.removed_count += 1
+            if len(self.removed) < self.sample_limit: self.removed.append(key)
+        elif previous_error is not None:
+            self.unreadable_previous += 1
+            if len(self.errors) < self.sample_limit: self.errors.append(previous_error)
+        elif changes is None:
+            # the current report is unreadable, its error is in the round summary
+            self.unreadable_current += 1
+        elif changes:
+            self.changed += 1
+            for field, old, new in changes:
+                # "disks.sda" and "disks.sdb" count as "disks"
+                self.fields[field.split('.', 1)[0]] += 1
+                if len(self.changes) < self.sample_limit:
+                    self.changes.append({'host': key, 'field': field, 'old': old, 'new': new})
+        else:
+            self.unchanged += 1
+
+    def to_dict(self):
+        return {
+            'unchanged': self.unchanged,
+            'changed': self.changed,
+            'added': self.added_count,
+            'removed': self.removed_count,
+            'unreadable_previous': self.unreadable_previous,
+            'unreadable_current': self.unreadable_current,
+            'errors': self.errors,
+            'fields': dict(self.fields.most_common()),
+            'changes': self.changes,
+            'added_hosts': self.added,
+            'removed_hosts': self.removed
+        }
+
+
+def aggregate(directory, previous=None, workers=None, sample_limit=SAMPLE_LIMIT):
+    """
+    summarizes a directory of reports, and diffs its inventory against a previous round when given
+    reports are parsed on `workers` processes (1 = in this process) and streamed through the counters,
+    no more than the report file names are held for the whole fleet
+    """
+    current = find_reports(directory)
+    if previous is not None:
+        items = join_rounds(find_reports(previous), current)
+    else:
+        items = ((key, None, path) for key, path in current)
+
+    summary = FleetSummary(sample_limit)
+    diff = FleetDiff(sample_limit) if previous is not None else None
+    workers = workers or os.cpu_count() or 1
+
+    with multiprocessing.Pool(workers) if workers > 1 else contextlib.nullcontext() as pool:
+        # imap keeps the round order, so the sampled changes are the same on every run
+        results = pool.imap(_process_host, items, CHUNK_SIZE) if pool else map(_process_host, items)
+
+        for item, host, changes, error, previous_error in results:
+            if error is not None: summary.add_error(error)
+            if host is not None: summary.add(host)
+            if diff is not None: diff.add(*item, changes, previous_error)
+
+    result = {'directory': directory, 'summary': summary.to_dict()}
+    if diff is not None:
+        result['previous'] = previous
+        result['diff'] = diff.to_dict()
+    return result
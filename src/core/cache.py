@@ -0,0 +1,106 @@
+import collections
+import json
+import os
+import threading
+import time
+
+from src.core.utils import read_boot_id
+
+
+def default_cache_path():
+    """
+    returns the cache file location, honoring XDG_CACHE_HOME
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pysyscheck', 'static_cache.json')
+
+
+def is_cacheable(data):
+    """
+    error results must never be served from cache
+    """
+    items = data if isinstance(data, list) else [data]
+    for item in items:
+        if isinstance(item, dict) and any('error' in str(key).lower() for key in item):
+            return False
+    return True
+
+
+class StaticCache:
+    """
+    on-disk cache for rarely changing probe data (GPU inventory, kernel, CPU model)
+    entries are only valid for the boot they were written in and expire after the probe's TTL
+    """
+
+    def __init__(self, path=None, refresh=False):
+        self.path = path or default_cache_path()
+        # refresh: ignore stored entries, but still store fresh ones
+        self.refresh = refresh
+        self.boot_id = read_boot_id()
+        # per key counts, bounded by the number of probes however long watch mode runs
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                content = json.load(f)
+        except Exception:
+            return {}
+
+        # a reboot can change hardware and kernel, drop everything
+        if not isinstance(content, dict) or self.boot_id is None or content.get('boot_id') != self.boot_id:
+            return {}
+        return content.get('entries', {})
+
+    def get(self, key, ttl):
+        """
+        returns cached data for key or None on a miss
+        """
+        with self._lock:
+            entry = None if self.refresh else self.entries.get(key)
+            if entry is not None and time.time() - entry.get('saved_at', 0) <= ttl:
+                self.hits[key] += 1
+                return entry['data']
+
+            self.misses[key] += 1
+            return None
+
+    def put(self, key, data):
+        if not is_cacheable(data): return
+
+        with self._lock:
+            self.entries[key] = {'saved_at': time.time(), 'data': data}
+            self._dirty = True
+
+    def save(self):
+        """
+        writes the cache file atomically, failures (read-only home etc.) are ignored
+        """
+        with self._lock:
+            if not self._dirty or self.boot_id is None: return
+
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f'{self.path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump({'boot_id': self.boot_id, 'entries': self.entries}, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        hit/miss summary included in the report
+        """
+        with self._lock:
+            return {
+                'hits': sum(self.hits.values()),
+                'misses': sum(self.misses.values()),
+                'cached_probes': sorted(self.hits),
+                'refresh': self.refresh
+            }
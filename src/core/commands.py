@@ -0,0 +1,158 @@
+import asyncio
+import collections
+import os
+import signal
+import time
+
+from src.core import perf
+
+# a wedged command (lspci waiting on a dead device) must not hang the report
+DEFAULT_TIMEOUT = 10.0
+# captured output is capped, larger outputs are cut and the command is killed
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+READ_CHUNK_SIZE = 64 * 1024
+# seconds to collect a killed command
+KILL_TIMEOUT = 1.0
+
+CommandResult = collections.namedtuple('CommandResult', ['returncode', 'stdout', 'truncated', 'timed_out'])
+
+
+async def _kill(process):
+    """
+    kills the command with everything it started (commands run in their own session)
+    """
+    if process.returncode is None:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    # wait() also waits for the pipe to close, drain what the command left in it
+    try:
+        await asyncio.wait_for(asyncio.gather(process.stdout.read(), process.wait()), KILL_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run_command_async(command_list, timeout=DEFAULT_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    runs a command and captures at most `max_bytes` of its stdout, reading it in chunks
+    the child is killed when it passes `timeout` seconds or the byte cap
+    returns a CommandResult, raises FileNotFoundError if the command doesn't exist
+    """
+    process = await asyncio.create_subprocess_exec(*command_list, stdout=asyncio.subprocess.PIPE,
+                                                   stderr=asyncio.subprocess.DEVNULL,
+                                                   start_new_session=True)
+    chunks = []
+    size = 0
+    truncated = False
+
+    async def capture():
+        nonlocal size, truncated
+        while True:
+            chunk = await process.stdout.read(READ_CHUNK_SIZE)
+            if not chunk: break
+            if size + len(chunk) > max_bytes:
+                chunks.append(chunk[:max_bytes - size])
+                size = max_bytes
+                truncated = True
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+
+    try:
+        await asyncio.wait_for(capture(), timeout)
+        if truncated:
+            await _kill(process)
+        else:
+            await asyncio.wait_for(process.wait(), timeout)
+        timed_out = False
+    except asyncio.TimeoutError:
+        await _kill(process)
+        timed_out = True
+
+    stdout = b''.join(chunks).decode(errors='replace')
+    return CommandResult(process.returncode, stdout, truncated, timed_out)
+
+
+async def _gather(commands, timeout, max_bytes):
+    return await asyncio.gather(*(run_command_async(command, timeout, max_bytes) for command in commands),
+                                return_exceptions=True)
+
+
+def run_commands(commands, timeout=DEFAULT_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    runs several commands at the same time (e.g. lspci, lsusb and dmesg)
+    returns one CommandResult per command, or the exception it raised
+    """
+    return asyncio.run(_gather(commands, timeout, max_bytes))
+
+
+class CommandLines:
+    """
+    iterates over the stdout lines of a command while it runs
+    the event loop is driven one chunk at a time, so nothing is buffered beyond a chunk and the pipe,
+    and a caller that stops early kills the command
+    after iteration `returncode`, `truncated` and `timed_out` describe how it ended
+    """
+
+    def __init__(self, command_list, timeout=DEFAULT_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES):
+        self.command_list = command_list
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.returncode = None
+        self.truncated = False
+        self.timed_out = False
+
+    def __iter__(self):
+        loop = asyncio.new_event_loop()
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        process = None
+        size = 0
+
+        try:
+            process = loop.run_until_complete(asyncio.create_subprocess_exec(
+                *self.command_list, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True))
+
+            # incomplete last line of the previous chunk
+            pending = b''
+            while True:
+                try:
+                    chunk = loop.run_until_complete(
+                        asyncio.wait_for(process.stdout.read(READ_CHUNK_SIZE), max(deadline - time.monotonic(), 0)))
+                except asyncio.TimeoutError:
+                    self.timed_out = True
+                    break
+                if not chunk: break
+
+                if size + len(chunk) > self.max_bytes:
+                    chunk = chunk[:self.max_bytes - size]
+                    self.truncated = True
+                size += len(chunk)
+
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                for line in lines:
+                    yield line.decode(errors='replace')
+                if self.truncated: break
+
+            # output without a trailing newline (a cut line is dropped)
+            if pending and not self.truncated and not self.timed_out:
+                yield pending.decode(errors='replace')
+
+            if not (self.timed_out or self.truncated):
+                try:
+                    loop.run_until_complete(asyncio.wait_for(process.wait(), max(deadline - time.monotonic(), 0)))
+                except asyncio.TimeoutError:
+                    self.timed_out = True
+        finally:
+            # also reached when the caller stops iterating early
+            if process is not None:
+                loop.run_until_complete(_kill(process))
+                self.returncode = process.returncode
+            loop.close()
+            if perf.collector is not None:
+                perf.current().add_command(time.perf_counter() - started)
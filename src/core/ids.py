@@ -0,0 +1,81 @@
+import threading
+
+# common install locations of the hwdata id databases
+PCI_IDS_PATHS = ['/usr/share/hwdata/pci.ids', '/usr/share/misc/pci.ids', '/usr/share/pci.ids']
+USB_IDS_PATHS = ['/usr/share/hwdata/usb.ids', '/usr/share/misc/usb.ids', '/usr/share/usb.ids', '/var/lib/usbutils/usb.ids']
+
+
+class IdsDatabase:
+    """
+    vendor/device name index built from a pci.ids / usb.ids style file
+    the file is only read and indexed on the first lookup
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self._vendors = None
+        self._lock = threading.Lock()
+
+    def _parse(self, lines):
+        """
+        indexes vendor and device lines, subsystem lines and the trailing
+        class sections are skipped
+        """
+        vendors = {}
+        current = None
+
+        for line in lines:
+            if not line.strip() or line.startswith('#'): continue
+
+            # example device line: "\t2520  GA106M [GeForce RTX 3060 Mobile / Max-Q]"
+            if line.startswith('\t'):
+                if line.startswith('\t\t') or current is None: continue
+                device_id, _, name = line[1:].partition(' ')
+                current[1][device_id.lower()] = name.strip()
+                continue
+
+            # example vendor line: "10de  NVIDIA Corporation"
+            vendor_id, _, name = line.partition(' ')
+            if len(vendor_id) != 4:
+                # class sections ("C 03  Display controller") follow the vendor list
+                break
+
+            current = (name.strip(), {})
+            vendors[vendor_id.lower()] = current
+
+        return vendors
+
+    def _index(self):
+        if self._vendors is not None:
+            return self._vendors
+
+        with self._lock:
+            if self._vendors is None:
+                vendors = {}
+                for path in self.paths:
+                    try:
+                        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                            vendors = self._parse(f)
+                        break
+                    except OSError:
+                        continue
+                self._vendors = vendors
+        return self._vendors
+
+    def vendor_name(self, vendor_id):
+        """
+        returns the vendor name or None if unknown
+        """
+        vendor = self._index().get(vendor_id.lower())
+        return vendor[0] if vendor else None
+
+    def device_name(self, vendor_id, device_id):
+        """
+        returns the device name or None if unknown
+        """
+        vendor = self._index().get(vendor_id.lower())
+        return vendor[1].get(device_id.lower()) if vendor else None
+
+
+PCI_IDS = IdsDatabase(PCI_IDS_PATHS)
+USB_IDS = IdsDatabase(USB_IDS_PATHS)
@@ -0,0 +1,248 @@
+import collections
+import errno
+import json
+import os
+import select
+
+from src.core.utils import get_root, host_path, is_recording, read_boot_id, record_file
+
+KMSG_PATH = '/dev/kmsg'
+
+# a single read returns exactly one record, records are at most a few KB
+RECORD_BUFFER_SIZE = 8192
+
+KmsgRecord = collections.namedtuple('KmsgRecord', ['priority', 'facility', 'sequence', 'timestamp_us', 'message'])
+
+
+def parse_record(raw):
+    """
+    parses one /dev/kmsg record
+    format: "<prefix>,<sequence>,<timestamp_us>,<flags>[,...];<message>\\n[ KEY=value\\n...]"
+    returns None for malformed records
+    """
+    header, separator, body = raw.partition(';')
+    if not separator: return None
+
+    fields = header.split(',')
+    if len(fields) < 3: return None
+
+    try:
+        prefix = int(fields[0])
+        sequence = int(fields[1])
+        timestamp_us = int(fields[2])
+    except ValueError:
+        return None
+
+    # continuation lines (device dictionary) start with a space, only keep the message
+    message = body.split('\n', 1)[0]
+    return KmsgRecord(prefix & 7, prefix >> 3, sequence, timestamp_us, message)
+
+
+def split_records(lines):
+    """
+    groups the lines of a kernel log saved as text (a snapshot) back into raw records,
+    continuation lines of a record start with a space
+    """
+    raw = ''
+    for line in lines:
+        if raw and not line.startswith(' '):
+            yield raw
+            raw = ''
+        raw += line
+    if raw:
+        yield raw
+
+
+def format_record(record):
+    """
+    formats a record the way dmesg prints it: "[11470.740123] message"
+    """
+    seconds, micros = divmod(record.timestamp_us, 1000000)
+    return f'[{seconds:5d}.{micros:06d}] {record.message}'
+
+
+def is_hotplug_event(message):
+    """
+    USB attach/detach messages ("usb 3-2: new full-speed USB device", "usb 3-2: USB disconnect")
+    """
+    return 'usb' in message and ('new' in message or 'disconnect' in message)
+
+
+def default_cursor_path():
+    """
+    returns the hotplug cursor state file location, honoring XDG_STATE_HOME
+    """
+    base = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(base, 'pysyscheck', 'hotplug_cursor.json')
+
+
+class HotplugCursor:
+    """
+    last processed kmsg sequence number, persisted in a small state file between runs
+    sequence numbers restart on every boot, so the cursor is tied to the boot id
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_cursor_path()
+        self.boot_id = read_boot_id()
+        # None: no previous run, every record in the buffer is new
+        # -1: previous run was in another boot, records should start at sequence 0
+        self.sequence = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except Exception:
+            return None
+
+        if not isinstance(state, dict) or self.boot_id is None or state.get('boot_id') != self.boot_id:
+            return -1 if self.boot_id is not None else None
+
+        sequence = state.get('sequence')
+        return sequence if isinstance(sequence, int) else None
+
+    def save(self, sequence):
+        """
+        stores the new cursor atomically
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'boot_id': self.boot_id, 'sequence': sequence}, f)
+        os.replace(tmp_path, self.path)
+        self.sequence = sequence
+
+
+class KmsgReader:
+    """
+    streams structured records from /dev/kmsg one at a time,
+    so the kernel ring buffer is never loaded into memory as a whole
+    under a snapshot root the records are replayed from the text file the snapshot recorded
+    """
+
+    def __init__(self, path=KMSG_PATH):
+        self.path = path
+        self.fd = None
+        # kernel log saved as text, replayed instead of the device
+        self.file = None
+        # records overwritten by the kernel before we could read them
+        self.lost_records = 0
+
+    def open(self):
+        """
+        opens the device, raises PermissionError when dmesg_restrict forbids it
+        """
+        if self.fd is None and self.file is None:
+            path = host_path(self.path)
+            if get_root() != '/' and os.path.isfile(path):
+                self.file = open(path, errors='replace')
+            else:
+                self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        return self
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def seek_end(self):
+        """
+        skips every record currently in the buffer, only new records will be read
+        """
+        if self.file is not None:
+            self.file.seek(0, os.SEEK_END)
+            return
+        os.lseek(self.fd, 0, os.SEEK_END)
+
+    def records(self, follow=False):
+        """
+        yields records from the current position
+        stops at the end of the buffer, or waits for new records in follow mode
+        """
+        if self.file is not None:
+            # a saved log doesn't grow, follow mode ends with it
+            for raw in split_records(self.file):
+                record = parse_record(raw)
+                if record is not None:
+                    yield record
+            return
+
+        # raw records read while a snapshot is recorded, saved as the text of the device
+        recorded = [] if is_recording() else None
+        try:
+            while True:
+                try:
+                    raw = os.read(self.fd, RECORD_BUFFER_SIZE)
+                except BlockingIOError:
+                    if not follow: return
+                    select.select([self.fd], [], [])
+                    continue
+                except OSError as e:
+                    # the record under the cursor was overwritten, kernel moved us to the oldest one
+                    if e.errno == errno.EPIPE:
+                        self.lost_records += 1
+                        continue
+                    raise
+
+                if not raw: return
+
+                text = raw.decode('utf-8', errors='replace')
+                if recorded is not None:
+                    recorded.append(text if text.endswith('\n') else text + '\n')
+
+                record = parse_record(text)
+                if record is not None:
+                    yield record
+        finally:
+            if recorded is not None:
+                record_file(self.path, ''.join(recorded))
+
+    def tail_hotplug_events(self, limit=10):
+        """
+        returns the last `limit` USB hotplug records, oldest first
+        only matching records are kept while streaming
+        """
+        return list(collections.deque(
+            (record for record in self.records() if is_hotplug_event(record.message)), maxlen=limit))
+
+    def hotplug_events_since(self, sequence):
+        """
+        returns (events, last_sequence, lost) for USB hotplug records newer than `sequence`
+        lost counts records that were overwritten (ring buffer wraparound) before they could be read
+        """
+        events = []
+        first_sequence = last_sequence = None
+
+        for record in self.records():
+            if first_sequence is None:
+                first_sequence = record.sequence
+            last_sequence = record.sequence
+
+            if sequence is not None and record.sequence <= sequence: continue
+            if is_hotplug_event(record.message):
+                events.append(record)
+
+        lost = self.lost_records
+        if sequence is not None and first_sequence is not None and first_sequence > sequence + 1:
+            lost += first_sequence - sequence - 1
+
+        return events, last_sequence, lost
+
+    def follow_hotplug_events(self):
+        """
+        yields USB hotplug records as they arrive
+        """
+        self.seek_end()
+        for record in self.records(follow=True):
+            if is_hotplug_event(record.message):
+                yield record
@@ -0,0 +1,207 @@
+import errno
+import os
+import select
+import socket
+import struct
+
+# linux/netlink.h, linux/rtnetlink.h, linux/if_link.h
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 1
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_MTU = 4
+IFLA_OPERSTATE = 16
+
+# struct nlmsghdr: length, type, flags, sequence, port id
+NLMSG_HEADER = struct.Struct('=IHHII')
+# struct ifinfomsg: family, padding, device type, index, flags, change mask
+IFINFO_HEADER = struct.Struct('=BxHiII')
+# struct rtattr: length, type
+RTA_HEADER = struct.Struct('=HH')
+
+# IF_OPER_* values, named like /sys/class/net/*/operstate
+OPERSTATES = ('unknown', 'notpresent', 'down', 'lowerlayerdown', 'testing', 'dormant', 'up')
+
+RECEIVE_BUFFER_SIZE = 65536
+
+
+def _align(length):
+    return (length + 3) & ~3
+
+
+def parse_messages(data):
+    """
+    splits a netlink datagram into (type, payload) pairs
+    """
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size: break
+
+        yield msg_type, data[offset + NLMSG_HEADER.size:offset + length]
+        offset += _align(length)
+
+
+def parse_link(payload):
+    """
+    parses an RTM_NEWLINK/RTM_DELLINK payload into a link dict
+    """
+    _, _, index, _, _ = IFINFO_HEADER.unpack_from(payload)
+    link = {'index': index, 'name': None, 'mac': 'Unknown', 'state': 'Unknown', 'mtu': None}
+
+    offset = IFINFO_HEADER.size
+    while offset + RTA_HEADER.size <= len(payload):
+        length, attr_type = RTA_HEADER.unpack_from(payload, offset)
+        if length < RTA_HEADER.size: break
+        value = payload[offset + RTA_HEADER.size:offset + length]
+
+        if attr_type == IFLA_IFNAME:
+            link['name'] = value.split(b'\0', 1)[0].decode(errors='replace')
+        elif attr_type == IFLA_ADDRESS:
+            link['mac'] = ':'.join(f'{byte:02x}' for byte in value)
+        elif attr_type == IFLA_MTU and len(value) >= 4:
+            link['mtu'] = struct.unpack_from('=I', value)[0]
+        elif attr_type == IFLA_OPERSTATE and value:
+            link['state'] = OPERSTATES[value[0]] if value[0] < len(OPERSTATES) else 'unknown'
+
+        offset += _align(length)
+
+    return link
+
+
+class LinkMonitor:
+    """
+    keeps the state of every network link up to date over rtnetlink
+    one RTM_GETLINK dump at start, then link changes are pushed by the kernel (RTNLGRP_LINK)
+    instead of re-reading /sys/class/net on every poll
+    """
+
+    def __init__(self):
+        # {ifindex: link}, the index survives a rename while the name doesn't
+        self.links = {}
+        self._sock = None
+
+    def _open_socket(self, groups=0):
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC, NETLINK_ROUTE)
+        sock.bind((0, groups))
+        return sock
+
+    def dump_links(self):
+        """
+        returns {ifindex: link} for every link, from a single dump request
+        """
+        links = {}
+        with self._open_socket() as sock:
+            request = NLMSG_HEADER.pack(NLMSG_HEADER.size + IFINFO_HEADER.size, RTM_GETLINK,
+                                        NLM_F_REQUEST | NLM_F_DUMP, 1, 0)
+            request += IFINFO_HEADER.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+            sock.send(request)
+
+            while True:
+                data = sock.recv(RECEIVE_BUFFER_SIZE)
+                for msg_type, payload in parse_messages(data):
+                    if msg_type == NLMSG_DONE:
+                        return links
+                    if msg_type == NLMSG_ERROR:
+                        error = -struct.unpack_from('=i', payload)[0]
+                        raise OSError(error, os.strerror(error))
+                    if msg_type == RTM_NEWLINK:
+                        link = parse_link(payload)
+                        links[link['index']] = link
+
+    def open(self):
+        """
+        subscribes to link events, then loads the initial state
+        (subscribing first means no change between the two can be missed)
+        """
+        if self._sock is None:
+            self._sock = self._open_socket(RTMGRP_LINK)
+            self._sock.setblocking(False)
+            self.links = self.dump_links()
+        return self
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _apply(self, msg_type, payload):
+        """
+        updates the link table, returns an event dict when the link appeared,
+        disappeared, was renamed or changed its operational state
+        """
+        link = parse_link(payload)
+        name = link['name']
+        previous = self.links.get(link['index'])
+
+        if msg_type == RTM_DELLINK:
+            self.links.pop(link['index'], None)
+            return {'event': 'removed', 'iface': name, 'old_state': previous['state'] if previous else None, 'state': None}
+
+        self.links[link['index']] = link
+        if previous is None:
+            return {'event': 'added', 'iface': name, 'old_state': None, 'state': link['state']}
+        if previous['name'] != name:
+            # same ifindex under a new name, the old name is gone
+            return {'event': 'renamed', 'iface': name, 'old_iface': previous['name'],
+                    'old_state': previous['state'], 'state': link['state']}
+        if previous['state'] != link['state']:
+            return {'event': 'changed', 'iface': name, 'old_state': previous['state'], 'state': link['state']}
+        return None
+
+    def poll(self, timeout=0):
+        """
+        applies pending kernel notifications and returns the resulting events
+        timeout: seconds to wait for the first notification (0 = don't wait, None = forever)
+        """
+        events = []
+        wait = timeout
+        while True:
+            readable, _, _ = select.select([self._sock], [], [], wait)
+            if not readable: return events
+
+            try:
+                data = self._sock.recv(RECEIVE_BUFFER_SIZE)
+            except BlockingIOError:
+                return events
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    raise
+                # socket buffer overflowed and notifications were dropped, resync with a dump
+                self.links = self.dump_links()
+                events.append({'event': 'resync', 'iface': None, 'old_state': None, 'state': None})
+                wait = 0
+                continue
+
+            for msg_type, payload in parse_messages(data):
+                if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+                    event = self._apply(msg_type, payload)
+                    if event:
+                        events.append(event)
+
+            # drain whatever else is queued without blocking
+            wait = 0
+
+    def follow(self):
+        """
+        yields link events as the kernel reports them
+        """
+        while True:
+            for event in self.poll(timeout=None):
+                yield event
@@ -0,0 +1,148 @@
+import contextlib
+import heapq
+import threading
+import time
+
+# number of slowest file reads kept per probe
+SLOWEST_READS = 5
+
+# active collector, None when profiling is off
+# instrumented code only checks this before doing anything, so disabled profiling costs one global lookup
+collector = None
+
+_local = threading.local()
+
+
+class PerfCounters:
+    """
+    counters of a single probe, updated from every thread working for it
+    """
+
+    def __init__(self):
+        self.wall_ms = 0.0
+        self.files_read = 0
+        self.bytes_read = 0
+        self.read_ms = 0.0
+        self.read_errors = 0
+        self.commands = 0
+        self.command_ms = 0.0
+        self._slowest = []
+        self._lock = threading.Lock()
+
+    def add_read(self, path, size, elapsed):
+        """
+        size None = the read failed, elapsed None = not timed (streamed reads)
+        """
+        with self._lock:
+            if size is None:
+                self.read_errors += 1
+                return
+            self.files_read += 1
+            self.bytes_read += size
+            if elapsed is None: return
+
+            ms = elapsed * 1000
+            self.read_ms += ms
+            if len(self._slowest) < SLOWEST_READS:
+                heapq.heappush(self._slowest, (ms, path))
+            elif ms > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, (ms, path))
+
+    def add_command(self, elapsed):
+        with self._lock:
+            self.commands += 1
+            self.command_ms += elapsed * 1000
+
+    def to_dict(self):
+        return {
+            'wall_ms': round(self.wall_ms, 3),
+            'files_read': self.files_read,
+            'bytes_read': self.bytes_read,
+            'read_ms': round(self.read_ms, 3),
+            'read_errors': self.read_errors,
+            'commands': self.commands,
+            'command_ms': round(self.command_ms, 3),
+            'slowest_reads': [{'path': path, 'ms': round(ms, 3)} for ms, path in sorted(self._slowest, reverse=True)]
+        }
+
+
+class PerfCollector:
+    """
+    {probe name: counters} of one run
+    work done outside any probe (cache, health checks) is kept under "_unattributed"
+    """
+
+    def __init__(self):
+        self.probes = {}
+        self._lock = threading.Lock()
+
+    def counters(self, name):
+        with self._lock:
+            if name not in self.probes:
+                self.probes[name] = PerfCounters()
+            return self.probes[name]
+
+    def to_dict(self):
+        return {name: counters.to_dict() for name, counters in self.probes.items()}
+
+
+def enable():
+    global collector
+    if collector is None:
+        collector = PerfCollector()
+    return collector
+
+
+def disable():
+    """
+    stops profiling, returns the collector of the finished run
+    """
+    global collector
+    finished, collector = collector, None
+    return finished
+
+
+def current():
+    """
+    counters of the probe running on this thread (only call when collector is set)
+    """
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        counters = collector.counters('_unattributed')
+    return counters
+
+
+@contextlib.contextmanager
+def probe_scope(name):
+    """
+    attributes everything this thread does inside the block to probe `name`, and times it
+    """
+    counters = collector.counters(name)
+    previous = getattr(_local, 'counters', None)
+    _local.counters = counters
+    started = time.perf_counter()
+    try:
+        yield counters
+    finally:
+        counters.wall_ms += (time.perf_counter() - started) * 1000
+        _local.counters = previous
+
+
+def bind(func):
+    """
+    wraps func so it keeps counting for the calling probe when run on a worker thread
+    returns func unchanged when profiling is off
+    """
+    if collector is None:
+        return func
+
+    counters = current()
+
+    def bound(*args, **kwargs):
+        previous = getattr(_local, 'counters', None)
+        _local.counters = counters
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.counters = previous
+    return bound
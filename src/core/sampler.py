@@ -0,0 +1,61 @@
+import collections
+import datetime
+import time
+
+
+class Sampler:
+    """
+    re-samples a set of long lived probes on a fixed schedule
+    the last N samples of every probe are kept in a fixed-size ring buffer
+    """
+
+    def __init__(self, names, collect, interval, history=60, emit=None):
+        # collect: callable taking a list of probe names and an on_result(name, data) callback,
+        #          returning {name: data}
+        # emit: optional callable receiving every sample as soon as it is taken
+        self.names = list(names)
+        self.collect = collect
+        self.interval = interval
+        self.emit = emit
+        self.history = {name: collections.deque(maxlen=history) for name in self.names}
+
+    def sample_once(self):
+        """
+        takes one sample of every probe
+        each sample is stored and emitted as soon as its probe completes, a fast probe doesn't wait for the slowest
+        """
+        taken = set()
+
+        def store(name, data):
+            sample = {'timestamp': str(datetime.datetime.now()), 'probe': name, 'data': data}
+            self.history[name].append(sample)
+            taken.add(name)
+            if self.emit:
+                self.emit(sample)
+
+        results = self.collect(self.names, store)
+
+        # probes the collector didn't report through the callback
+        for name in self.names:
+            if name not in taken:
+                store(name, results[name])
+
+    def run(self, count=None):
+        """
+        samples every `interval` seconds until `count` ticks were taken (forever if None)
+        ticks that are missed because sampling took too long are skipped, not queued
+        """
+        taken = 0
+        next_tick = time.monotonic()
+
+        while count is None or taken < count:
+            self.sample_once()
+            taken += 1
+            if count is not None and taken >= count: break
+
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
@@ -0,0 +1,42 @@
+import io
+import os
+import tarfile
+import time
+
+
+def write_snapshot(path, files):
+    """
+    archives {host path: content} into a gzip compressed tarball laid out like the host
+    ("/proc/cpuinfo" is stored as "proc/cpuinfo"), so it can be extracted and used as a root
+    contents are the ones the probes read, sysfs files are never re-read for their size
+    """
+    now = time.time()
+    with tarfile.open(path, 'w:gz') as archive:
+        for file_path in sorted(files):
+            data = files[file_path].encode()
+            info = tarfile.TarInfo(file_path.lstrip('/'))
+            info.size = len(data)
+            info.mtime = now
+            info.mode = 0o444
+            archive.addfile(info, io.BytesIO(data))
+    return len(files)
+
+
+def extract_snapshot(path, directory):
+    """
+    extracts a snapshot into directory, returns the directory
+    """
+    with tarfile.open(path, 'r:*') as archive:
+        # refuse absolute paths, links and special files when the filter is available (3.12+, backported)
+        if hasattr(tarfile, 'data_filter'):
+            archive.extractall(directory, filter='data')
+        else:
+            for member in archive.getmembers():
+                if not member.isfile() or member.name.startswith('/') or '..' in member.name.split('/'):
+                    raise ValueError(f'unsafe snapshot member: {member.name}')
+            archive.extractall(directory)
+    return directory
+
+
+def is_snapshot(path):
+    return os.path.isfile(path) and tarfile.is_tarfile(path)
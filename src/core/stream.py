@@ -0,0 +1,37 @@
+import json
+import sys
+
+
+class NdjsonWriter:
+    """
+    writes one compact JSON object per line and flushes it right away,
+    so a pipe or a log shipper sees every record as soon as it is produced
+    """
+
+    def __init__(self, stream, close_stream=False):
+        self.stream = stream
+        self._close_stream = close_stream
+
+    @classmethod
+    def open(cls, path):
+        """
+        opens a writer on a file, "-" writes to stdout
+        """
+        if path == '-':
+            return cls(sys.stdout)
+        return cls(open(path, 'w'), close_stream=True)
+
+    def write(self, record):
+        # default=str keeps non JSON types (sets, datetimes) from breaking the stream
+        self.stream.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+        self.stream.flush()
+
+    def close(self):
+        if self._close_stream:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,218 @@
+import array
+import math
+import mmap
+import os
+import struct
+import sys
+
+# file layout:
+#   header  magic, format version, field count, length of the field names block
+#   names   field names joined with "\n", zero padded to a multiple of 8 bytes
+#   records fixed width, little endian doubles: timestamp followed by one value per field
+MAGIC = b'PSTS'
+VERSION = 2
+# version 2 stores the field count as uint32, hosts with thousands of veths and cgroups pass 65535 fields
+HEADER = struct.Struct('<4sH2xII')
+# version 1 files (uint16 field count) are still read and appended to
+HEADER_V1 = struct.Struct('<4sHHI')
+
+
+def _align(length):
+    return (length + 7) & ~7
+
+
+def flatten_metrics(data, prefix=''):
+    """
+    flattens the numeric leaves of nested probe results into {"cpu.utilization.busy_percent": value}
+    lists of numbers (per core columns) are indexed by position: "cpu.utilization.per_core.busy.3"
+    strings, booleans, nulls and lists of records are not time-series data and are skipped
+    """
+    metrics = {}
+    for key, value in data.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, f'{name}.'))
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, (int, float)) and not isinstance(item, bool):
+                    metrics[f'{name}.{index}'] = float(item)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = float(value)
+    return metrics
+
+
+def _read_header(f):
+    """
+    returns (fields, offset of the first record)
+    """
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER_V1.size:
+        raise ValueError('truncated time-series header')
+
+    magic, version = struct.unpack_from('<4sH', raw)
+    if magic != MAGIC:
+        raise ValueError('not a time-series file')
+    if version not in (1, VERSION):
+        raise ValueError(f'unsupported time-series version: {version}')
+
+    header = HEADER_V1 if version == 1 else HEADER
+    if len(raw) < header.size:
+        raise ValueError('truncated time-series header')
+
+    _, _, field_count, names_length = header.unpack_from(raw)
+    f.seek(header.size)
+    names = f.read(names_length).decode()
+    fields = names.split('\n') if field_count else []
+    return fields, _align(header.size + names_length)
+
+
+class TimeSeriesWriter:
+    """
+    append-only writer, one fixed width record per sample
+    the field list is fixed by the first sample (or by the existing file when appending),
+    fields missing from a later sample are stored as NaN and new ones are dropped
+    (append returns the fields dropped for the first time, so the caller can warn)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fields = None
+        self._record = None
+        self._file = None
+        # stored and already dropped fields
+        self._seen = None
+
+    def _open(self, fields):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb') as f:
+                self.fields, data_offset = _read_header(f)
+            self._record = struct.Struct(f'<{len(self.fields) + 1}d')
+
+            # drop a partial record left behind by an interrupted write
+            size = os.path.getsize(self.path)
+            complete = data_offset + (size - data_offset) // self._record.size * self._record.size
+            if complete != size:
+                os.truncate(self.path, complete)
+
+            self._file = open(self.path, 'ab')
+            return
+
+        self.fields = sorted(fields)
+        self._record = struct.Struct(f'<{len(self.fields) + 1}d')
+
+        names = '\n'.join(self.fields).encode()
+        header = HEADER.pack(MAGIC, VERSION, len(self.fields), len(names)) + names
+        self._file = open(self.path, 'wb')
+        self._file.write(header.ljust(_align(len(header)), b'\0'))
+
+    def append(self, timestamp, metrics):
+        """
+        appends one record, metrics: {field: number}
+        returns the sorted names of fields that are not in the file and were never seen before
+        """
+        if self._file is None:
+            self._open(metrics)
+            self._seen = set(self.fields)
+
+        values = [metrics.get(field, math.nan) for field in self.fields]
+        self._file.write(self._record.pack(timestamp, *values))
+        # a reader can slice the file while sampling is still running
+        self._file.flush()
+
+        dropped = metrics.keys() - self._seen
+        if not dropped:
+            return []
+        self._seen |= dropped
+        return sorted(dropped)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TimeSeriesReader:
+    """
+    memory-maps a time-series file, records are located by offset instead of parsed
+    timestamps are increasing, so time ranges are found with a binary search
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.fields, self._data_offset = _read_header(f)
+            self._index = {field: position for position, field in enumerate(self.fields)}
+            self._record = struct.Struct(f'<{len(self.fields) + 1}d')
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._count = (len(self._mmap) - self._data_offset) // self._record.size
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _offset(self, position):
+        return self._data_offset + position * self._record.size
+
+    def timestamp(self, position):
+        return struct.unpack_from('<d', self._mmap, self._offset(position))[0]
+
+    def _bisect(self, timestamp, right=False):
+        """
+        first record position with a timestamp >= (or > when right is set) the given one
+        """
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            value = self.timestamp(middle)
+            if value < timestamp or (right and value == timestamp):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find_range(self, start=None, end=None):
+        """
+        returns (first, last) record positions covering start <= timestamp <= end
+        """
+        first = 0 if start is None else self._bisect(start)
+        last = self._count if end is None else self._bisect(end, right=True)
+        return first, max(first, last)
+
+    def records(self, start=None, end=None):
+        """
+        yields (timestamp, {field: value}) for every record in the time range
+        """
+        first, last = self.find_range(start, end)
+        for position in range(first, last):
+            values = self._record.unpack_from(self._mmap, self._offset(position))
+            yield values[0], dict(zip(self.fields, values[1:]))
+
+    def column(self, field, start=None, end=None):
+        """
+        returns (timestamps, values) arrays of a single field in the time range
+        only the bytes of the selected records are copied out of the map
+        """
+        first, last = self.find_range(start, end)
+        width = len(self.fields) + 1
+
+        block = array.array('d')
+        block.frombytes(self._mmap[self._offset(first):self._offset(last)])
+        if sys.byteorder == 'big':
+            block.byteswap()
+
+        return block[0::width], block[self._index[field] + 1::width]
@@ -1,20 +1,379 @@
-import subprocess
+import collections
+import errno
+import os
+import resource
+import threading
+import time
+from src.core import perf
+
+BOOT_ID_PATH = '/proc/sys/kernel/random/boot_id'
+
+# errors raised on a cached descriptor whose file went away
+# (hot-unplugged NIC or disk, removed sysfs attribute, exited process)
+STALE_HANDLE_ERRORS = (errno.ENODEV, errno.ENOENT, errno.ENXIO, errno.ESTALE, errno.EBADF, errno.ESRCH)
+
+
+def is_per_process_path(file_path):
+    """
+    /proc/<pid>/... and /proc/self/... files, never cached: pids come and go and get reused,
+    a cached descriptor would keep reading the dead task instead of the new one
+    """
+    _, separator, rest = file_path.partition('/proc/')
+    if not separator: return False
+    name = rest.split('/', 1)[0]
+    return name.isdigit() or name in ('self', 'thread-self')
+
+
+def default_max_handles():
+    """
+    descriptors kept by the handle cache: a tick re-reads a fixed set of /proc and /sys files
+    plus a few per CPU (cpufreq), capped at half of the open file limit
+    """
+    soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    working_set = 64 + 2 * (os.cpu_count() or 1)
+    if soft_limit == resource.RLIM_INFINITY:
+        return working_set
+    return max(16, min(working_set, soft_limit // 2))
+
+
+class CachedFileReader:
+    """
+    keeps descriptors of hot /proc and /sys files open between reads
+    every read re-reads the file from offset 0 with pread into a per-thread buffer,
+    so a sampling loop doesn't pay an open/close pair per file per tick
+    the lock only guards the descriptor table, parallel probes read at the same time
+    """
+
+    def __init__(self, max_handles=None, buffer_size=4096):
+        self.max_handles = max_handles or default_max_handles()
+        self.buffer_size = buffer_size
+        self._handles = collections.OrderedDict()
+        # {fd: readers} of descriptors being read outside the lock,
+        # an evicted descriptor is only closed once its last reader is done
+        self._readers = collections.Counter()
+        self._evicted = set()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _close(self, fd):
+        if self._readers[fd]:
+            self._evicted.add(fd)
+            return
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+    def _acquire(self, file_path):
+        """
+        returns a cached descriptor marked as being read, opening it (and evicting the least recently used) if needed
+        """
+        with self._lock:
+            fd = self._handles.get(file_path)
+            if fd is not None:
+                self._handles.move_to_end(file_path)
+            else:
+                fd = os.open(file_path, os.O_RDONLY | os.O_CLOEXEC)
+                self._handles[file_path] = fd
+
+                if len(self._handles) > self.max_handles:
+                    _, old_fd = self._handles.popitem(last=False)
+                    self._close(old_fd)
+
+            self._readers[fd] += 1
+            return fd
+
+    def _release(self, file_path, fd, failed=False):
+        with self._lock:
+            self._readers[fd] -= 1
+            if not self._readers[fd]:
+                del self._readers[fd]
+
+            # a descriptor that failed once is never trusted again
+            if failed and self._handles.get(file_path) == fd:
+                del self._handles[file_path]
+                self._close(fd)
+            elif fd in self._evicted and not self._readers[fd]:
+                self._evicted.discard(fd)
+                self._close(fd)
+
+    def _pread_all(self, fd):
+        """
+        reads the whole file from offset 0, growing the buffer of this thread when it is too small
+        """
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = bytearray(self.buffer_size)
+
+        total = 0
+        while True:
+            with memoryview(buffer) as view:
+                count = os.preadv(fd, [view[total:]], total)
+            if count == 0: break
+
+            total += count
+            if total == len(buffer):
+                buffer.extend(bytes(len(buffer)))
+
+        return buffer[:total].decode(errors='replace')
+
+    def read(self, file_path):
+        """
+        reads contents of a file through the descriptor cache
+        raises FileNotFoundError if file doesn't exists (caller must handle it)
+        """
+        if is_per_process_path(file_path):
+            with open(file_path, "r") as f:
+                return f.read()
+
+        for attempt in range(2):
+            fd = self._acquire(file_path)
+            try:
+                content = self._pread_all(fd)
+            except OSError as e:
+                self._release(file_path, fd, failed=True)
+                # the device behind the cached descriptor disappeared,
+                # retry once in case the path was recreated
+                if attempt == 0 and e.errno in STALE_HANDLE_ERRORS: continue
+                raise
+
+            self._release(file_path, fd)
+            return content
+
+    def close(self):
+        """
+        closes every cached descriptor, descriptors being read are closed by their last reader
+        """
+        with self._lock:
+            while self._handles:
+                _, fd = self._handles.popitem(last=False)
+                self._close(fd)
+
+
+# shared reader used by read_file once enabled (None = plain open/read/close)
+_file_cache = None
+
+# directory every absolute host path is resolved under ("/" = the live system)
+_root = '/'
+
+# {host path: content} of every file read while a snapshot is recorded (None = not recording)
+_recorded = None
+
+
+def set_root(path):
+    """
+    resolves every host path read by the probes under `path` instead of "/"
+    (a host /proc mounted into a container, or an extracted snapshot)
+    """
+    global _root
+    _root = os.path.abspath(path) if path else '/'
+
+
+def get_root():
+    return _root
+
+
+def host_path(path):
+    """
+    maps an absolute host path under the configured root ("/proc/cpuinfo" -> "/host/proc/cpuinfo")
+    probes keep using host paths and only map them right before touching the filesystem
+    """
+    if _root == '/':
+        return path
+    return os.path.join(_root, path.lstrip('/'))
+
+
+def start_recording():
+    """
+    starts keeping the content of every file read, for snapshots
+    """
+    global _recorded
+    _recorded = {}
+
+
+def stop_recording():
+    """
+    stops recording, returns {host path: content}
+    """
+    global _recorded
+    recorded, _recorded = _recorded, None
+    return recorded or {}
+
+
+def is_recording():
+    return _recorded is not None
+
+
+def record_file(file_path, content):
+    """
+    adds content that wasn't read through read_file (the kernel log device) to the snapshot being recorded
+    """
+    if _recorded is not None:
+        _recorded[file_path] = content
+
+
+def enable_handle_cache(max_handles=None):
+    """
+    makes read_file keep descriptors open between calls (used by sampling loops)
+    the default size holds the per CPU files of a tick, see default_max_handles
+    """
+    global _file_cache
+    if _file_cache is None:
+        _file_cache = CachedFileReader(max_handles=max_handles)
+    return _file_cache
+
+
+def disable_handle_cache():
+    """
+    closes cached descriptors and restores plain reads
+    """
+    global _file_cache
+    if _file_cache is not None:
+        _file_cache.close()
+        _file_cache = None
+
 
 def read_file(file_path):
     """
     reads contents of a file
     raises FileNotFound if file doesn't exists (caller must handle it)
     """
-    with open(file_path, "r") as f:
-        content = f.read()
+    if perf.collector is None:
+        return _read_file(file_path)
+
+    counters = perf.current()
+    started = time.perf_counter()
+    try:
+        content = _read_file(file_path)
+    except OSError:
+        counters.add_read(file_path, None, None)
+        raise
+    counters.add_read(file_path, len(content), time.perf_counter() - started)
+    return content
+
+def _read_file(file_path):
+    if _file_cache is not None:
+        content = _file_cache.read(host_path(file_path))
+    else:
+        with open(host_path(file_path), "r") as f:
+            content = f.read()
+
+    if _recorded is not None:
+        _recorded[file_path] = content
     return content
 
-def run_command(command_list):
+def read_files(file_paths, buffer_size=4096):
     """
-    runs a shell command using subprocess
-    returns stdout string if succesfull, none otherwise
+    reads many small files (sysfs attributes) in one sweep through a single reusable buffer
+    sysfs attributes never exceed a page, so one read per file is enough
+    returns a list with the content of every file, None for missing/unreadable ones
     """
-    output = subprocess.run(command_list, capture_output=True, text=True)
-    if output.returncode == 0:
-        return output.stdout
+    contents = []
+    buffer = bytearray(buffer_size)
+    counters = perf.current() if perf.collector is not None else None
+
+    with memoryview(buffer) as view:
+        for file_path in file_paths:
+            if counters is not None:
+                started = time.perf_counter()
+            try:
+                fd = os.open(host_path(file_path), os.O_RDONLY | os.O_CLOEXEC)
+            except OSError:
+                contents.append(None)
+                if counters is not None: counters.add_read(file_path, None, None)
+                continue
+
+            try:
+                count = os.readv(fd, [view])
+                contents.append(buffer[:count].decode(errors='replace'))
+                if _recorded is not None:
+                    _recorded[file_path] = contents[-1]
+            except OSError:
+                count = None
+                contents.append(None)
+            finally:
+                os.close(fd)
+
+            if counters is not None:
+                counters.add_read(file_path, count, time.perf_counter() - started if count is not None else None)
+
+    return contents
+
+def iter_lines(file_path):
+    """
+    yields the lines of a file one at a time, so callers can stop early
+    raises FileNotFound if file doesn't exists (caller must handle it)
+    """
+    if _recorded is not None:
+        # a snapshot needs the whole file, even if the caller stops early
+        yield from read_file(file_path).split("\n")
+        return
+
+    with open(host_path(file_path), "r") as f:
+        if perf.collector is None:
+            for line in f:
+                yield line.rstrip("\n")
+            return
+
+        # time spent here is mostly the caller's parsing, so only the volume is counted
+        counters = perf.current()
+        size = 0
+        try:
+            for line in f:
+                size += len(line)
+                yield line.rstrip("\n")
+        finally:
+            counters.add_read(file_path, size, None)
+
+def read_boot_id():
+    """
+    returns the current boot id or None if the kernel doesn't expose it
+    """
+    try:
+        return read_file(BOOT_ID_PATH).strip() or None
+    except Exception:
+        return None
+
+def run_command(command_list, timeout=None, max_bytes=None):
+    """
+    runs a command with a deadline and a cap on captured output (see src/core/commands.py)
+    returns stdout string if succesfull (possibly cut at max_bytes), none otherwise
+    raises FileNotFoundError if the command doesn't exist
+    """
+    # commands always describe the live system, not the configured root
+    if _root != '/':
+        return None
+
+    # imported here, most runs never fall back to a command and asyncio is slow to import
+    import asyncio
+    from src.core import commands
+
+    run = commands.run_command_async(command_list, timeout or commands.DEFAULT_TIMEOUT,
+                                     max_bytes or commands.DEFAULT_MAX_BYTES)
+    if perf.collector is None:
+        result = asyncio.run(run)
+    else:
+        started = time.perf_counter()
+        try:
+            result = asyncio.run(run)
+        finally:
+            perf.current().add_command(time.perf_counter() - started)
+
+    if result.timed_out:
+        return None
+    if result.returncode == 0 or result.truncated:
+        return result.stdout
     return None
+
+
+def iter_command_lines(command_list, timeout=None, max_bytes=None):
+    """
+    yields the stdout lines of a command as it produces them, stops at the deadline or byte cap
+    raises FileNotFoundError if the command doesn't exist
+    """
+    if _root != '/':
+        return iter(())
+
+    from src.core import commands
+    return iter(commands.CommandLines(command_list, timeout or commands.DEFAULT_TIMEOUT,
+                                      max_bytes or commands.DEFAULT_MAX_BYTES))
@@ -3,6 +3,10 @@ class Probe:
     base interface for all hardware probes
     """
 
+    # seconds the static part of the probe output may be served from cache
+    # None means the probe is volatile and always measured
+    cache_ttl = None
+
     def __init__(self):
         self.data = {}
 
@@ -12,4 +16,21 @@ class Probe:
         must be implemented by child classes
         """
         raise NotImplementedError('Subclasses must implement run_probe()')
-    
\ No newline at end of file
+
+    def cache_key(self, name):
+        """
+        key of the static cache entry, probes with options changing their output extend it
+        """
+        return name
+
+    def run_static(self):
+        """
+        returns the cacheable part of the probe output
+        """
+        return self.run_probe()
+
+    def run_volatile(self, static_data):
+        """
+        adds freshly measured data on top of (possibly cached) static data
+        """
+        return static_data
@@ -0,0 +1,145 @@
+import fnmatch
+import os
+from concurrent.futures import ThreadPoolExecutor
+from src.core import perf
+from src.core.utils import host_path, read_file
+from .base import Probe
+from .memory import parse_pressure
+
+CGROUP_PATH = '/sys/fs/cgroup'
+
+# files read for every cgroup, missing ones (controller not enabled) are skipped
+PRESSURE_FILES = ('cpu.pressure', 'memory.pressure', 'io.pressure')
+
+
+def parse_flat_keyed(content):
+    """
+    parses "key value" lines (cpu.stat, memory.stat)
+    """
+    values = {}
+    for line in content.split("\n"):
+        key, _, value = line.partition(' ')
+        if value.strip().isdigit():
+            values[key] = int(value)
+    return values
+
+
+def parse_io_stat(content):
+    """
+    parses io.stat
+    example line: "8:0 rbytes=90112 wbytes=0 rios=3 wios=0 dbytes=0 dios=0"
+    """
+    devices = {}
+    for line in content.split("\n"):
+        parts = line.split()
+        if not parts: continue
+
+        counters = {}
+        for item in parts[1:]:
+            key, _, value = item.partition('=')
+            if value.isdigit():
+                counters[key] = int(value)
+        devices[parts[0]] = counters
+    return devices
+
+
+class CgroupProbe(Probe):
+    def __init__(self, max_depth=2, path_filter=None, workers=8):
+        super().__init__()
+        # levels below the root that are walked (0 = root only)
+        self.max_depth = max_depth
+        # glob patterns matched against the cgroup path (e.g. "/system.slice/*")
+        self.path_filter = path_filter or []
+        self.workers = workers
+
+    def _find_root(self):
+        """
+        returns (cgroup v2 mount, enabled controllers), hybrid systems mount it under "unified"
+        """
+        for path in (CGROUP_PATH, os.path.join(CGROUP_PATH, 'unified')):
+            controllers = self._read(path, 'cgroup.controllers')
+            if controllers is not None:
+                return path, controllers.split()
+        return None, None
+
+    def _walk(self, root):
+        """
+        lists cgroup paths up to max_depth, relative to root ("/" is the root cgroup)
+        """
+        cgroups = []
+        pending = [('/', root, 0)]
+
+        while pending:
+            name, path, depth = pending.pop()
+            if not self.path_filter or any(fnmatch.fnmatchcase(name, pattern) for pattern in self.path_filter):
+                cgroups.append((name, path))
+            if depth >= self.max_depth: continue
+
+            try:
+                with os.scandir(host_path(path)) as entries:
+                    for entry in entries:
+                        # every sub directory of a cgroup is a child cgroup
+                        if entry.is_dir(follow_symlinks=False):
+                            child = f"{name.rstrip('/')}/{entry.name}"
+                            pending.append((child, os.path.join(path, entry.name), depth + 1))
+            except OSError:
+                # cgroup removed while walking
+                continue
+
+        cgroups.sort()
+        return cgroups
+
+    def _read(self, path, name, parser=None):
+        try:
+            content = read_file(os.path.join(path, name))
+        except OSError:
+            return None
+        return parser(content) if parser else content.strip()
+
+    def _read_cgroup(self, path):
+        """
+        reads the resource accounting files of a single cgroup
+        """
+        memory_current = self._read(path, 'memory.current')
+        memory_max = self._read(path, 'memory.max')
+
+        cgroup_data = {
+            'memory_current': int(memory_current) if memory_current and memory_current.isdigit() else None,
+            # "max" means no limit
+            'memory_max': int(memory_max) if memory_max and memory_max.isdigit() else None,
+            'cpu_stat': self._read(path, 'cpu.stat', parse_flat_keyed),
+            'io_stat': self._read(path, 'io.stat', parse_io_stat),
+            'pressure': {}
+        }
+
+        for name in PRESSURE_FILES:
+            pressure = self._read(path, name, parse_pressure)
+            if pressure is not None:
+                cgroup_data['pressure'][name.split('.')[0]] = pressure
+
+        return cgroup_data
+
+    def run_probe(self):
+        """
+        walks the cgroup v2 tree and collects memory, cpu, io and pressure accounting
+        files are read on a thread pool so large trees fit in a sampling interval
+        """
+        try:
+            root, controllers = self._find_root()
+            if root is None:
+                return {'error': 'cgroup v2 hierarchy not found'}
+
+            cgroups = self._walk(root)
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = executor.map(perf.bind(self._read_cgroup), [path for _, path in cgroups])
+                cgroup_data = {name: data for (name, _), data in zip(cgroups, results)}
+
+            return {
+                'root': root,
+                'controllers': controllers,
+                'count': len(cgroup_data),
+                'cgroups': cgroup_data
+            }
+
+        except Exception as e:
+            return {'error': f'Cgroup Probe error: {str(e)}'}
@@ -1,11 +1,72 @@
-from src.core.utils import read_file
+import array
+import os
+import time
+from src.core.utils import host_path, iter_lines, read_file
 from .base import Probe
 
+CPU_SYSFS_PATH = '/sys/devices/system/cpu'
+
+# /proc/stat cpu columns used for utilization (guest time is already part of user)
+STAT_FIELDS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal')
+
+
+class CpuTimes:
+    """
+    one /proc/stat snapshot, the counters of every cpu are kept in a single flat array
+    (len(names) * len(STAT_FIELDS) unsigned ints) so 256 thread hosts stay cheap
+    """
+    __slots__ = ('names', 'counters', 'taken_at')
+
+    def __init__(self, names, counters, taken_at):
+        self.names = names
+        self.counters = counters
+        self.taken_at = taken_at
+
+    @classmethod
+    def parse(cls, content, taken_at=None):
+        """
+        parses the cpu lines of /proc/stat
+        example line: "cpu0 3501 0 876 68280 201 0 3 2695 0 0"
+        """
+        names = []
+        counters = array.array('Q')
+        width = len(STAT_FIELDS)
+
+        for line in content.split("\n"):
+            # cpu lines come first, stop at "intr"
+            if not line.startswith('cpu'):
+                if names: break
+                continue
+
+            parts = line.split()
+            values = [int(value) for value in parts[1:width + 1]]
+            # old kernels don't report steal
+            values.extend([0] * (width - len(values)))
+
+            names.append(parts[0])
+            counters.extend(values)
+
+        return cls(names, counters, taken_at if taken_at is not None else time.monotonic())
+
+
 class CpuProbe(Probe):
-    
+    # model and topology only change with a reboot
+    cache_ttl = 24 * 60 * 60
+
+    def __init__(self, sample_interval=None, full_topology=False):
+        super().__init__()
+        # aggregate sockets/cores/threads across every processor block
+        self.full_topology = full_topology
+        # seconds between the two /proc/stat snapshots, None disables load sampling
+        self.sample_interval = sample_interval
+        # last snapshot, reused as the start of the next sample when the probe is kept alive
+        self._last_times = None
+
     def _parse_cpu_data(self, content):
         """
-        parses /proc/cpuinfo content strings into a dict
+        parses /proc/cpuinfo content into a dict
+        content is an iterable of lines (or a string), identity fields come from
+        the first processor block and parsing stops at its end unless full topology is requested
         """
 
         # init a cpu_data
@@ -18,12 +79,27 @@ class CpuProbe(Probe):
                 'cpu_model': 'Unknown',
                 'cache': 'Unknown'
         }
-        # parse the logical thread and check error
-        cpu_groups = content.strip().split("\n\n")
-        if not cpu_groups: return
+        if isinstance(content, str):
+            content = content.split("\n")
+
+        seen_line = False
+        first_block = True
+
+        # full topology aggregation across every block
+        processors = 0
+        package = None
+        packages = set()
+        cores = set()
+
+        for line in content:
+            # blocks are separated by blank lines, skip leading ones
+            if not line.strip():
+                if seen_line and first_block:
+                    first_block = False
+                    if not self.full_topology: break
+                continue
+            seen_line = True
 
-        # just take the first logical thread
-        for line in cpu_groups[0].split("\n"):
             if ": " not in line: continue
 
             # extract the value of each line 
@@ -32,6 +108,18 @@ class CpuProbe(Probe):
             value = value.strip()
             key = key.strip()
 
+            if self.full_topology:
+                if key == 'processor':
+                    processors += 1
+                    package = None
+                elif key == 'physical id':
+                    package = value
+                    packages.add(value)
+                elif key == 'core id':
+                    cores.add((package, value))
+
+            # only the first logical thread is used for identity
+            if not first_block: continue
 
             # save each value in their respective position
             if 'vendor_id' in key:
@@ -63,23 +151,162 @@ class CpuProbe(Probe):
                     cpu_data['cpu_family'] = int(value)
                     
 
-            elif 'flags' in key:
-                if 'svm' in value or 'vmx' in value:
+            # exact key, "vmx flags" lists VMX features, not cpu flags
+            elif key == 'flags':
+                flags = set(value.split())
+                if 'svm' in flags or 'vmx' in flags:
                     cpu_data['virtualization_support'] = True
+
+        if not seen_line:
+            return None
+
+        if self.full_topology:
+            if packages:
+                cpu_data['topology'].update({
+                    'sockets': len(packages),
+                    'cores': len(cores),
+                    'threads': processors,
+                    'source': 'cpuinfo'
+                })
+            else:
+                # no physical id in cpuinfo (many VMs and ARM), use sysfs topology
+                cpu_data['topology'].update(self._read_sysfs_topology())
                 
         return cpu_data        
 
-    def run_probe(self):
+    def _read_sysfs_topology(self):
         """
-        main execution method for the CPU probe
-        returns a dictionary with data or error
+        counts sockets, cores and threads from /sys/devices/system/cpu/cpu*/topology
+        """
+        packages = set()
+        cores = set()
+        threads = 0
+
+        for entry in os.listdir(host_path(CPU_SYSFS_PATH)):
+            if not (entry.startswith('cpu') and entry[3:].isdigit()): continue
+
+            base_path = f'{CPU_SYSFS_PATH}/{entry}/topology'
+            try:
+                package = read_file(f'{base_path}/physical_package_id').strip()
+                core = read_file(f'{base_path}/core_id').strip()
+            except OSError:
+                # offline cpus have no topology directory
+                continue
+
+            threads += 1
+            packages.add(package)
+            cores.add((package, core))
+
+        return {'sockets': len(packages), 'cores': len(cores), 'threads': threads, 'source': 'sysfs'}
+
+    def _read_times(self):
+        return CpuTimes.parse(read_file('/proc/stat'))
+
+    def _compute_utilization(self, before, after):
+        """
+        computes per-core and aggregate utilization percentages from two snapshots
+        per core values are returned column-wise, one list per field
+        """
+        width = len(STAT_FIELDS)
+        idle_index = STAT_FIELDS.index('idle')
+        iowait_index = STAT_FIELDS.index('iowait')
+        previous = dict(zip(before.names, range(len(before.names))))
+
+        total = None
+        per_core = {'cpu': []}
+        for field in STAT_FIELDS + ('busy',):
+            per_core[field] = []
+
+        for index, name in enumerate(after.names):
+            # cpus hotplugged between snapshots have no baseline
+            if name not in previous: continue
+
+            start = previous[name] * width
+            end = index * width
+            deltas = [after.counters[end + i] - before.counters[start + i] for i in range(width)]
+            elapsed = sum(deltas)
+
+            if elapsed > 0:
+                shares = [round(delta * 100 / elapsed, 2) for delta in deltas]
+                busy = round((elapsed - deltas[idle_index] - deltas[iowait_index]) * 100 / elapsed, 2)
+            else:
+                shares = [0.0] * width
+                busy = 0.0
+
+            row = dict(zip(STAT_FIELDS, shares))
+            row['busy'] = busy
+
+            # aggregate "cpu" line
+            if name == 'cpu':
+                total = row
+                continue
+
+            per_core['cpu'].append(int(name[3:]))
+            for field, value in row.items():
+                per_core[field].append(value)
+
+        return {
+            'interval': round(after.taken_at - before.taken_at, 3),
+            'total': total,
+            'per_core': per_core
+        }
+
+    def _read_frequencies(self):
+        """
+        reads the current frequency of every cpu from cpufreq (kHz), returns MHz values
+        returns None when cpufreq isn't available (VMs, containers)
         """
         try:
-            content = read_file('/proc/cpuinfo')
-            if not content:
+            entries = os.listdir(host_path(CPU_SYSFS_PATH))
+        except OSError:
+            return None
+
+        cpus = sorted(int(entry[3:]) for entry in entries if entry.startswith('cpu') and entry[3:].isdigit())
+        frequencies = {'cpu': [], 'mhz': []}
+        for cpu in cpus:
+            try:
+                khz = int(read_file(f'{CPU_SYSFS_PATH}/cpu{cpu}/cpufreq/scaling_cur_freq').strip())
+            except (OSError, ValueError):
+                continue
+            frequencies['cpu'].append(cpu)
+            frequencies['mhz'].append(round(khz / 1000, 1))
+
+        if not frequencies['mhz']:
+            return None
+
+        mhz = frequencies['mhz']
+        frequencies['min'] = min(mhz)
+        frequencies['max'] = max(mhz)
+        frequencies['avg'] = round(sum(mhz) / len(mhz), 1)
+        return frequencies
+
+    def sample_utilization(self):
+        """
+        samples per-core utilization over `sample_interval` seconds
+        a probe kept alive (watch mode) measures since its previous sample instead of sleeping
+        """
+        before = self._last_times
+        if before is None:
+            before = self._read_times()
+            time.sleep(self.sample_interval)
+
+        after = self._read_times()
+        self._last_times = after
+        return self._compute_utilization(before, after)
+
+    def cache_key(self, name):
+        return f'{name}:full' if self.full_topology else name
+
+    def run_static(self):
+        """
+        returns model and topology data from /proc/cpuinfo
+        """
+        try:
+            # streamed, so the kernel only generates the blocks we actually read
+            cpu_data = self._parse_cpu_data(iter_lines('/proc/cpuinfo'))
+            if cpu_data is None:
                 return {'error': 'cpuinfo is empty'}
-            
-            cpu_data = self._parse_cpu_data(content)
+
             return cpu_data
 
         # if /proc/cpuinfo doesn't exist
@@ -88,4 +315,26 @@ class CpuProbe(Probe):
 
         # any unknown exception
         except Exception as e:
-            return {'error': f'Cpu Probe error: {str(e)}'}
\ No newline at end of file
+            return {'error': f'Cpu Probe error: {str(e)}'}
+
+    def run_volatile(self, static_data):
+        """
+        adds load and frequency samples when sampling is enabled
+        """
+        if self.sample_interval is None or 'error' in static_data:
+            return static_data
+
+        cpu_data = dict(static_data)
+        try:
+            cpu_data['utilization'] = self.sample_utilization()
+        except Exception as e:
+            cpu_data['utilization'] = {'error': f'/proc/stat sampling error: {str(e)}'}
+        cpu_data['frequency'] = self._read_frequencies()
+        return cpu_data
+
+    def run_probe(self):
+        """
+        main execution method for the CPU probe
+        returns a dictionary with data or error
+        """
+        return self.run_volatile(self.run_static())
\ No newline at end of file
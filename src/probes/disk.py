@@ -1,66 +1,211 @@
+import array
 import os
+import time
 import decimal
-from src.core.utils import read_file
+from concurrent.futures import ThreadPoolExecutor
+from src.core import perf
+from src.core.utils import host_path, read_file, read_files
 from .base import Probe
 
+# device/model reads per thread when collecting large disk sets
+MODEL_READ_BATCH = 32
+MODEL_READ_WORKERS = 8
+
+# /proc/diskstats columns (after major, minor and name) used for I/O sampling
+# sectors are always 512 bytes, times are in milliseconds
+DISKSTAT_FIELDS = ('reads', 'reads_merged', 'sectors_read', 'read_ms',
+                   'writes', 'writes_merged', 'sectors_written', 'write_ms',
+                   'in_flight', 'io_ticks', 'time_in_queue')
+
+
+class DiskStats:
+    """
+    one /proc/diskstats snapshot stored column-wise, one array per counter,
+    so rates for hundreds of devices are computed with a single pass per column
+    """
+    __slots__ = ('names', 'columns', 'taken_at')
+
+    def __init__(self, names, columns, taken_at):
+        self.names = names
+        self.columns = columns
+        self.taken_at = taken_at
+
+    @classmethod
+    def parse(cls, content, taken_at=None):
+        """
+        example line: "   8       0 sda 9650 3012 622574 4213 5280 6210 389104 7891 0 9860 12105 0 0 0 0"
+        """
+        names = []
+        columns = {field: array.array('Q') for field in DISKSTAT_FIELDS}
+        width = len(DISKSTAT_FIELDS)
+
+        for line in content.split("\n"):
+            parts = line.split()
+            if len(parts) < 3 + width: continue
+
+            names.append(parts[2])
+            for field, value in zip(DISKSTAT_FIELDS, parts[3:3 + width]):
+                columns[field].append(int(value))
+
+        return cls(names, columns, taken_at if taken_at is not None else time.monotonic())
+
+
+class DiskColumns:
+    """
+    raw sysfs attributes of every disk stored struct-of-arrays style,
+    turned into per-disk dicts only when the report is emitted
+    """
+    __slots__ = ('names', 'models', 'rotational', 'sizes')
+
+    def __init__(self, names, models, rotational, sizes):
+        self.names = names
+        self.models = models
+        self.rotational = rotational
+        self.sizes = sizes
+
+    def _format_size(self, size_content):
+        """
+        converts a sector count into a "X.XX GB" string
+        """
+        try:
+            disk_size = int(size_content.strip())
+
+            byte_size = disk_size * 512
+
+            base = decimal.Decimal(byte_size)
+            divisor = decimal.Decimal(1024**3)
+
+            gb_size = base / divisor
+            return f'{gb_size:.2f} GB'
+        except Exception:
+            return 'Unknown'
+
+    def to_dict(self):
+        """
+        extracts model, type (SSD/HDD), and size for every disk
+        """
+        disks = {}
+        for name, model, rotational, size in zip(self.names, self.models, self.rotational, self.sizes):
+            disk_data = {'model': 'Unknown', 'type': 'Unknown', 'size': 'Unknown'}
+
+            # if model file not found it will remian unknown
+            if model and model.strip():
+                disk_data['model'] = model.strip()
+
+            # 0 SSD
+            # 1 HDD
+            if rotational:
+                disk_data['type'] = 'SSD' if rotational.strip() == '0' else 'HDD'
+
+            if size:
+                disk_data['size'] = self._format_size(size)
+
+            disks[name] = disk_data
+        return disks
+
+
 class DiskProbe(Probe):
+    def __init__(self, sample_interval=None):
+        super().__init__()
+        # seconds between the two /proc/diskstats snapshots, None disables I/O sampling
+        self.sample_interval = sample_interval
+        # last snapshot, reused as the start of the next sample when the probe is kept alive
+        self._last_stats = None
     
-    def _parse_disk_data(self, disk_name):
+    def collect_columns(self, names):
         """
-        extracts model, type (SSD/HDD), and size for a specific disk
+        batch-reads model, rotational flag and size of every disk in one sweep
         """
-        disk_data = {'model': 'Unknown', 'type': 'Unknown', 'size': 'Unknown'}
-        base_path = f'/sys/block/{disk_name}'
+        base_path = '/sys/block'
 
-        # model reading
-        try:
-            disk_model = read_file(f'{base_path}/device/model')
-            if disk_model:
-                disk_data['model'] = disk_model.strip()
-        except:
-            pass # if model file not found it will remian unknown
-            
-        # type reading
-        try:
-            disk_type = read_file(f'{base_path}/queue/rotational')
-            if disk_type:
-                # 0 SSD
-                # 1 HDD
-                disk_data['type'] = 'SSD' if disk_type.strip() == '0' else 'HDD'
-        except:
-            pass
+        rotational = read_files([f'{base_path}/{name}/queue/rotational' for name in names])
+        sizes = read_files([f'{base_path}/{name}/size' for name in names])
 
+        # device/model goes through the SCSI layer and can be slow on SAS,
+        # so large sets are split across threads, each with its own buffer
+        model_paths = [f'{base_path}/{name}/device/model' for name in names]
+        if len(model_paths) <= MODEL_READ_BATCH:
+            models = read_files(model_paths)
+        else:
+            batches = [model_paths[i:i + MODEL_READ_BATCH] for i in range(0, len(model_paths), MODEL_READ_BATCH)]
+            models = []
+            with ThreadPoolExecutor(max_workers=min(MODEL_READ_WORKERS, len(batches))) as executor:
+                for batch in executor.map(perf.bind(read_files), batches):
+                    models.extend(batch)
 
-        # size calculation
-        try:
-            size_content = read_file(f'{base_path}/size')
+        return DiskColumns(list(names), models, rotational, sizes)
 
-            if size_content:
-                disk_size = int(size_content.strip())
+    def _read_stats(self):
+        # a single read covers every block device
+        return DiskStats.parse(read_file('/proc/diskstats'))
 
-                byte_size = disk_size * 512
+    def _compute_io(self, before, after):
+        """
+        computes IOPS, throughput, average latency, queue depth and utilization per device
+        returns {device: metrics}
+        """
+        elapsed = after.taken_at - before.taken_at
+        if elapsed <= 0: return {}
+        elapsed_ms = elapsed * 1000
+
+        # align the previous snapshot to the current device order
+        # (devices added between the snapshots have no baseline and are skipped)
+        previous = dict(zip(before.names, range(len(before.names))))
+        indexes = [(index, previous[name]) for index, name in enumerate(after.names) if name in previous]
+
+        def deltas(field):
+            new, old = after.columns[field], before.columns[field]
+            # counters going backwards (32-bit wrap on older kernels, device re-registered
+            # under the same name) would give negative rates
+            return [max(new[i] - old[j], 0) for i, j in indexes]
 
-                base = decimal.Decimal(byte_size)
-                divisor = decimal.Decimal(1024**3)
+        reads, writes = deltas('reads'), deltas('writes')
+        sectors_read, sectors_written = deltas('sectors_read'), deltas('sectors_written')
+        read_ms, write_ms = deltas('read_ms'), deltas('write_ms')
+        io_ticks, time_in_queue = deltas('io_ticks'), deltas('time_in_queue')
+        in_flight = after.columns['in_flight']
 
-                gb_size = base / divisor
-                disk_data['size'] = f'{gb_size:.2f} GB'
-        except:
-            disk_data['size'] = 'Unknown'
-        return disk_data
+        io_data = {}
+        for k, (index, _) in enumerate(indexes):
+            io_data[after.names[index]] = {
+                'read_iops': round(reads[k] / elapsed, 2),
+                'write_iops': round(writes[k] / elapsed, 2),
+                'read_bytes_per_sec': round(sectors_read[k] * 512 / elapsed),
+                'write_bytes_per_sec': round(sectors_written[k] * 512 / elapsed),
+                'read_latency_ms': round(read_ms[k] / reads[k], 3) if reads[k] else 0.0,
+                'write_latency_ms': round(write_ms[k] / writes[k], 3) if writes[k] else 0.0,
+                'queue_depth': round(time_in_queue[k] / elapsed_ms, 2),
+                'in_flight': in_flight[index],
+                'utilization': round(min(io_ticks[k] * 100 / elapsed_ms, 100.0), 2)
+            }
+        return io_data
+
+    def sample_io(self):
+        """
+        samples I/O activity of every block device over `sample_interval` seconds
+        a probe kept alive (watch mode) measures since its previous sample instead of sleeping
+        """
+        before = self._last_stats
+        if before is None:
+            before = self._read_stats()
+            time.sleep(self.sample_interval)
+
+        after = self._read_stats()
+        self._last_stats = after
+        return self._compute_io(before, after)
 
     def run_probe(self):
         """
         scans /sys/block, filters virtual disks, and probes physical ones.
         """
-        disks = {}
         block_path = '/sys/block'
 
         try:
-            if not os.path.exists(block_path):
+            if not os.path.exists(host_path(block_path)):
                 return {'error': '/sys/block not found'}
 
-            for block in os.listdir(block_path):
+            names = []
+            for block in os.listdir(host_path(block_path)):
                 # loop (virtual disk)
                 # ram (ram disk)
                 # sr (CD-ROM)
@@ -68,7 +213,20 @@ class DiskProbe(Probe):
                 if (block.startswith('loop')) or (block.startswith('ram')) or (block.startswith('sr')):
                     continue
 
-                disks[block] = self._parse_disk_data(block)
+                names.append(block)
+
+            disks = self.collect_columns(names).to_dict()
+
+            if self.sample_interval is not None and disks:
+                try:
+                    io_data = self.sample_io()
+                except Exception as e:
+                    io_data = {}
+                    for disk in disks:
+                        io_data[disk] = {'error': f'/proc/diskstats sampling error: {str(e)}'}
+
+                for disk, disk_data in disks.items():
+                    disk_data['io'] = io_data.get(disk)
             
             return disks
 
@@ -1,7 +1,33 @@
-from src.core.utils import run_command
+import os
+from src.core.ids import PCI_IDS
+from src.core.utils import host_path, read_file, run_command
 from .base import Probe
 
+PCI_DEVICES_PATH = '/sys/bus/pci/devices'
+
+# PCI base class 0x03: display controllers (VGA, XGA, 3D)
+DISPLAY_CLASS = 0x03
+
+
+def _short_vendor(full_name):
+    """
+    first word of the vendor name, 'Advanced Micro Devices' becomes AMD
+    """
+    parts = full_name.split()
+    vendor = parts[0] if parts else 'Unknown'
+    if vendor == 'Advanced':
+        vendor = 'AMD'
+    return vendor
+
+
 class GpuProbe(Probe):
+    # GPU inventory only changes with a reboot
+    cache_ttl = 24 * 60 * 60
+
+    def __init__(self, pci_ids=None):
+        super().__init__()
+        self.pci_ids = pci_ids or PCI_IDS
+
     def _parse_gpu_data(self, content):
         gpus = []
 
@@ -10,14 +36,69 @@ class GpuProbe(Probe):
                 parts = line.split(':', 2)
                 if len(parts) > 2:
                     full_name = parts[2].strip()
-                    vendor = full_name.split()[0]
-                    if vendor == 'Advanced':
-                        vendor = 'AMD'
-                    gpus.append({'model': full_name, 'vendor': vendor})
+                    gpus.append({'model': full_name, 'vendor': _short_vendor(full_name)})
+        return gpus
+
+    def _read_pci_device(self, slot):
+        """
+        reads a single sysfs PCI device, returns None if it isn't a display controller
+        """
+        base_path = os.path.join(PCI_DEVICES_PATH, slot)
+
+        # class file example: "0x030000"
+        pci_class = int(read_file(f'{base_path}/class').strip(), 16)
+        if pci_class >> 16 != DISPLAY_CLASS:
+            return None
+
+        vendor_id = read_file(f'{base_path}/vendor').strip().lower().replace('0x', '')
+        device_id = read_file(f'{base_path}/device').strip().lower().replace('0x', '')
+
+        vendor_name = self.pci_ids.vendor_name(vendor_id) or f'Unknown vendor {vendor_id}'
+        device_name = self.pci_ids.device_name(vendor_id, device_id) or f'Device {device_id}'
+        full_name = f'{vendor_name} {device_name}'
+
+        # append the revision like lspci does
+        try:
+            revision = read_file(f'{base_path}/revision').strip().lower().replace('0x', '')
+            if revision and revision != '00':
+                full_name = f'{full_name} (rev {revision})'
+        except Exception:
+            pass
+
+        return {
+            'model': full_name,
+            'vendor': _short_vendor(vendor_name),
+            'vendor_id': vendor_id,
+            'device_id': device_id,
+            'pci_slot': slot
+        }
+
+    def _scan_sysfs(self):
+        """
+        scans /sys/bus/pci/devices for display class devices
+        returns None if sysfs is not available
+        """
+        if not os.path.isdir(host_path(PCI_DEVICES_PATH)):
+            return None
+
+        gpus = []
+        for slot in sorted(os.listdir(host_path(PCI_DEVICES_PATH))):
+            try:
+                gpu = self._read_pci_device(slot)
+            except (OSError, ValueError):
+                # device removed while scanning or unreadable attributes
+                continue
+            if gpu:
+                gpus.append(gpu)
         return gpus
     
     def run_probe(self):
         try:
+            gpus = self._scan_sysfs()
+            if gpus is not None:
+                return gpus
+
+            # no sysfs (e.g. restricted containers), fall back to lspci
             content = run_command(['lspci'])
             if not content:
                 return [{'error': 'lspci failed'}]
@@ -27,4 +108,4 @@ class GpuProbe(Probe):
         except FileNotFoundError:
             return [{'GPU Probe error': 'lspci not found'}]
         except Exception as e:
-            return [{'GPU Probe error': str(e)}]
\ No newline at end of file
+            return [{'GPU Probe error': str(e)}]
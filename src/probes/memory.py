@@ -1,9 +1,64 @@
-import decimal
 from src.core.utils import read_file
 from .base import Probe
 
+# /proc/vmstat paging counters reported in raw mode
+VMSTAT_FIELDS = ('pgpgin', 'pgpgout', 'pswpin', 'pswpout', 'pgfault', 'pgmajfault',
+                 'pgscan_kswapd', 'pgscan_direct', 'pgsteal_kswapd', 'pgsteal_direct', 'oom_kill')
+
+
+def parse_meminfo(content):
+    """
+    parses /proc/meminfo into {field: int}
+    values are in kB, except HugePages_* which are page counts
+    """
+    meminfo = {}
+    for line in content.split("\n"):
+        key, separator, value = line.partition(':')
+        if not separator: continue
+
+        parts = value.split()
+        if parts and parts[0].isdigit():
+            meminfo[key.strip()] = int(parts[0])
+    return meminfo
+
+
+def parse_pressure(content):
+    """
+    parses a /proc/pressure/* file
+    example line: "some avg10=0.00 avg60=0.00 avg300=0.00 total=0"
+    """
+    pressure = {}
+    for line in content.split("\n"):
+        parts = line.split()
+        if not parts: continue
+
+        values = {}
+        for item in parts[1:]:
+            key, _, value = item.partition('=')
+            try:
+                values[key] = int(value) if key == 'total' else float(value)
+            except ValueError:
+                continue
+        pressure[parts[0]] = values
+    return pressure
+
+
+def format_kb(kb):
+    """
+    formats a kB value as "X.XX GB", rounding half to even with integer math only
+    """
+    hundredths, remainder = divmod(kb * 100, 1024 * 1024)
+    if remainder * 2 > 1024 * 1024 or (remainder * 2 == 1024 * 1024 and hundredths % 2):
+        hundredths += 1
+    return f"{hundredths // 100}.{hundredths % 100:02d} GB"
+
 
 class MemoryProbe(Probe):
+    def __init__(self, raw=False):
+        super().__init__()
+        # raw: report every counter as an integer instead of the formatted summary
+        self.raw = raw
+
     def _map_memory_key(self, key):
         """Helper to standardize memory keys."""
         if key == 'MemTotal': return 'mem_total'
@@ -11,32 +66,46 @@ class MemoryProbe(Probe):
         elif key == 'SwapTotal': return 'swap_total'
         return key.lower()
 
-    def _parse_memory_data(self, content):
+    def format_memory(self, meminfo):
         """
-        parses /proc/meminfo content
+        presentation step: human readable summary of the raw meminfo counters
         """
         mem_data = {}
+        for key in ['MemTotal','MemAvailable', 'SwapTotal']:
+            if key in meminfo:
+                mem_data[self._map_memory_key(key)] = format_kb(meminfo[key])
+        return mem_data
 
-        for line in content.split("\n"):
-            if ": " not in line: continue
-
-            # Parsing
-            key,value = line.split(":",1)
-            value = value.strip()
-            key = key.strip()
-
-            if key in ['MemTotal','MemAvailable', 'SwapTotal']:
-                clean_value = value.split("kB")[0].strip()
-
-                base = decimal.Decimal(int(clean_value))
-                divisor = decimal.Decimal(1024*1024)
-
-                result_gb = base / divisor
+    def _parse_memory_data(self, content):
+        """
+        parses /proc/meminfo content
+        """
+        return self.format_memory(parse_meminfo(content))
 
+    def _read_pressure(self):
+        """
+        memory pressure stall averages, None on kernels without PSI
+        """
+        try:
+            return parse_pressure(read_file('/proc/pressure/memory'))
+        except (OSError, ValueError):
+            return None
 
-                mem_data[self._map_memory_key(key)] = f"{result_gb:.2f} GB"
+    def _read_vmstat(self):
+        """
+        selected paging counters from /proc/vmstat
+        """
+        try:
+            content = read_file('/proc/vmstat')
+        except OSError:
+            return None
 
-        return mem_data
+        vmstat = {}
+        for line in content.split("\n"):
+            key, _, value = line.partition(' ')
+            if key in VMSTAT_FIELDS and value.strip().isdigit():
+                vmstat[key] = int(value)
+        return vmstat
     
 
     def run_probe(self):
@@ -48,8 +117,15 @@ class MemoryProbe(Probe):
             content = read_file('/proc/meminfo')
             if not content:
                 return {'error': 'meminfo is empty'}
-            
-            return self._parse_memory_data(content)
+
+            if not self.raw:
+                return self._parse_memory_data(content)
+
+            return {
+                'meminfo_kb': parse_meminfo(content),
+                'pressure': self._read_pressure(),
+                'vmstat': self._read_vmstat()
+            }
 
         # if /proc/meminfo doesn't exist
         except FileNotFoundError:
@@ -57,4 +133,4 @@ class MemoryProbe(Probe):
 
         # any unknown exception
         except Exception as e:
-            return {'error': f'Memory Probe Error: {str(e)}'}
\ No newline at end of file
+            return {'error': f'Memory Probe Error: {str(e)}'}
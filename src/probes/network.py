@@ -1,46 +1,249 @@
+import array
+import fnmatch
 import os
-from src.core.utils import read_file
+import time
+from src.core.netlink import LinkMonitor
+from src.core.utils import get_root, host_path, read_file, read_files
 from .base import Probe
 
+NET_DEV_PATH = '/proc/net/dev'
+
+# /proc/net is a link to self/net, the namespace of the reading process,
+# under a mounted host /proc the host namespace is the one of pid 1
+HOST_NET_DEV_PATH = '/proc/1/net/dev'
+
+# /proc/net/dev counters used for rate sampling and their column index
+# (8 receive columns followed by 8 transmit columns)
+NET_DEV_FIELDS = {
+    'rx_bytes': 0, 'rx_packets': 1, 'rx_errors': 2, 'rx_drops': 3,
+    'tx_bytes': 8, 'tx_packets': 9, 'tx_errors': 10, 'tx_drops': 11
+}
+
+
+class NetDevStats:
+    """
+    one /proc/net/dev snapshot stored column-wise, one array per counter
+    """
+    __slots__ = ('names', 'columns', 'taken_at')
+
+    def __init__(self, names, columns, taken_at):
+        self.names = names
+        self.columns = columns
+        self.taken_at = taken_at
+
+    @classmethod
+    def parse(cls, content, taken_at=None):
+        """
+        example line: "  eth0:    2880      43    0    0    0     0          0         0     3873      43 ..."
+        the first two lines are headers
+        """
+        names = []
+        columns = {field: array.array('Q') for field in NET_DEV_FIELDS}
+
+        for line in content.split("\n")[2:]:
+            name, separator, counters = line.partition(':')
+            if not separator: continue
+
+            values = counters.split()
+            if len(values) < 16: continue
+
+            names.append(name.strip())
+            for field, index in NET_DEV_FIELDS.items():
+                columns[field].append(int(values[index]))
+
+        return cls(names, columns, taken_at if taken_at is not None else time.monotonic())
+
+
 class NetworkProbe(Probe):
+    def __init__(self, sample_interval=None, include=None, exclude=None, backend='sysfs'):
+        super().__init__()
+        # seconds between the two /proc/net/dev snapshots, None disables rate sampling
+        self.sample_interval = sample_interval
+        # glob patterns applied to interface names
+        self.include = include or []
+        self.exclude = exclude or []
+        # last snapshot, reused as the start of the next sample when the probe is kept alive
+        self._last_stats = None
+        # 'sysfs' re-reads /sys/class/net on every run
+        # 'netlink' dumps links once and then only applies pushed link events
+        self.backend = backend
+        self._monitor = None
+        # {iface: (operstate, speed and duplex)} read from sysfs by the netlink backend,
+        # re-read only when the link state changes (a renegotiated link goes down and up)
+        self._link_speeds = {}
+
+    def _is_selected(self, iface):
+        # skip the localhost
+        if iface == 'lo': return False
+
+        if self.include and not any(fnmatch.fnmatchcase(iface, pattern) for pattern in self.include):
+            return False
+        return not any(fnmatch.fnmatchcase(iface, pattern) for pattern in self.exclude)
+
+    def _net_dev_path(self):
+        """
+        /proc/net/dev of the probed system: under a custom root with a mounted procfs, /proc/net/dev
+        lists the interfaces of this process (a sidecar container), a snapshot stores it as a plain file
+        """
+        if get_root() != '/' and os.path.islink(host_path('/proc/net')):
+            return HOST_NET_DEV_PATH
+        return NET_DEV_PATH
+
+    def _read_stats(self):
+        # a single read covers every interface, even on hosts with thousands of veths
+        return NetDevStats.parse(read_file(self._net_dev_path()))
+
+    def _compute_rates(self, before, after):
+        """
+        computes per-second counter rates for every interface present in both snapshots
+        returns {iface: rates}
+        """
+        elapsed = after.taken_at - before.taken_at
+        if elapsed <= 0: return {}
+
+        previous = dict(zip(before.names, range(len(before.names))))
+        indexes = [(index, previous[name]) for index, name in enumerate(after.names) if name in previous]
+
+        rates = {after.names[index]: {} for index, _ in indexes}
+        for field in NET_DEV_FIELDS:
+            new, old = after.columns[field], before.columns[field]
+            for index, old_index in indexes:
+                # counters reset when a driver reloads, don't report negative rates
+                delta = max(new[index] - old[old_index], 0)
+                rates[after.names[index]][f'{field}_per_sec'] = round(delta / elapsed, 2)
+        return rates
+
+    def _netlink_links(self):
+        """
+        returns {name: link} from the rtnetlink monitor
+        the monitor stays open, so later runs only apply queued link events
+        """
+        if self._monitor is None:
+            self._monitor = LinkMonitor().open()
+        else:
+            self._monitor.poll()
+        # the monitor keys links by ifindex, so a renamed interface is only listed under its new name
+        return {link['name']: link for link in self._monitor.links.values()}
+
+    def close(self):
+        if self._monitor is not None:
+            self._monitor.close()
+            self._monitor = None
+
+    def follow_link_events(self):
+        """
+        yields link up/down events of the selected interfaces as they are pushed by the kernel
+        """
+        with LinkMonitor() as monitor:
+            for event in monitor.follow():
+                if event['iface'] is None or self._is_selected(event['iface']):
+                    yield event
+
+    def _read_link_attributes(self, net_path, ifaces, names=('speed', 'duplex', 'mtu')):
+        """
+        batch-reads link attributes (speed, duplex and mtu by default) of every interface
+        """
+        attributes = {iface: {} for iface in ifaces}
+        for name in names:
+            values = read_files([os.path.join(net_path, iface, name) for iface in ifaces])
+
+            for iface, value in zip(ifaces, values):
+                value = (value or '').strip()
+                # virtual and down links report -1 or can't be read at all
+                if name == 'speed':
+                    attributes[iface]['speed_mbps'] = int(value) if value.isdigit() else None
+                elif name == 'duplex':
+                    attributes[iface]['duplex'] = value or None
+                else:
+                    attributes[iface][name] = int(value) if value.isdigit() else None
+        return attributes
+
+    def _netlink_link_attributes(self, net_path, links, ifaces):
+        """
+        link attributes for the netlink backend: mtu comes with the link,
+        speed and duplex are only read from sysfs for new links and links whose state changed
+        """
+        changed = [iface for iface in ifaces if self._link_speeds.get(iface, (None,))[0] != links[iface]['state']]
+        if changed:
+            for iface, speeds in self._read_link_attributes(net_path, changed, ('speed', 'duplex')).items():
+                self._link_speeds[iface] = (links[iface]['state'], speeds)
+
+        # forget removed and renamed links
+        selected = set(ifaces)
+        for iface in [iface for iface in self._link_speeds if iface not in selected]:
+            del self._link_speeds[iface]
+
+        return {iface: {**self._link_speeds[iface][1], 'mtu': links[iface]['mtu']} for iface in ifaces}
+
     def run_probe(self):
         """
         main method of the network probe
-        scans /sys/class/net and extracting the mac adress and operation state
+        lists interfaces from /proc/net/dev and extracts the mac adress and operation state from /sys/class/net
+        in sampling mode adds link attributes and per-second counter rates
         returns dict or error
         """
         network_data = {}
         net_path = '/sys/class/net'
-        
+
         try:
-            if not os.path.exists(net_path):
+            if not os.path.exists(host_path(net_path)):
                 return {'error': '/sys/class/net not found'}
 
-            for iface in os.listdir(net_path):
-                # skip the localhost
-                if iface == 'lo': continue 
-                
-                # init interface dict
-                iface_info = {'mac': 'Unknown', 'state': 'Unknown'}
-                
-                # create folder paths
-                mac_path = os.path.join(net_path, iface, 'address')
-                state_path = os.path.join(net_path, iface, 'operstate')
-                
-                # read the mac address files
+            # rtnetlink always reports the live kernel, a custom root is read through sysfs
+            use_netlink = self.backend == 'netlink' and get_root() == '/'
+            if use_netlink:
+                links = self._netlink_links()
+                stats = self._read_stats() if self.sample_interval is not None else None
+                ifaces = [iface for iface in sorted(links, key=lambda name: links[name]['index']) if self._is_selected(iface)]
+
+                for iface in ifaces:
+                    network_data[iface] = {'mac': links[iface]['mac'], 'state': links[iface]['state']}
+
+            else:
                 try:
-                    mac = read_file(mac_path)
-                    if mac: iface_info['mac'] = mac.strip()
-                except: pass
+                    stats = self._read_stats()
+                    ifaces = stats.names
+                except OSError:
+                    # no procfs, walk the sysfs directory instead
+                    stats = None
+                    ifaces = os.listdir(host_path(net_path))
+
+                ifaces = [iface for iface in ifaces if self._is_selected(iface)]
+
+                # one sweep per attribute instead of two opens per interface
+                macs = read_files([os.path.join(net_path, iface, 'address') for iface in ifaces])
+                states = read_files([os.path.join(net_path, iface, 'operstate') for iface in ifaces])
+
+                for iface, mac, state in zip(ifaces, macs, states):
+                    # init interface dict
+                    iface_info = {'mac': 'Unknown', 'state': 'Unknown'}
+                    if mac and mac.strip(): iface_info['mac'] = mac.strip()
+                    if state and state.strip(): iface_info['state'] = state.strip()
+                    network_data[iface] = iface_info
+
+            if self.sample_interval is not None and ifaces:
+                if use_netlink:
+                    link_attributes = self._netlink_link_attributes(net_path, links, ifaces)
+                else:
+                    link_attributes = self._read_link_attributes(net_path, ifaces)
 
-                # read the state files
                 try:
-                    state = read_file(state_path)
-                    if state: iface_info['state'] = state.strip()
-                except: pass
-                
-                network_data[iface] = iface_info
+                    before = self._last_stats or stats
+                    if before is None:
+                        raise OSError(f'{NET_DEV_PATH} not readable')
+                    if self._last_stats is None:
+                        time.sleep(self.sample_interval)
+                    after = self._read_stats()
+                    self._last_stats = after
+                    rates = self._compute_rates(before, after)
+                except Exception as e:
+                    rates = {iface: {'error': f'{NET_DEV_PATH} sampling error: {str(e)}'} for iface in ifaces}
+
+                for iface, iface_info in network_data.items():
+                    iface_info.update(link_attributes[iface])
+                    iface_info['rates'] = rates.get(iface)
+
             return network_data
 
         except Exception as e:
-            return {'error': f'Network Probe error: {str(e)}'}
\ No newline at end of file
+            return {'error': f'Network Probe error: {str(e)}'}
@@ -2,6 +2,9 @@ from src.core.utils import read_file
 from .base import Probe
 
 class OsProbe(Probe):
+    # kernel only changes with a reboot, distro may change with an upgrade
+    cache_ttl = 60 * 60
+
     # third line is kernel version 
     def _parse_kernel_data(self, content):
         kernel_data = {'version': 'Unknown', 'build_date': 'Unknown', 'smp_support': False}
@@ -0,0 +1,151 @@
+import heapq
+import os
+import time
+from src.core.utils import host_path, read_file
+from .base import Probe
+
+PROC_PATH = '/proc'
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+
+class TopN:
+    """
+    bounded min-heap keeping the N largest items seen, memory stays O(N)
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._heap = []
+
+    def push(self, key, pid, record):
+        item = (key, pid, record)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def items(self):
+        """
+        returns the kept records, largest first
+        """
+        return [record for _, _, record in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+
+class ProcessProbe(Probe):
+    def __init__(self, top=10, sample_interval=None):
+        super().__init__()
+        # number of processes reported per table
+        self.top = top
+        # seconds between the two cpu snapshots, None reports lifetime average cpu usage
+        self.sample_interval = sample_interval
+        # {pid: cpu ticks} of the previous scan, reused when the probe is kept alive
+        self._last_ticks = None
+        self._last_scan_at = None
+
+    def _parse_stat(self, content):
+        """
+        parses /proc/[pid]/stat
+        the command name may contain spaces and parentheses, so split at the last ')'
+        returns (name, state, cpu ticks, start time in ticks)
+        """
+        head, _, tail = content.rpartition(')')
+        name = head.partition('(')[2]
+        fields = tail.split()
+
+        # fields[0] is the 3rd stat field (state), utime/stime are the 14th/15th, starttime the 22nd
+        return name, fields[0], int(fields[11]) + int(fields[12]), int(fields[19])
+
+    def _iter_processes(self):
+        """
+        streams (pid, name, state, cpu_ticks, start_ticks, rss_pages, shared_pages) for every process
+        scandir entries are used as-is, no stat call per pid
+        """
+        with os.scandir(host_path(PROC_PATH)) as entries:
+            for entry in entries:
+                if not entry.name.isdigit(): continue
+
+                try:
+                    name, state, cpu_ticks, start_ticks = self._parse_stat(read_file(f'{PROC_PATH}/{entry.name}/stat'))
+                    statm = read_file(f'{PROC_PATH}/{entry.name}/statm').split()
+                    rss_pages, shared_pages = int(statm[1]), int(statm[2])
+                except (OSError, ValueError, IndexError):
+                    # process exited while scanning
+                    continue
+
+                yield int(entry.name), name, state, cpu_ticks, start_ticks, rss_pages, shared_pages
+
+    def _read_uptime(self):
+        return float(read_file(f'{PROC_PATH}/uptime').split()[0])
+
+    def _scan(self, previous_ticks, elapsed, uptime):
+        """
+        one pass over /proc feeding both top-N heaps
+        returns (process count, top by rss, top by cpu, {pid: cpu ticks} when sampling)
+        """
+        by_rss = TopN(self.top)
+        by_cpu = TopN(self.top)
+        ticks = {} if previous_ticks is not None else None
+        count = 0
+
+        for pid, name, state, cpu_ticks, start_ticks, rss_pages, shared_pages in self._iter_processes():
+            count += 1
+
+            if previous_ticks is not None:
+                ticks[pid] = cpu_ticks
+                # processes started after the previous scan count from zero
+                used = cpu_ticks - previous_ticks.get(pid, 0)
+                window = elapsed
+            else:
+                used = cpu_ticks
+                window = uptime - start_ticks / CLOCK_TICKS
+
+            cpu_percent = round(used * 100 / CLOCK_TICKS / window, 2) if window > 0 else 0.0
+
+            record = {
+                'pid': pid,
+                'name': name,
+                'state': state,
+                'rss_bytes': rss_pages * PAGE_SIZE,
+                'shared_bytes': shared_pages * PAGE_SIZE,
+                'cpu_percent': cpu_percent
+            }
+            by_rss.push(rss_pages, pid, record)
+            by_cpu.push(cpu_percent, pid, record)
+
+        return count, by_rss, by_cpu, ticks
+
+    def run_probe(self):
+        """
+        reports the top N processes by resident memory and by cpu usage
+        cpu usage is the delta over `sample_interval` (this keeps one tick counter per pid),
+        or the lifetime average when sampling is disabled
+        """
+        try:
+            if not os.path.isdir(host_path(PROC_PATH)):
+                return {'error': f'{PROC_PATH} not found'}
+
+            if self.sample_interval is None:
+                count, by_rss, by_cpu, _ = self._scan(None, 0, self._read_uptime())
+                cpu_mode = 'lifetime'
+            else:
+                if self._last_ticks is None:
+                    self._last_ticks = {pid: cpu_ticks for pid, _, _, cpu_ticks, _, _, _ in self._iter_processes()}
+                    self._last_scan_at = time.monotonic()
+                    time.sleep(self.sample_interval)
+
+                now = time.monotonic()
+                count, by_rss, by_cpu, ticks = self._scan(self._last_ticks, now - self._last_scan_at, 0)
+                self._last_ticks, self._last_scan_at = ticks, now
+                cpu_mode = 'interval'
+
+            return {
+                'process_count': count,
+                'cpu_mode': cpu_mode,
+                'top_rss': by_rss.items(),
+                'top_cpu': by_cpu.items()
+            }
+
+        except Exception as e:
+            return {'error': f'Process Probe error: {str(e)}'}
@@ -0,0 +1,91 @@
+import collections.abc
+import importlib
+import threading
+import time
+
+# check name -> (module, class), in report order
+# modules are only imported when their probe is selected
+PROBE_MODULES = {
+    'cpu': ('src.probes.cpu', 'CpuProbe'),
+    'memory': ('src.probes.memory', 'MemoryProbe'),
+    'disk': ('src.probes.disk', 'DiskProbe'),
+    'network': ('src.probes.network', 'NetworkProbe'),
+    'usb': ('src.probes.usb', 'UsbProbe'),
+    'gpu': ('src.probes.gpu', 'GpuProbe'),
+    'os': ('src.probes.os_probe', 'OsProbe'),
+    'process': ('src.probes.process', 'ProcessProbe'),
+    'cgroup': ('src.probes.cgroup', 'CgroupProbe')
+}
+
+
+class ProbeRegistry(collections.abc.MutableMapping):
+    """
+    {name: probe} mapping that imports and constructs a probe the first time it is accessed
+    so a single probe run doesn't pay for the imports of the others
+    """
+
+    def __init__(self, options=None, modules=PROBE_MODULES):
+        # options: {name: constructor keyword arguments}
+        self.options = options or {}
+        self.modules = dict(modules)
+        # {name: {'import_ms': ..., 'construct_ms': ...}} of the probes loaded so far
+        # modules shared by several probes are counted for the first one imported
+        self.timings = {}
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def _load(self, name):
+        module_path, class_name = self.modules[name]
+
+        started = time.perf_counter()
+        module = importlib.import_module(module_path)
+        imported = time.perf_counter()
+        probe = getattr(module, class_name)(**self.options.get(name, {}))
+        constructed = time.perf_counter()
+
+        self.timings[name] = {
+            'import_ms': round((imported - started) * 1000, 3),
+            'construct_ms': round((constructed - imported) * 1000, 3)
+        }
+        return probe
+
+    def __getitem__(self, name):
+        probe = self._instances.get(name)
+        if probe is not None:
+            return probe
+
+        if name not in self.modules:
+            raise KeyError(name)
+
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._load(name)
+            return self._instances[name]
+
+    def __setitem__(self, name, probe):
+        self._instances[name] = probe
+
+    def __delitem__(self, name):
+        if name not in self.modules and name not in self._instances:
+            raise KeyError(name)
+        self.modules.pop(name, None)
+        self._instances.pop(name, None)
+
+    def __iter__(self):
+        yield from self.modules
+        for name in self._instances:
+            if name not in self.modules:
+                yield name
+
+    def __len__(self):
+        return len(self.modules) + sum(1 for name in self._instances if name not in self.modules)
+
+    def __contains__(self, name):
+        # membership must not trigger an import
+        return name in self.modules or name in self._instances
+
+    def loaded(self):
+        """
+        names of the probes constructed so far
+        """
+        return list(self._instances)
@@ -1,71 +1,242 @@
-from src.core.utils import run_command
+import collections
+import os
+from src.core.ids import USB_IDS
+from src.core.kmsg import KMSG_PATH, HotplugCursor, KmsgReader, format_record, is_hotplug_event
+from src.core.utils import get_root, host_path, iter_command_lines, read_file, run_command
 from .base import Probe
 
+USB_DEVICES_PATH = '/sys/bus/usb/devices'
+
+# number of recent hotplug events reported
+HOTPLUG_EVENT_LIMIT = 10
+
+# formatted dmesg output of a full 16 MB ring buffer stays well below this
+DMESG_MAX_BYTES = 64 * 1024 * 1024
+
+
 class UsbProbe(Probe):
+    def __init__(self, usb_ids=None, kmsg_path=KMSG_PATH, hotplug_state=None):
+        super().__init__()
+        self.usb_ids = usb_ids or USB_IDS
+        self.kmsg_path = kmsg_path
+        # path of the hotplug cursor state file
+        # when set, only events newer than the previous run are reported
+        self.hotplug_state = hotplug_state
+
+    def _lookup_name(self, vendor_id, product_id):
+        """
+        builds a lsusb style name from the usb.ids database
+        """
+        vendor_name = self.usb_ids.vendor_name(vendor_id)
+        product_name = self.usb_ids.device_name(vendor_id, product_id)
+        return ' '.join(part for part in (vendor_name, product_name) if part) or f'{vendor_id}:{product_id}'
+
     def _parse_usb_data(self, content):
         """
-        parsing the content and extracting the usb names
+        parsing the lsusb output into device records
         """
         usb_list = []
 
         for line in content.split("\n"):
-            if not line: continue
+            # line format: "Bus 001 Device 002: ID 8087:0024 Intel Corp. Integrated Rate Matching Hub"
+            if ' ID ' not in line: continue
+
+            location, _, raw_info = line.partition(' ID ')
+            ids, _, device_name = raw_info.strip().partition(' ')
+            vendor_id, _, product_id = ids.partition(':')
+
+            location_parts = location.replace(':', '').split()
+            bus = int(location_parts[1]) if len(location_parts) > 1 and location_parts[1].isdigit() else None
+            device = int(location_parts[3]) if len(location_parts) > 3 and location_parts[3].isdigit() else None
+
+            usb_list.append({
+                'name': device_name.strip() or ids,
+                'vendor_id': vendor_id,
+                'product_id': product_id,
+                'manufacturer': None,
+                'product': None,
+                'speed_mbps': None,
+                'bus': bus,
+                'device': device
+            })
+        return usb_list
+
+    def _read_attribute(self, base_path, name):
+        """
+        reads a single sysfs attribute, None if it is missing
+        (devices without string descriptors have no manufacturer/product files)
+        """
+        try:
+            value = read_file(f'{base_path}/{name}')
+        except OSError:
+            return None
+        return value.strip() if value else None
+
+    def _read_usb_device(self, entry):
+        """
+        reads a single /sys/bus/usb/devices entry, returns None for interfaces
+        """
+        # interfaces ("1-1:1.0") have no device descriptor
+        if ':' in entry: return None
+
+        base_path = os.path.join(USB_DEVICES_PATH, entry)
+        vendor_id = self._read_attribute(base_path, 'idVendor')
+        product_id = self._read_attribute(base_path, 'idProduct')
+        if not vendor_id or not product_id: return None
 
-            if 'ID' in line:
-                parts = line.split('ID')
-                if len(parts) > 1:
+        manufacturer = self._read_attribute(base_path, 'manufacturer')
+        product = self._read_attribute(base_path, 'product')
 
-                    raw_info = parts[1].strip()
+        # prefer the device's own string descriptors, fall back to usb.ids
+        if product:
+            name = f'{manufacturer} {product}' if manufacturer else product
+        else:
+            name = self._lookup_name(vendor_id, product_id)
+
+        # speed is in Mbps, low speed devices report "1.5"
+        speed = self._read_attribute(base_path, 'speed')
+        try:
+            speed_mbps = float(speed) if speed and '.' in speed else int(speed)
+        except (TypeError, ValueError):
+            speed_mbps = None
+
+        busnum = self._read_attribute(base_path, 'busnum')
+        devnum = self._read_attribute(base_path, 'devnum')
+
+        return {
+            'name': name,
+            'vendor_id': vendor_id,
+            'product_id': product_id,
+            'manufacturer': manufacturer,
+            'product': product,
+            'speed_mbps': speed_mbps,
+            'bus': int(busnum) if busnum and busnum.isdigit() else None,
+            'device': int(devnum) if devnum and devnum.isdigit() else None
+        }
+
+    def _scan_sysfs(self):
+        """
+        enumerates /sys/bus/usb/devices
+        returns None if sysfs is not available
+        """
+        if not os.path.isdir(host_path(USB_DEVICES_PATH)):
+            return None
 
-                    # ID Fomrat: "XXXX:XXXX" 
-                    # skip the first 9 char and 1 whitespace
-                    device_name = raw_info[10:].strip()
+        usb_list = []
+        for entry in os.listdir(host_path(USB_DEVICES_PATH)):
+            device = self._read_usb_device(entry)
+            if device:
+                usb_list.append(device)
 
-                    if not device_name:
-                        device_name = raw_info
-                
-                usb_list.append(device_name)
+        usb_list.sort(key=lambda device: (device['bus'] or 0, device['device'] or 0))
         return usb_list
     
-    def get_hotplug_events(self):
+    def _get_dmesg_hotplug_events(self):
         """
-        parses dmesg for recent USB activity.
-        returns a dict with status and events.
+        parses dmesg for recent USB activity, used when /dev/kmsg can't be read
         """
-        hotplug_data = {'status': 'Inactive', 'recent_events': []}
+        hotplug_data = {'status': 'Inactive', 'recent_events': [], 'source': 'dmesg'}
         try:
-            output = run_command(['dmesg'])
+            # output is consumed line by line, only the last 10 events are kept
+            found_events = collections.deque(maxlen=HOTPLUG_EVENT_LIMIT)
+            line_count = 0
+            for line in iter_command_lines(['dmesg'], max_bytes=DMESG_MAX_BYTES):
+                line_count += 1
+                if is_hotplug_event(line):
+                    found_events.append(line.strip())
+
             # sudo privaliges not granted
             # or dmesg failed
-            if not output:
+            if not line_count:
                 hotplug_data['status'] = 'Permission Denied / Empty'
                 return hotplug_data
 
-            lines = output.split('\n')
-            found_events = []
-
-
-            # just look the last 10 events
-            for line in  reversed(lines):
-                if len(found_events) > 10: break
-                    
-                line_lower = line.lower()
-                if 'usb' in line and ('new' in line or 'disconnect' in line):
-                    found_events.append(line.strip())
             if found_events:
                 hotplug_data['status'] = 'Active'
-                hotplug_data['recent_events'] = found_events 
+                # newest first
+                hotplug_data['recent_events'] = list(reversed(found_events))
 
         except Exception as e:
             hotplug_data['error'] = f'Error parsing dmesg: {str(e)}'
 
         return hotplug_data
 
+    def _get_incremental_hotplug_events(self, reader):
+        """
+        reports only events logged after the cursor stored by the previous run
+        """
+        cursor = HotplugCursor(self.hotplug_state)
+        previous_sequence = cursor.sequence
+
+        records, last_sequence, lost = reader.hotplug_events_since(previous_sequence)
+
+        cursor_data = {
+            'previous_sequence': previous_sequence,
+            'last_sequence': last_sequence if last_sequence is not None else previous_sequence,
+            'lost_events': lost,
+            'wrapped': lost > 0
+        }
+
+        if last_sequence is not None:
+            try:
+                cursor.save(last_sequence)
+            except OSError as e:
+                # next run will report these events again
+                cursor_data['error'] = f'Cannot save hotplug cursor: {e}'
+
+        events = [format_record(record) for record in reversed(records)]
+        return {
+            'status': 'Active' if events else 'Inactive',
+            'recent_events': events,
+            'source': 'kmsg',
+            'cursor': cursor_data
+        }
+
+    def get_hotplug_events(self):
+        """
+        collects recent USB attach/detach events from the kernel log.
+        /dev/kmsg is streamed record by record when readable, dmesg is the fallback.
+        returns a dict with status and events (newest first).
+        """
+        try:
+            with KmsgReader(self.kmsg_path) as reader:
+                if self.hotplug_state:
+                    return self._get_incremental_hotplug_events(reader)
+                records = reader.tail_hotplug_events(HOTPLUG_EVENT_LIMIT)
+        except OSError:
+            # commands are disabled under a root, dmesg would report an empty log
+            if get_root() != '/':
+                return {'status': 'Unavailable', 'recent_events': [], 'source': 'kmsg',
+                        'error': 'kernel log not available under this root (not captured in the snapshot)'}
+
+            # /dev/kmsg missing or restricted (dmesg_restrict)
+            # dmesg has no sequence numbers, so no cursor either
+            return self._get_dmesg_hotplug_events()
+
+        events = [format_record(record) for record in reversed(records)]
+        return {
+            'status': 'Active' if events else 'Inactive',
+            'recent_events': events,
+            'source': 'kmsg'
+        }
+
+    def follow_hotplug_events(self):
+        """
+        yields USB attach/detach events as the kernel logs them
+        """
+        with KmsgReader(self.kmsg_path) as reader:
+            for record in reader.follow_hotplug_events():
+                yield {'sequence': record.sequence, 'event': format_record(record)}
+
     def run_probe(self):
         """
-        collects usb list via command "lsusb"
+        enumerates usb devices from sysfs, "lsusb" is only used when sysfs is unavailable
         """
         try:
+            usb_list = self._scan_sysfs()
+            if usb_list is not None:
+                return usb_list
+
             content = run_command(['lsusb'])
             
             if not content:
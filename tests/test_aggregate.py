@@ -0,0 +1,166 @@
+import unittest
+import tempfile
+import json
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.aggregate import aggregate, find_reports, join_rounds, load_report
+
+
+def make_report(kernel='6.1.0', disks=None, ssd='PASS'):
+    return {
+        'timestamp': '2025-01-01 00:00:00',
+        'device_info': {
+            'cpu': {'model_name': 'AMD Ryzen 7', 'topology': {'physical_cores': 8, 'logical_threads': 16}},
+            'memory': {'mem_total': '31.26 GB'},
+            'os': {'version': kernel, 'distro': 'Ubuntu 24.04'},
+            'disk': disks if disks is not None else {'nvme0n1': {'model': 'X', 'type': 'SSD', 'size': '512.00 GB'}},
+            'gpu': {'error': 'lspci not found'}
+        },
+        'test_results': {'ssd_present': ssd, 'gpu_detected': 'FAIL'}
+    }
+
+
+class TestAggregate(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, report):
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            if name.endswith('.ndjson'):
+                for record in report:
+                    f.write(json.dumps(record) + '\n')
+            else:
+                f.write(report if isinstance(report, str) else json.dumps(report))
+        return path
+
+    def test_find_reports(self):
+        """
+        tests if hosts are keyed by path and the newest timestamped report of a host directory is used
+        """
+        self._write('round/host-b.json', make_report())
+        self._write('round/host-a/report_20250101_000000.json', make_report())
+        newest = self._write('round/host-a/report_20250102_000000.json', make_report())
+        self._write('round/notes.txt', 'ignored')
+
+        reports = find_reports(os.path.join(self.tmp.name, 'round'))
+
+        self.assertEqual(['host-a', 'host-b'], [key for key, path in reports])
+        self.assertEqual(newest, reports[0][1])
+
+    def test_join_rounds(self):
+        previous = [('a', 'old/a'), ('b', 'old/b'), ('d', 'old/d')]
+        current = [('b', 'new/b'), ('c', 'new/c'), ('d', 'new/d')]
+
+        self.assertEqual([('a', 'old/a', None), ('b', 'old/b', 'new/b'), ('c', None, 'new/c'), ('d', 'old/d', 'new/d')],
+                         list(join_rounds(previous, current)))
+
+    def test_load_ndjson_report(self):
+        """
+        tests if an NDJSON stream is rebuilt into a report
+        """
+        path = self._write('host.ndjson', [
+            {'type': 'report', 'timestamp': '2025-01-01'},
+            {'type': 'probe', 'probe': 'os', 'data': {'version': '6.1.0'}},
+            {'type': 'test_results', 'data': {'ssd_present': 'PASS'}}
+        ])
+
+        report = load_report(path)
+
+        self.assertEqual({'os': {'version': '6.1.0'}}, report['device_info'])
+        self.assertEqual({'ssd_present': 'PASS'}, report['test_results'])
+
+    def test_summary(self):
+        """
+        tests if hosts are counted per field, failed probes count as unknown and broken reports are reported
+        """
+        self._write('round/a.json', make_report())
+        self._write('round/b.json', make_report(kernel='6.8.0', ssd='FAIL',
+                                                disks={'sda': {'type': 'HDD'}, 'sdb': {'type': 'HDD'}}))
+        broken = make_report()
+        broken['device_info']['os'] = {'error': 'no /proc/version'}
+        self._write('round/c.json', broken)
+        self._write('round/d.json', '{"device_info": ')
+
+        summary = aggregate(os.path.join(self.tmp.name, 'round'), workers=1)['summary']
+
+        self.assertEqual(3, summary['hosts'])
+        self.assertEqual(1, summary['unreadable'])
+        self.assertIn('d.json', summary['errors'][0])
+        self.assertEqual({'AMD Ryzen 7': 3}, summary['cpu_models'])
+        self.assertEqual({'6.1.0': 1, '6.8.0': 1, 'Unknown': 1}, summary['kernels'])
+        self.assertEqual({'HDD': 2, 'SSD': 2}, summary['disk_types'])
+        self.assertEqual({'pass': 2, 'fail': 1, 'pass_rate': 0.6667}, summary['test_results']['ssd_present'])
+        self.assertEqual(0.0, summary['test_results']['gpu_detected']['pass_rate'])
+
+    def test_diff(self):
+        """
+        tests if inventory changes, added and removed hosts are counted and changes are sampled
+        """
+        for i in range(5):
+            self._write(f'old/host-{i}.json', make_report())
+            self._write(f'new/host-{i}.json', make_report(kernel='6.8.0' if i < 3 else '6.1.0'))
+        self._write('old/gone.json', make_report())
+        self._write('new/fresh.json', make_report())
+        disks = {'nvme0n1': {'model': 'X', 'type': 'SSD', 'size': '1024.00 GB'}}
+        self._write('new/host-4.json', make_report(disks=disks))
+
+        result = aggregate(os.path.join(self.tmp.name, 'new'), previous=os.path.join(self.tmp.name, 'old'),
+                           workers=1, sample_limit=2)
+        diff = result['diff']
+
+        self.assertEqual(4, diff['changed'])
+        self.assertEqual(1, diff['unchanged'])
+        self.assertEqual(1, diff['added'])
+        self.assertEqual(['gone'], diff['removed_hosts'])
+        self.assertEqual({'kernel': 3, 'disks': 1}, diff['fields'])
+        self.assertEqual([{'host': 'host-0', 'field': 'kernel', 'old': '6.1.0', 'new': '6.8.0'},
+                          {'host': 'host-1', 'field': 'kernel', 'old': '6.1.0', 'new': '6.8.0'}], diff['changes'])
+        self.assertEqual(6, result['summary']['hosts'])
+
+    def test_unreadable_reports_in_diff(self):
+        """
+        tests if hosts whose previous or current report is unreadable are counted apart,
+        so the diff totals add up to the hosts in both rounds
+        """
+        for name in ('same', 'old-broken', 'new-broken'):
+            self._write(f'old/{name}.json', make_report())
+            self._write(f'new/{name}.json', make_report())
+        self._write('old/old-broken.json', '{')
+        self._write('new/new-broken.json', '{')
+
+        result = aggregate(os.path.join(self.tmp.name, 'new'), previous=os.path.join(self.tmp.name, 'old'), workers=1)
+        diff = result['diff']
+
+        self.assertEqual(1, diff['unchanged'])
+        self.assertEqual(1, diff['unreadable_previous'])
+        self.assertEqual(1, diff['unreadable_current'])
+        self.assertEqual(3, diff['changed'] + diff['unchanged'] + diff['unreadable_previous'] + diff['unreadable_current'])
+        self.assertIn('old-broken.json', diff['errors'][0])
+
+        # the current round summary only counts current reports as unreadable
+        self.assertEqual(2, result['summary']['hosts'])
+        self.assertEqual(1, result['summary']['unreadable'])
+
+    def test_worker_processes(self):
+        """
+        tests if parsing on worker processes gives the same result as in process
+        """
+        for i in range(40):
+            self._write(f'old/host-{i}.json', make_report())
+            self._write(f'new/host-{i}.json', make_report(kernel=f'6.{i % 3}.0'))
+
+        args = (os.path.join(self.tmp.name, 'new'), os.path.join(self.tmp.name, 'old'))
+        self.assertEqual(aggregate(*args, workers=1), aggregate(*args, workers=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
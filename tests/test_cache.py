@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+from contextlib import redirect_stdout
+import tempfile
+import io
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.cache import StaticCache
+from src.core.utils import set_root
+from pysyscheck import main
+
+
+class TestStaticCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch('src.core.cache.read_boot_id', return_value='boot-a')
+    def test_hit_after_save(self, mock_boot_id):
+        cache = StaticCache(self.path)
+        self.assertIsNone(cache.get('gpu', 60))
+        cache.put('gpu', [{'model': 'X', 'vendor': 'NVIDIA'}])
+        cache.save()
+
+        cache = StaticCache(self.path)
+        self.assertEqual([{'model': 'X', 'vendor': 'NVIDIA'}], cache.get('gpu', 60))
+        self.assertEqual(1, cache.stats()['hits'])
+
+    @patch('src.core.cache.read_boot_id')
+    def test_reboot_invalidates(self, mock_boot_id):
+        """
+        tests if entries from a previous boot are ignored
+        """
+        mock_boot_id.return_value = 'boot-a'
+        cache = StaticCache(self.path)
+        cache.put('os', {'version': '6.1'})
+        cache.save()
+
+        mock_boot_id.return_value = 'boot-b'
+        cache = StaticCache(self.path)
+        self.assertIsNone(cache.get('os', 60))
+        self.assertEqual(1, cache.stats()['misses'])
+
+    @patch('src.core.cache.read_boot_id', return_value='boot-a')
+    def test_refresh_and_errors(self, mock_boot_id):
+        cache = StaticCache(self.path)
+        cache.put('os', {'version': '6.1'})
+        cache.put('gpu', [{'GPU Probe error': 'lspci not found'}])
+        cache.save()
+
+        cache = StaticCache(self.path, refresh=True)
+        self.assertIsNone(cache.get('os', 60))
+
+        cache = StaticCache(self.path)
+        self.assertIsNone(cache.get('gpu', 60))
+        self.assertIsNone(cache.get('os', -1))
+
+    @patch('src.core.cache.read_boot_id', return_value='boot-a')
+    def test_stats_stay_bounded(self, mock_boot_id):
+        """
+        tests if repeated lookups (a watch mode tick) are counted without keeping one entry per call
+        """
+        cache = StaticCache(self.path)
+        cache.put('os', {'version': '6.1'})
+        for _ in range(1000):
+            cache.get('os', 60)
+            cache.get('gpu', 60)
+
+        self.assertEqual({'hits': 1000, 'misses': 1000, 'cached_probes': ['os'], 'refresh': False}, cache.stats())
+        self.assertEqual(1, len(cache.hits))
+
+    def test_not_used_under_root(self):
+        """
+        tests if a custom root runs without the cache, a mounted host shares the boot id of the live system
+        """
+        os.makedirs(os.path.join(self.tmp.name, 'root', 'etc'))
+        argv = ['pysyscheck.py', '-c', 'os', '--no-file', '--root', os.path.join(self.tmp.name, 'root')]
+
+        with patch.object(sys, 'argv', argv), patch('src.core.cache.StaticCache') as mock_cache:
+            try:
+                with redirect_stdout(io.StringIO()):
+                    main()
+            finally:
+                set_root(None)
+
+        mock_cache.assert_not_called()
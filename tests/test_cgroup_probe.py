@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.probes.cgroup import CgroupProbe, parse_io_stat
+
+
+class TestCgroupProbe(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self._write('cgroup.controllers', 'cpu io memory\n')
+        self._write('cpu.pressure', 'some avg10=1.50 avg60=0.00 avg300=0.00 total=100\n'
+                                    'full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n')
+        self._write('system.slice/memory.current', '4096\n')
+        self._write('system.slice/memory.max', 'max\n')
+        self._write('system.slice/cpu.stat', 'usage_usec 1500\nuser_usec 1000\nsystem_usec 500\n')
+        self._write('system.slice/io.stat', '8:0 rbytes=90112 wbytes=4096 rios=3 wios=1 dbytes=0 dios=0\n')
+        self._write('system.slice/web.service/memory.current', '2048\n')
+        self._write('system.slice/web.service/memory.max', '1073741824\n')
+        self._write('system.slice/web.service/deep/memory.current', '1\n')
+        self._write('user.slice/memory.current', '8192\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def test_walk_with_depth_limit(self):
+        """
+        tests if the tree is walked up to max_depth and every accounting file is parsed
+        """
+        with patch('src.probes.cgroup.CGROUP_PATH', self.tmp.name):
+            result = CgroupProbe(max_depth=2).run_probe()
+
+        self.assertEqual(self.tmp.name, result['root'])
+        self.assertEqual(['cpu', 'io', 'memory'], result['controllers'])
+        self.assertEqual(['/', '/system.slice', '/system.slice/web.service', '/user.slice'], list(result['cgroups']))
+
+        system = result['cgroups']['/system.slice']
+        self.assertEqual(4096, system['memory_current'])
+        self.assertIsNone(system['memory_max'])
+        self.assertEqual(1500, system['cpu_stat']['usage_usec'])
+        self.assertEqual(90112, system['io_stat']['8:0']['rbytes'])
+        self.assertEqual(1073741824, result['cgroups']['/system.slice/web.service']['memory_max'])
+
+        root = result['cgroups']['/']
+        self.assertIsNone(root['memory_current'])
+        self.assertEqual(1.5, root['pressure']['cpu']['some']['avg10'])
+
+    def test_path_filter(self):
+        """
+        tests if only cgroups matching the filter are reported
+        """
+        with patch('src.probes.cgroup.CGROUP_PATH', self.tmp.name):
+            result = CgroupProbe(max_depth=3, path_filter=['/system.slice/*']).run_probe()
+
+        self.assertEqual(['/system.slice/web.service', '/system.slice/web.service/deep'], list(result['cgroups']))
+        self.assertEqual(2, result['count'])
+
+    def test_no_cgroup_v2(self):
+        """
+        tests if a missing v2 hierarchy is reported as an error
+        """
+        with patch('src.probes.cgroup.CGROUP_PATH', os.path.join(self.tmp.name, 'missing')):
+            result = CgroupProbe().run_probe()
+
+        self.assertIn('error', result)
+
+    def test_parse_io_stat(self):
+        """
+        tests if io.stat lines are split into per device counters
+        """
+        result = parse_io_stat("8:0 rbytes=1 wbytes=2\n259:0 rbytes=3 wbytes=4\n")
+        self.assertEqual({'8:0': {'rbytes': 1, 'wbytes': 2}, '259:0': {'rbytes': 3, 'wbytes': 4}}, result)
+
+
+if __name__ == '__main__':
+    unittest.main()
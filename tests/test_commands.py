@@ -0,0 +1,108 @@
+import unittest
+import time
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.commands import CommandLines, run_commands
+from src.core.utils import run_command, iter_command_lines
+
+
+class TestCommands(unittest.TestCase):
+
+    def test_run_command(self):
+        """
+        tests if stdout of a successful command is returned and a failing one gives None
+        """
+        self.assertEqual('hello\n', run_command(['echo', 'hello']))
+        self.assertIsNone(run_command(['false']))
+        with self.assertRaises(FileNotFoundError):
+            run_command(['pysyscheck-missing-command'])
+
+    def test_timeout(self):
+        """
+        tests if a wedged command is killed at the deadline, including the processes it started
+        """
+        started = time.monotonic()
+        result = run_command(['sh', '-c', 'sleep 30 & sleep 30'], timeout=0.3)
+
+        self.assertIsNone(result)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_output_cap(self):
+        """
+        tests if output past max_bytes is cut and the command is killed
+        """
+        started = time.monotonic()
+        result = run_command(['yes'], max_bytes=100000)
+
+        self.assertEqual(100000, len(result))
+        self.assertTrue(result.startswith('y\ny\n'))
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_run_commands(self):
+        """
+        tests if commands run at the same time and a missing one doesn't fail the others
+        """
+        started = time.monotonic()
+        results = run_commands([['sh', '-c', 'sleep 0.5; echo a'], ['sh', '-c', 'sleep 0.5; echo b'],
+                                ['pysyscheck-missing-command']])
+
+        self.assertLess(time.monotonic() - started, 1.4)
+        self.assertEqual('a\n', results[0].stdout)
+        self.assertEqual(0, results[1].returncode)
+        self.assertIsInstance(results[2], FileNotFoundError)
+
+
+class TestCommandLines(unittest.TestCase):
+
+    def test_lines(self):
+        """
+        tests if lines are split across chunks and a last line without a newline is kept
+        """
+        lines = CommandLines(['sh', '-c', 'seq 1 50000; printf tail'])
+
+        result = list(lines)
+
+        self.assertEqual(50001, len(result))
+        self.assertEqual('1', result[0])
+        self.assertEqual('50000', result[-2])
+        self.assertEqual('tail', result[-1])
+        self.assertEqual(0, lines.returncode)
+
+    def test_early_stop(self):
+        """
+        tests if a caller that stops iterating kills the command
+        """
+        lines = CommandLines(['yes'])
+        iterator = iter(lines)
+
+        self.assertEqual('y', next(iterator))
+        iterator.close()
+
+        self.assertIsNotNone(lines.returncode)
+        self.assertNotEqual(0, lines.returncode)
+
+    def test_cap_and_timeout(self):
+        """
+        tests if iteration ends at the byte cap or deadline without yielding a cut line
+        """
+        capped = CommandLines(['sh', '-c', 'seq 1 100000'], max_bytes=10)
+        self.assertEqual(['1', '2', '3', '4', '5'], list(capped))
+        self.assertTrue(capped.truncated)
+
+        slow = CommandLines(['sh', '-c', 'echo first; printf partial; sleep 30'], timeout=0.3)
+        self.assertEqual(['first'], list(slow))
+        self.assertTrue(slow.timed_out)
+
+    def test_missing_command(self):
+        """
+        tests if a missing command raises while iterating
+        """
+        with self.assertRaises(FileNotFoundError):
+            list(iter_command_lines(['pysyscheck-missing-command']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,14 +11,14 @@ from src.probes.cpu import CpuProbe
 class TestCpuProbe(unittest.TestCase):
 
     # CPU TESTSs
-    @patch('src.probes.cpu.read_file')
-    def test_cpu_probe_success(self, mock_read_file):
+    @patch('src.probes.cpu.iter_lines')
+    def test_cpu_probe_success(self, mock_iter_lines):
         """
         tests if CPU probe correctly parses standard /proc/cpuinfo content
         """
 
         # mock data
-        mock_read_file.return_value = """
+        mock_iter_lines.return_value = """
         processor	: 0
         vendor_id	: AuthenticAMD
         cpu family	: 25
@@ -40,12 +40,12 @@ class TestCpuProbe(unittest.TestCase):
         self.assertEqual(result['topology']['logical_threads'], 12)
         self.assertTrue(result['virtualization_support']) 
     
-    @patch('src.probes.cpu.read_file')
-    def test_cpu_probe_file_not_found(self,mock_read_file):
+    @patch('src.probes.cpu.iter_lines')
+    def test_cpu_probe_file_not_found(self,mock_iter_lines):
         """
         tests error handling when cpuinfo is missing
         """
-        mock_read_file.side_effect = FileNotFoundError
+        mock_iter_lines.side_effect = FileNotFoundError
 
         probe = CpuProbe()
         result = probe.run_probe()
@@ -53,13 +53,13 @@ class TestCpuProbe(unittest.TestCase):
         self.assertIn('error', result)
         self.assertIn('/proc/cpuinfo not found', result['error'])
 
-    @patch('src.probes.cpu.read_file')
-    def test_cpu_probe_missing_info(self, mock_read_file):
+    @patch('src.probes.cpu.iter_lines')
+    def test_cpu_probe_missing_info(self, mock_iter_lines):
         """
         tests if CPU probe correctly parses missing /proc/cpuinfo content
         """
         # mock data
-        mock_read_file.return_value = """
+        mock_iter_lines.return_value = """
         processor       : 0
         cpu cores       : 4
         siblings        : 8
@@ -80,9 +80,9 @@ class TestCpuProbe(unittest.TestCase):
         self.assertEqual(result['cache'], "8192 KB")
         self.assertFalse(result['virtualization_support']) 
         
-    @patch('src.probes.cpu.read_file')
-    def test_cpu_probe_corrupt_info(self, mock_read_file):
-        mock_read_file.return_value = """
+    @patch('src.probes.cpu.iter_lines')
+    def test_cpu_probe_corrupt_info(self, mock_iter_lines):
+        mock_iter_lines.return_value = """
         processor :: 0
         vendor_id- GenuineIntel
         model name  Intel(R) Core(TM) Something
@@ -106,7 +106,82 @@ class TestCpuProbe(unittest.TestCase):
         self.assertEqual(result['cache'], "Unknown")
         self.assertEqual(result['cpu_family'], "Unknown")
         self.assertEqual(result['cpu_model'], "Unknown")
-        self.assertFalse(result['virtualization_support']) 
+        self.assertFalse(result['virtualization_support'])
+
+    @patch('src.probes.cpu.iter_lines')
+    def test_cpu_probe_full_topology(self, mock_iter_lines):
+        """
+        tests if sockets/cores/threads are aggregated across all processor blocks
+        """
+        blocks = []
+        for processor in range(8):
+            blocks.append(f"processor\t: {processor}\n"
+                          f"model name\t: Test CPU\n"
+                          f"physical id\t: {processor // 4}\n"
+                          f"siblings\t: 4\n"
+                          f"core id\t\t: {processor % 4 // 2}\n"
+                          f"cpu cores\t: 2\n"
+                          f"flags\t\t: fpu vmx sse\n"
+                          f"vmx flags\t: vnmi\n")
+        mock_iter_lines.return_value = "\n".join(blocks)
+
+        result = CpuProbe(full_topology=True).run_probe()
+
+        self.assertEqual(2, result['topology']['physical_cores'])
+        self.assertEqual(2, result['topology']['sockets'])
+        self.assertEqual(4, result['topology']['cores'])
+        self.assertEqual(8, result['topology']['threads'])
+        self.assertTrue(result['virtualization_support'])
+
+    @patch('src.probes.cpu.iter_lines')
+    def test_cpu_probe_flags_are_tokenized(self, mock_iter_lines):
+        """
+        tests if flags merely containing 'svm' or 'vmx' don't enable virtualization support
+        """
+        mock_iter_lines.return_value = "processor : 0\nflags : fpu svme_addr vmxx\nvmx flags : vmx\n"
+
+        result = CpuProbe().run_probe()
+
+        self.assertFalse(result['virtualization_support'])
+        self.assertNotIn('sockets', result['topology'])
+
+    @patch('src.probes.cpu.iter_lines')
+    def test_cpu_probe_stops_after_first_block(self, mock_iter_lines):
+        def lines():
+            yield "processor : 0"
+            yield "model name : Test CPU"
+            yield ""
+            raise AssertionError('read past the first block')
+
+        mock_iter_lines.return_value = lines()
 
+        result = CpuProbe().run_probe()
 
+        self.assertEqual('Test CPU', result['model_name'])
+
+    @patch('src.probes.cpu.time.sleep')
+    @patch('src.probes.cpu.CpuProbe._read_frequencies', return_value=None)
+    @patch('src.probes.cpu.iter_lines', return_value="processor : 0\nmodel name : Test CPU\n")
+    @patch('src.probes.cpu.read_file')
+    def test_cpu_utilization_sampling(self, mock_read_file, mock_iter_lines, mock_frequencies, mock_sleep):
+        """
+        tests if per-core utilization is computed from two /proc/stat snapshots
+        """
+        snapshots = iter([
+            "cpu  100 0 100 800 0 0 0 0 0 0\ncpu0 50 0 50 400 0 0 0 0 0 0\ncpu1 50 0 50 400 0 0 0 0 0 0\nintr 1 2 3\n",
+            "cpu  200 0 150 1000 50 0 0 0 0 0\ncpu0 150 0 50 400 0 0 0 0 0 0\ncpu1 50 0 100 600 50 0 0 0 0 0\nintr 1 2 3\n",
+        ])
+
+        mock_read_file.side_effect = lambda path: next(snapshots)
+
+        result = CpuProbe(sample_interval=1).run_probe()
+        utilization = result['utilization']
+
+        self.assertEqual('Test CPU', result['model_name'])
+        self.assertEqual(25.0, utilization['total']['user'])
+        self.assertEqual(12.5, utilization['total']['iowait'])
+        self.assertEqual([0, 1], utilization['per_core']['cpu'])
+        self.assertEqual([100.0, 16.67], utilization['per_core']['busy'])
+        self.assertEqual([0.0, 16.67], utilization['per_core']['iowait'])
+        mock_sleep.assert_called_once_with(1)
 
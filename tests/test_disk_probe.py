@@ -5,15 +5,15 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.probes.disk import DiskProbe
+from src.probes.disk import DiskProbe, DiskStats
 
 
 class TestDiskProbe(unittest.TestCase):
 
-    @patch('src.probes.disk.read_file')
+    @patch('src.probes.disk.read_files')
     @patch('os.listdir')
     @patch('os.path.exists', return_value=True) 
-    def test_disk_probe_success(self, mock_exists, mock_listdir, mock_read_file):
+    def test_disk_probe_success(self, mock_exists, mock_listdir, mock_read_files):
         mock_listdir.return_value = ['sda', 'sr0', 'ram0', 'loop0']
 
         mock_file_content = {
@@ -26,11 +26,10 @@ class TestDiskProbe(unittest.TestCase):
             '/sys/block/sda/size': '976773168\n' 
         }
 
-        def side_effect(path):
-            if path in mock_file_content:
-                return mock_file_content[path]
+        def side_effect(paths):
+            return [mock_file_content.get(path) for path in paths]
             
-        mock_read_file.side_effect = side_effect
+        mock_read_files.side_effect = side_effect
 
         probe = DiskProbe()
         result = probe.run_probe()
@@ -48,19 +47,20 @@ class TestDiskProbe(unittest.TestCase):
         self.assertEqual('SSD', result['sda']['type'])
         self.assertEqual('465.76 GB', result['sda']['size'])
 
-    @patch('src.probes.disk.read_file')
+    @patch('src.probes.disk.read_files')
     @patch('os.listdir')
     @patch('os.path.exists', return_value=True)
-    def test_disk_type_hdd(self, mock_exists, mock_listdir, mock_read_file):
+    def test_disk_type_hdd(self, mock_exists, mock_listdir, mock_read_files):
         mock_listdir.return_value = ['sda']
 
         mock_file_content = {
             '/sys/block/sda/queue/rotational': '1\n', 
         }
 
-        def side_effect(path):
-            if path in mock_file_content:
-                return mock_file_content[path]
+        def side_effect(paths):
+            return [mock_file_content.get(path) for path in paths]
+
+        mock_read_files.side_effect = side_effect
             
         probe = DiskProbe()
         result = probe.run_probe()
@@ -68,21 +68,20 @@ class TestDiskProbe(unittest.TestCase):
         self.assertIn('sda', result)
         self.assertEqual('HDD', result['sda']['type'])
 
-    @patch('src.probes.disk.read_file')
+    @patch('src.probes.disk.read_files')
     @patch('os.listdir')
     @patch('os.path.exists', return_value=True)
-    def test_disk_probe_io_error(self, mock_exists, mock_listdir, mock_read_file):
+    def test_disk_probe_io_error(self, mock_exists, mock_listdir, mock_read_files):
         mock_listdir.return_value = ['sda']
 
         mock_file_content = {
         
         }
 
-        def side_effect(path):
-            if path in mock_file_content:
-                return mock_file_content[path]
+        def side_effect(paths):
+            return [mock_file_content.get(path) for path in paths]
             
-        mock_read_file.side_effect = side_effect
+        mock_read_files.side_effect = side_effect
 
         probe = DiskProbe()
         result = probe.run_probe()
@@ -93,10 +92,10 @@ class TestDiskProbe(unittest.TestCase):
         self.assertEqual('Unknown', result['sda']['model'])
         self.assertEqual('Unknown', result['sda']['type'])
 
-    @patch('src.probes.disk.read_file')
+    @patch('src.probes.disk.read_files')
     @patch('os.listdir')
     @patch('os.path.exists', return_value=True)
-    def test_disk_probe_no_disk_found(self, mock_exists, mock_listdir, mock_read_file):
+    def test_disk_probe_no_disk_found(self, mock_exists, mock_listdir, mock_read_files):
         mock_listdir.return_value = []
 
 
@@ -104,14 +103,86 @@ class TestDiskProbe(unittest.TestCase):
         
         }
 
-        def side_effect(path):
-            if path in mock_file_content:
-                return mock_file_content[path]
+        def side_effect(paths):
+            return [mock_file_content.get(path) for path in paths]
             
 
-        mock_read_file.side_effect = side_effect
+        mock_read_files.side_effect = side_effect
 
         probe = DiskProbe()
         result = probe.run_probe()
 
-        self.assertEqual(0, len(result))
\ No newline at end of file
+        self.assertEqual(0, len(result))
+
+    @patch('src.probes.disk.time.sleep')
+    @patch('src.probes.disk.time.monotonic')
+    @patch('src.probes.disk.read_file')
+    @patch('src.probes.disk.read_files', side_effect=lambda paths: [None] * len(paths))
+    @patch('os.listdir')
+    @patch('os.path.exists', return_value=True)
+    def test_disk_io_sampling(self, mock_exists, mock_listdir, mock_read_files, mock_read_file, mock_monotonic, mock_sleep):
+        """
+        tests if IOPS, throughput, latency and utilization are computed from two diskstats snapshots
+        """
+        mock_listdir.return_value = ['sda', 'loop0']
+        mock_monotonic.side_effect = [10.0, 12.0]
+
+        snapshots = iter([
+            "   8  0 sda 100 0 2000 50 200 0 4000 100 0 500 1000 0 0 0 0\n"
+            "   7  0 loop0 1 0 8 0 0 0 0 0 0 0 0 0 0 0 0\n",
+            "   8  0 sda 300 0 6000 450 400 0 8000 300 2 1500 3000 0 0 0 0\n"
+            "   7  0 loop0 1 0 8 0 0 0 0 0 0 0 0 0 0 0 0\n",
+        ])
+
+        mock_read_file.side_effect = lambda path: next(snapshots)
+
+        result = DiskProbe(sample_interval=2).run_probe()
+        io = result['sda']['io']
+
+        self.assertEqual(100.0, io['read_iops'])
+        self.assertEqual(100.0, io['write_iops'])
+        self.assertEqual(1024000, io['read_bytes_per_sec'])
+        self.assertEqual(2.0, io['read_latency_ms'])
+        self.assertEqual(1.0, io['write_latency_ms'])
+        self.assertEqual(1.0, io['queue_depth'])
+        self.assertEqual(50.0, io['utilization'])
+        self.assertEqual(2, io['in_flight'])
+        self.assertNotIn('loop0', result)
+
+    def test_disk_io_counters_going_backwards(self):
+        """
+        tests if wrapped or reset counters (re-registered device) give zero rates instead of negative ones
+        """
+        before = DiskStats.parse("   8  0 sda 4294967200 0 6000 450 400 0 8000 300 0 1500 3000 0 0 0 0\n", taken_at=10.0)
+        after = DiskStats.parse("   8  0 sda 100 0 2000 50 500 0 4000 100 0 500 1000 0 0 0 0\n", taken_at=12.0)
+
+        io = DiskProbe()._compute_io(before, after)['sda']
+
+        self.assertEqual(0.0, io['read_iops'])
+        self.assertEqual(50.0, io['write_iops'])
+        self.assertEqual(0, io['read_bytes_per_sec'])
+        self.assertEqual(0.0, io['read_latency_ms'])
+        self.assertEqual(0.0, io['queue_depth'])
+        self.assertEqual(0.0, io['utilization'])
+
+
+    @patch('src.probes.disk.MODEL_READ_BATCH', 2)
+    @patch('src.probes.disk.read_files')
+    def test_disk_columns_parallel_models(self, mock_read_files):
+        """
+        tests if large disk sets are collected column-wise with model reads split across threads
+        """
+        names = [f'sd{letter}' for letter in 'abcde']
+        mock_read_files.side_effect = lambda paths: [path.split('/')[3] + ('\n' if 'model' in path else '') if 'size' not in path else '2097152\n' for path in paths]
+
+        columns = DiskProbe().collect_columns(names)
+
+        self.assertEqual(names, columns.names)
+        self.assertEqual(5, len(columns.models))
+        # 2 column sweeps + 3 model batches
+        self.assertEqual(5, mock_read_files.call_count)
+
+        disks = columns.to_dict()
+        self.assertEqual('sdc', disks['sdc']['model'])
+        self.assertEqual('1.00 GB', disks['sde']['size'])
+        self.assertEqual('HDD', disks['sda']['type'])
@@ -1,17 +1,20 @@
 import unittest
 from unittest.mock import patch, MagicMock
+import tempfile
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.core.ids import IdsDatabase
 from src.probes.gpu import GpuProbe
 
 
 class TestGpuProbes(unittest.TestCase):
     
+    @patch('src.probes.gpu.GpuProbe._scan_sysfs', return_value=None)
     @patch('src.probes.gpu.run_command')
-    def test_gpu_probe_success(self, mock_run_command):
+    def test_gpu_probe_success(self, mock_run_command, mock_scan_sysfs):
         mock_run_command.return_value = """
         74:00.5 Multimedia controller: Advanced Micro Devices, Inc. [AMD] ACP/ACP3X/ACP6x Audio Coprocessor (rev 60)
         74:00.6 Audio device: Advanced Micro Devices, Inc. [AMD] Family 17h/19h HD Audio Controller
@@ -41,8 +44,9 @@ class TestGpuProbes(unittest.TestCase):
 
         
 
+    @patch('src.probes.gpu.GpuProbe._scan_sysfs', return_value=None)
     @patch('src.probes.gpu.run_command')
-    def test_gpu_probe_io_error(self, mock_run_command):        
+    def test_gpu_probe_io_error(self, mock_run_command, mock_scan_sysfs):        
         mock_run_command.side_effect = FileNotFoundError("lspci not found")
         
         probe = GpuProbe()
@@ -56,8 +60,9 @@ class TestGpuProbes(unittest.TestCase):
         self.assertIn('GPU Probe error', result[0])
         self.assertEqual('lspci not found', result[0]['GPU Probe error'])
 
+    @patch('src.probes.gpu.GpuProbe._scan_sysfs', return_value=None)
     @patch('src.probes.gpu.run_command')
-    def test_gpu_probe_corrupt_return(self, mock_run_command):
+    def test_gpu_probe_corrupt_return(self, mock_run_command, mock_scan_sysfs):
         mock_run_command.return_value = """
         Advanced Mirco asd, Inc. [AMD/ATI] Rembrandt [Radeon 680M] (rev c9)
         NVIIDA CORP [NVIDIA] Rembrandt [GTXX 9080] (rev c9)
@@ -70,8 +75,9 @@ class TestGpuProbes(unittest.TestCase):
         self.assertEqual(0, len(result))
 
 
+    @patch('src.probes.gpu.GpuProbe._scan_sysfs', return_value=None)
     @patch('src.probes.gpu.run_command')
-    def test_gpu_probe_execution_error(self, mock_run_command):
+    def test_gpu_probe_execution_error(self, mock_run_command, mock_scan_sysfs):
         """Genel bir komut çalıştırma hatasında (Exception) doğru hatayı döndürür."""
         
         # run_command, FileNotFoundError dışındaki bir exception fırlatsın
@@ -84,4 +90,52 @@ class TestGpuProbes(unittest.TestCase):
         self.assertIsInstance(result, list)
         self.assertEqual(1, len(result))
         self.assertIn('GPU Probe error', result[0])
-        self.assertIn('İzin reddedildi.', result[0]['GPU Probe error'])
\ No newline at end of file
+        self.assertIn('İzin reddedildi.', result[0]['GPU Probe error'])
+
+
+class TestGpuSysfsScan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        devices = {
+            '0000:00:02.0': {'class': '0x030000', 'vendor': '0x8086', 'device': '0x46a6', 'revision': '0x0c'},
+            '0000:00:1f.3': {'class': '0x040380', 'vendor': '0x8086', 'device': '0x51c8'},
+            '0000:01:00.0': {'class': '0x030200', 'vendor': '0x10de', 'device': '0x25a0', 'revision': '0xa1'},
+        }
+        for slot, attributes in devices.items():
+            os.makedirs(os.path.join(self.tmp.name, slot))
+            for attribute, value in attributes.items():
+                with open(os.path.join(self.tmp.name, slot, attribute), 'w') as f:
+                    f.write(value + '\n')
+
+        ids_path = os.path.join(self.tmp.name, 'pci.ids')
+        with open(ids_path, 'w') as f:
+            f.write("# comment\n"
+                    "8086  Intel Corporation\n"
+                    "\t46a6  Alder Lake-P GT2 [Iris Xe Graphics]\n"
+                    "\t\t1028 0b19  subsystem line\n"
+                    "C 03  Display controller\n"
+                    "\t00  VGA compatible controller\n")
+        self.ids = IdsDatabase([ids_path])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch('src.probes.gpu.run_command')
+    def test_gpu_sysfs_scan(self, mock_run_command):
+        """
+        tests if display class devices are read from sysfs without running lspci
+        """
+        with patch('src.probes.gpu.PCI_DEVICES_PATH', self.tmp.name):
+            result = GpuProbe(pci_ids=self.ids).run_probe()
+
+        mock_run_command.assert_not_called()
+        self.assertEqual(2, len(result))
+
+        self.assertEqual('Intel Corporation Alder Lake-P GT2 [Iris Xe Graphics] (rev 0c)', result[0]['model'])
+        self.assertEqual('Intel', result[0]['vendor'])
+        self.assertEqual('0000:00:02.0', result[0]['pci_slot'])
+
+        # ids unknown to the database fall back to hex ids
+        self.assertEqual('Unknown vendor 10de Device 25a0 (rev a1)', result[1]['model'])
+        self.assertEqual('10de', result[1]['vendor_id'])
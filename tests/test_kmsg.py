@@ -0,0 +1,180 @@
+import unittest
+from unittest.mock import patch
+import errno
+import tempfile
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.kmsg import HotplugCursor, KmsgReader, parse_record, format_record
+from src.probes.usb import UsbProbe
+from src.core.utils import set_root, start_recording, stop_recording
+
+
+def fake_reads(records):
+    """
+    os.read replacement returning one kmsg record per call, then EAGAIN
+    """
+    queue = list(records)
+
+    def read(fd, size):
+        if not queue:
+            raise BlockingIOError(errno.EAGAIN, 'Resource temporarily unavailable')
+        item = queue.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item.encode()
+    return read
+
+
+class TestKmsg(unittest.TestCase):
+
+    def test_parse_record(self):
+        record = parse_record("6,1523,11470740123,-;usb 3-2: new full-speed USB device number 4 using xhci_hcd\n"
+                              " SUBSYSTEM=usb\n DEVICE=c189:259\n")
+
+        self.assertEqual(6, record.priority)
+        self.assertEqual(0, record.facility)
+        self.assertEqual(1523, record.sequence)
+        self.assertEqual('usb 3-2: new full-speed USB device number 4 using xhci_hcd', record.message)
+        self.assertEqual('[11470.740123] usb 3-2: new full-speed USB device number 4 using xhci_hcd',
+                         format_record(record))
+
+    def test_parse_malformed_record(self):
+        self.assertIsNone(parse_record('garbage without header'))
+        self.assertIsNone(parse_record('a,b,c;message'))
+
+    @patch('src.core.kmsg.os.open', return_value=99)
+    @patch('src.core.kmsg.os.close')
+    def test_tail_keeps_only_matching_events(self, mock_close, mock_open):
+        """
+        tests if only the last matching hotplug records are kept while streaming
+        """
+        records = [f'6,{seq},{seq * 1000},-;usb 1-{seq}: new high-speed USB device\n' for seq in range(5)]
+        records.insert(2, '6,100,0,-;EXT4-fs (sda1): mounted filesystem\n')
+        records.insert(3, OSError(errno.EPIPE, 'Broken pipe'))
+
+        with patch('src.core.kmsg.os.read', side_effect=fake_reads(records)):
+            with KmsgReader() as reader:
+                events = reader.tail_hotplug_events(limit=3)
+
+        self.assertEqual([2, 3, 4], [event.sequence for event in events])
+        self.assertEqual(1, reader.lost_records)
+
+    @patch('src.probes.usb.iter_command_lines')
+    @patch('src.core.kmsg.os.open', side_effect=PermissionError(errno.EPERM, 'Operation not permitted'))
+    def test_hotplug_dmesg_fallback(self, mock_open, mock_iter_command_lines):
+        mock_iter_command_lines.return_value = iter(["[    1.0] usb 1-1: new high-speed USB device number 2",
+                                                     "[    2.0] usb 1-1: USB disconnect, device number 2"])
+
+        result = UsbProbe().get_hotplug_events()
+
+        self.assertEqual('dmesg', result['source'])
+        self.assertEqual('Active', result['status'])
+        self.assertEqual(2, len(result['recent_events']))
+        self.assertIn('disconnect', result['recent_events'][0])
+
+
+class TestHotplugCursor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp.name, 'cursor.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, records):
+        with patch('src.core.kmsg.os.read', side_effect=fake_reads(records)):
+            return UsbProbe(hotplug_state=self.state_path).get_hotplug_events()
+
+    @patch('src.core.kmsg.read_boot_id', return_value='boot-a')
+    @patch('src.core.kmsg.os.open', return_value=99)
+    @patch('src.core.kmsg.os.close')
+    def test_only_new_events_are_reported(self, mock_close, mock_open, mock_boot_id):
+        """
+        tests if a second run only reports events newer than the stored cursor
+        """
+        first = [f'6,{seq},0,-;usb 1-1: new high-speed USB device number {seq}\n' for seq in range(3)]
+        result = self._run(first)
+        self.assertEqual(3, len(result['recent_events']))
+        self.assertEqual(2, result['cursor']['last_sequence'])
+
+        second = first + ['6,3,0,-;usb 1-1: USB disconnect, device number 2\n']
+        result = self._run(second)
+        self.assertEqual(1, len(result['recent_events']))
+        self.assertIn('disconnect', result['recent_events'][0])
+        self.assertEqual(2, result['cursor']['previous_sequence'])
+        self.assertFalse(result['cursor']['wrapped'])
+
+        result = self._run(second)
+        self.assertEqual('Inactive', result['status'])
+
+    @patch('src.core.kmsg.read_boot_id', return_value='boot-a')
+    @patch('src.core.kmsg.os.open', return_value=99)
+    @patch('src.core.kmsg.os.close')
+    def test_wraparound_is_reported(self, mock_close, mock_open, mock_boot_id):
+        HotplugCursor(self.state_path).save(10)
+
+        # records 11..19 were overwritten before this run
+        result = self._run(['6,20,0,-;usb 2-1: new SuperSpeed USB device number 3\n'])
+
+        self.assertEqual(9, result['cursor']['lost_events'])
+        self.assertTrue(result['cursor']['wrapped'])
+        self.assertEqual(20, HotplugCursor(self.state_path).sequence)
+
+    @patch('src.core.kmsg.read_boot_id')
+    def test_cursor_resets_on_reboot(self, mock_boot_id):
+        mock_boot_id.return_value = 'boot-a'
+        HotplugCursor(self.state_path).save(500)
+
+        mock_boot_id.return_value = 'boot-b'
+        self.assertEqual(-1, HotplugCursor(self.state_path).sequence)
+
+
+class TestKmsgSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        set_root(None)
+        stop_recording()
+        self.tmp.cleanup()
+
+    @patch('src.core.kmsg.os.open', return_value=99)
+    @patch('src.core.kmsg.os.close')
+    def test_records_saved_and_replayed(self, mock_close, mock_open):
+        """
+        tests if records read while recording are saved as text and replayed under a root
+        """
+        records = ["6,1,1000000,-;usb 1-1: new high-speed USB device number 2\n SUBSYSTEM=usb\n",
+                   "6,2,2000000,-;EXT4-fs (sda1): mounted filesystem\n",
+                   "6,3,3000000,-;usb 1-1: USB disconnect, device number 2\n"]
+
+        start_recording()
+        with patch('src.core.kmsg.os.read', side_effect=fake_reads(records)):
+            live = UsbProbe().get_hotplug_events()
+        recorded = stop_recording()
+
+        self.assertEqual(''.join(records), recorded['/dev/kmsg'])
+
+        os.makedirs(os.path.join(self.tmp.name, 'dev'))
+        with open(os.path.join(self.tmp.name, 'dev', 'kmsg'), 'w') as f:
+            f.write(recorded['/dev/kmsg'])
+        set_root(self.tmp.name)
+
+        self.assertEqual(live, UsbProbe().get_hotplug_events())
+        self.assertEqual(2, len(live['recent_events']))
+
+    def test_log_missing_from_root(self):
+        """
+        tests if a root without the kernel log is reported as unavailable instead of an empty dmesg
+        """
+        set_root(self.tmp.name)
+
+        result = UsbProbe().get_hotplug_events()
+
+        self.assertEqual('Unavailable', result['status'])
+        self.assertIn('error', result)
@@ -0,0 +1,73 @@
+import unittest
+import decimal
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.probes.memory import MemoryProbe, format_kb
+
+MEMINFO = """MemTotal:       16089004 kB
+MemFree:         8123456 kB
+MemAvailable:   12000000 kB
+Buffers:          204800 kB
+Cached:          3145728 kB
+SwapTotal:       2097148 kB
+Dirty:               128 kB
+HugePages_Total:       4
+Hugepagesize:       2048 kB
+"""
+
+
+class TestMemoryProbe(unittest.TestCase):
+
+    @patch('src.probes.memory.read_file', return_value=MEMINFO)
+    def test_memory_probe_summary(self, mock_read_file):
+        result = MemoryProbe().run_probe()
+
+        self.assertEqual({'mem_total': '15.34 GB', 'mem_available': '11.44 GB', 'swap_total': '2.00 GB'}, result)
+
+    @patch('src.probes.memory.read_file')
+    def test_memory_probe_raw(self, mock_read_file):
+        """
+        tests if raw mode reports integer counters, PSI averages and paging counters
+        """
+        content = {
+            '/proc/meminfo': MEMINFO,
+            '/proc/pressure/memory': "some avg10=1.50 avg60=0.25 avg300=0.00 total=123456\n"
+                                     "full avg10=0.00 avg60=0.00 avg300=0.00 total=42\n",
+            '/proc/vmstat': "nr_free_pages 823807\npgpgin 577362\npgmajfault 253\noom_kill 0\n",
+        }
+        mock_read_file.side_effect = lambda path: content[path]
+
+        result = MemoryProbe(raw=True).run_probe()
+
+        self.assertEqual(16089004, result['meminfo_kb']['MemTotal'])
+        self.assertEqual(128, result['meminfo_kb']['Dirty'])
+        self.assertEqual(4, result['meminfo_kb']['HugePages_Total'])
+        self.assertEqual(1.5, result['pressure']['some']['avg10'])
+        self.assertEqual(42, result['pressure']['full']['total'])
+        self.assertEqual({'pgpgin': 577362, 'pgmajfault': 253, 'oom_kill': 0}, result['vmstat'])
+
+    @patch('src.probes.memory.read_file')
+    def test_memory_probe_raw_without_psi(self, mock_read_file):
+        def side_effect(path):
+            if path == '/proc/meminfo':
+                return MEMINFO
+            raise FileNotFoundError(path)
+
+        mock_read_file.side_effect = side_effect
+
+        result = MemoryProbe(raw=True).run_probe()
+
+        self.assertIsNone(result['pressure'])
+        self.assertIsNone(result['vmstat'])
+
+    def test_format_kb_matches_decimal(self):
+        """
+        tests if the integer formatting gives the same result as the old Decimal path
+        """
+        for kb in (0, 1, 5242, 5243, 1024 * 1024, 16089004, 987654321):
+            expected = decimal.Decimal(kb) / decimal.Decimal(1024 * 1024)
+            self.assertEqual(f"{expected:.2f} GB", format_kb(kb))
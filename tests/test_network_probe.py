@@ -0,0 +1,233 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import tempfile
+import struct
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.netlink import (IFINFO_HEADER, IFLA_ADDRESS, IFLA_IFNAME, IFLA_MTU, IFLA_OPERSTATE, NLMSG_HEADER,
+                              RTM_DELLINK, RTM_NEWLINK, LinkMonitor, parse_link, parse_messages)
+from src.core.utils import set_root
+from src.probes.network import NetworkProbe
+
+NET_DEV_HEADER = ("Inter-|   Receive                                                |  Transmit\n"
+                  " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n")
+
+
+def net_dev(rows):
+    lines = [f"{name:>6}: {rx_bytes} {rx_packets} {rx_errors} 0 0 0 0 0 {tx_bytes} {tx_packets} 0 {tx_drops} 0 0 0 0"
+             for name, rx_bytes, rx_packets, rx_errors, tx_bytes, tx_packets, tx_drops in rows]
+    return NET_DEV_HEADER + "\n".join(lines) + "\n"
+
+
+class TestNetworkProbe(unittest.TestCase):
+
+    def _sysfs(self, paths):
+        content = {
+            '/sys/class/net/eth0/address': '02:fc:00:00:00:01\n',
+            '/sys/class/net/eth0/operstate': 'up\n',
+            '/sys/class/net/eth0/speed': '10000\n',
+            '/sys/class/net/eth0/duplex': 'full\n',
+            '/sys/class/net/eth0/mtu': '1500\n',
+            '/sys/class/net/veth1/operstate': 'down\n',
+            '/sys/class/net/veth1/speed': '-1\n',
+        }
+        return [content.get(path) for path in paths]
+
+    @patch('src.probes.network.read_files')
+    @patch('src.probes.network.read_file')
+    @patch('os.path.exists', return_value=True)
+    def test_network_probe_from_proc(self, mock_exists, mock_read_file, mock_read_files):
+        """
+        tests if interfaces are listed from /proc/net/dev with lo skipped
+        """
+        mock_read_file.return_value = net_dev([('lo', 1, 1, 0, 1, 1, 0), ('eth0', 0, 0, 0, 0, 0, 0), ('veth1', 0, 0, 0, 0, 0, 0)])
+        mock_read_files.side_effect = self._sysfs
+
+        result = NetworkProbe().run_probe()
+
+        self.assertEqual(['eth0', 'veth1'], list(result))
+        self.assertEqual({'mac': '02:fc:00:00:00:01', 'state': 'up'}, result['eth0'])
+        self.assertEqual({'mac': 'Unknown', 'state': 'down'}, result['veth1'])
+
+    @patch('src.probes.network.read_files')
+    @patch('src.probes.network.read_file')
+    @patch('os.path.exists', return_value=True)
+    def test_network_probe_filters(self, mock_exists, mock_read_file, mock_read_files):
+        mock_read_file.return_value = net_dev([('eth0', 0, 0, 0, 0, 0, 0), ('veth1', 0, 0, 0, 0, 0, 0), ('veth2', 0, 0, 0, 0, 0, 0)])
+        mock_read_files.side_effect = self._sysfs
+
+        result = NetworkProbe(include=['veth*', 'eth*'], exclude=['veth2']).run_probe()
+
+        self.assertEqual(['eth0', 'veth1'], list(result))
+
+    @patch('src.probes.network.time.sleep')
+    @patch('src.probes.network.time.monotonic')
+    @patch('src.probes.network.read_files')
+    @patch('src.probes.network.read_file')
+    @patch('os.path.exists', return_value=True)
+    def test_network_rate_sampling(self, mock_exists, mock_read_file, mock_read_files, mock_monotonic, mock_sleep):
+        """
+        tests if per-second rates and link attributes are reported in sampling mode
+        """
+        mock_monotonic.side_effect = [100.0, 102.0]
+        mock_read_file.side_effect = [
+            net_dev([('eth0', 1000, 10, 0, 2000, 20, 0), ('veth1', 0, 0, 0, 0, 0, 0)]),
+            net_dev([('eth0', 5000, 30, 4, 2000, 20, 6), ('veth1', 0, 0, 0, 0, 0, 0)]),
+        ]
+        mock_read_files.side_effect = self._sysfs
+
+        result = NetworkProbe(sample_interval=2).run_probe()
+        rates = result['eth0']['rates']
+
+        self.assertEqual(2000.0, rates['rx_bytes_per_sec'])
+        self.assertEqual(10.0, rates['rx_packets_per_sec'])
+        self.assertEqual(2.0, rates['rx_errors_per_sec'])
+        self.assertEqual(3.0, rates['tx_drops_per_sec'])
+        self.assertEqual(0.0, rates['tx_bytes_per_sec'])
+
+        self.assertEqual(10000, result['eth0']['speed_mbps'])
+        self.assertEqual('full', result['eth0']['duplex'])
+        self.assertEqual(1500, result['eth0']['mtu'])
+        self.assertIsNone(result['veth1']['speed_mbps'])
+        mock_sleep.assert_called_once_with(2)
+
+    def test_host_namespace_under_root(self):
+        """
+        tests if a mounted host /proc is read through pid 1, /proc/net links to the namespace of this process
+        """
+        with tempfile.TemporaryDirectory() as root:
+            files = {
+                'proc/self/net/dev': net_dev([('eth0', 0, 0, 0, 0, 0, 0)]),
+                'proc/1/net/dev': net_dev([('lo', 0, 0, 0, 0, 0, 0), ('enp3s0', 0, 0, 0, 0, 0, 0)]),
+                'sys/class/net/enp3s0/address': '02:fc:00:00:00:02\n',
+                'sys/class/net/enp3s0/operstate': 'up\n',
+            }
+            for name, content in files.items():
+                os.makedirs(os.path.dirname(os.path.join(root, name)), exist_ok=True)
+                with open(os.path.join(root, name), 'w') as f:
+                    f.write(content)
+            os.symlink('self/net', os.path.join(root, 'proc', 'net'))
+
+            set_root(root)
+            try:
+                result = NetworkProbe().run_probe()
+            finally:
+                set_root(None)
+
+        self.assertEqual({'enp3s0': {'mac': '02:fc:00:00:00:02', 'state': 'up'}}, result)
+
+
+def rtattr(attr_type, value):
+    length = 4 + len(value)
+    padding = b'\0' * ((4 - length % 4) % 4)
+    return struct.pack('=HH', length, attr_type) + value + padding
+
+
+def link_message(msg_type, index, name, operstate, mac=b'\x02\xfc\x00\x00\x00\x01'):
+    payload = IFINFO_HEADER.pack(0, 1, index, 0, 0)
+    payload += rtattr(IFLA_IFNAME, name.encode() + b'\0')
+    payload += rtattr(IFLA_ADDRESS, mac)
+    payload += rtattr(IFLA_MTU, struct.pack('=I', 1500))
+    payload += rtattr(IFLA_OPERSTATE, bytes([operstate]))
+    return NLMSG_HEADER.pack(NLMSG_HEADER.size + len(payload), msg_type, 0, 0, 0) + payload
+
+
+class TestNetlink(unittest.TestCase):
+
+    def test_parse_link_messages(self):
+        """
+        tests if a datagram with several RTM_NEWLINK messages is decoded
+        """
+        data = link_message(RTM_NEWLINK, 2, 'eth0', 6) + link_message(RTM_NEWLINK, 3, 'veth1', 2)
+        links = [parse_link(payload) for msg_type, payload in parse_messages(data)]
+
+        self.assertEqual(['eth0', 'veth1'], [link['name'] for link in links])
+        self.assertEqual('up', links[0]['state'])
+        self.assertEqual('down', links[1]['state'])
+        self.assertEqual('02:fc:00:00:00:01', links[0]['mac'])
+        self.assertEqual(1500, links[0]['mtu'])
+
+    def test_link_state_events(self):
+        monitor = LinkMonitor()
+        monitor.links = {2: {'index': 2, 'name': 'eth0', 'state': 'up'}}
+
+        def event(data):
+            msg_type, payload = next(parse_messages(data))
+            return monitor._apply(msg_type, payload)
+
+        self.assertIsNone(event(link_message(RTM_NEWLINK, 2, 'eth0', 6)))
+        self.assertEqual({'event': 'changed', 'iface': 'eth0', 'old_state': 'up', 'state': 'down'},
+                         event(link_message(RTM_NEWLINK, 2, 'eth0', 2)))
+        self.assertEqual('added', event(link_message(RTM_NEWLINK, 5, 'veth9', 6))['event'])
+        self.assertEqual('removed', event(link_message(RTM_DELLINK, 5, 'veth9', 2))['event'])
+        self.assertNotIn(5, monitor.links)
+
+    def test_link_rename(self):
+        """
+        tests if a rename (same ifindex, new name) replaces the old name instead of adding a link
+        """
+        monitor = LinkMonitor()
+        monitor.links = {2: {'index': 2, 'name': 'eth0', 'state': 'up'}}
+
+        msg_type, payload = next(parse_messages(link_message(RTM_NEWLINK, 2, 'enp3s0', 6)))
+        event = monitor._apply(msg_type, payload)
+
+        self.assertEqual({'event': 'renamed', 'iface': 'enp3s0', 'old_iface': 'eth0', 'old_state': 'up', 'state': 'up'},
+                         event)
+        self.assertEqual(['enp3s0'], [link['name'] for link in monitor.links.values()])
+
+    @patch('src.probes.network.LinkMonitor')
+    @patch('os.path.exists', return_value=True)
+    def test_network_probe_netlink_backend(self, mock_exists, mock_monitor):
+        monitor = mock_monitor.return_value.open.return_value
+        monitor.links = {
+            1: {'index': 1, 'name': 'lo', 'mac': '00:00:00:00:00:00', 'state': 'unknown'},
+            2: {'index': 2, 'name': 'eth0', 'mac': '02:fc:00:00:00:01', 'state': 'up'},
+        }
+
+        probe = NetworkProbe(backend='netlink')
+        result = probe.run_probe()
+        probe.run_probe()
+
+        self.assertEqual({'eth0': {'mac': '02:fc:00:00:00:01', 'state': 'up'}}, result)
+        # the second run only drains pushed events instead of dumping again
+        mock_monitor.return_value.open.assert_called_once()
+        monitor.poll.assert_called_once()
+
+    @patch('src.probes.network.read_files')
+    @patch('src.probes.network.read_file')
+    @patch('src.probes.network.LinkMonitor')
+    @patch('os.path.exists', return_value=True)
+    def test_netlink_sampling_reads_speed_on_state_change(self, mock_exists, mock_monitor, mock_read_file, mock_read_files):
+        """
+        tests if the netlink backend takes mtu from the link and only reads speed and duplex
+        of new links or links whose state changed
+        """
+        monitor = mock_monitor.return_value.open.return_value
+        monitor.links = {
+            2: {'index': 2, 'name': 'eth0', 'mac': '02:fc:00:00:00:01', 'state': 'up', 'mtu': 9000},
+            3: {'index': 3, 'name': 'veth1', 'mac': '02:fc:00:00:00:02', 'state': 'up', 'mtu': 1500},
+        }
+        mock_read_file.return_value = net_dev([('eth0', 0, 0, 0, 0, 0, 0), ('veth1', 0, 0, 0, 0, 0, 0)])
+        mock_read_files.side_effect = lambda paths: TestNetworkProbe._sysfs(self, paths)
+
+        probe = NetworkProbe(sample_interval=0, backend='netlink')
+        result = probe.run_probe()
+        self.assertEqual({'speed_mbps': 10000, 'duplex': 'full', 'mtu': 9000},
+                         {key: result['eth0'][key] for key in ('speed_mbps', 'duplex', 'mtu')})
+        self.assertEqual(['/sys/class/net/eth0/speed', '/sys/class/net/veth1/speed'], mock_read_files.call_args_list[0][0][0])
+        self.assertEqual(2, mock_read_files.call_count)
+
+        mock_read_files.reset_mock()
+        probe.run_probe()
+        mock_read_files.assert_not_called()
+
+        monitor.links[3]['state'] = 'down'
+        result = probe.run_probe()
+        self.assertEqual([['/sys/class/net/veth1/speed'], ['/sys/class/net/veth1/duplex']],
+                         [call[0][0] for call in mock_read_files.call_args_list])
+        self.assertEqual(1500, result['veth1']['mtu'])
+        self.assertEqual(9000, result['eth0']['mtu'])
@@ -0,0 +1,67 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import perf
+from src.core.utils import read_file, read_files, iter_lines
+
+
+class TestPerf(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'meminfo')
+        with open(self.path, 'w') as f:
+            f.write('MemTotal: 1024 kB\nMemFree: 512 kB\n')
+
+    def tearDown(self):
+        perf.disable()
+        self.tmp.cleanup()
+
+    def test_reads_counted_per_probe(self):
+        """
+        tests if file reads, failures and bytes are attributed to the running probe
+        """
+        perf.enable()
+        with perf.probe_scope('memory'):
+            read_file(self.path)
+            read_files([self.path, os.path.join(self.tmp.name, 'missing')])
+            list(iter_lines(self.path))
+            with self.assertRaises(OSError):
+                read_file(os.path.join(self.tmp.name, 'missing'))
+
+        counters = perf.disable().to_dict()['memory']
+        self.assertEqual(3, counters['files_read'])
+        self.assertEqual(2, counters['read_errors'])
+        self.assertEqual(34 * 3, counters['bytes_read'])
+        self.assertEqual(self.path, counters['slowest_reads'][0]['path'])
+        self.assertGreater(counters['wall_ms'], 0)
+
+    def test_bound_worker_threads(self):
+        """
+        tests if reads on worker threads count for the probe that started them
+        """
+        perf.enable()
+        with perf.probe_scope('disk'):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(perf.bind(read_file), [self.path] * 4))
+
+        report = perf.disable().to_dict()
+        self.assertEqual(4, report['disk']['files_read'])
+        self.assertNotIn('_unattributed', report)
+
+    def test_disabled(self):
+        """
+        tests if nothing is collected and bind is a no-op while profiling is off
+        """
+        read_file(self.path)
+        self.assertIsNone(perf.collector)
+        self.assertIs(read_file, perf.bind(read_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
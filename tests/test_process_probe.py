@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import tempfile
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.probes.process import ProcessProbe, TopN
+
+
+class TestProcessProbe(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self._write('uptime', '1000.00 900.00\n')
+        self._write('meminfo', 'MemTotal: 1 kB\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def _add_process(self, pid, name, cpu_ticks, rss_pages, start_ticks=0):
+        # utime is the 14th field, stime the 15th, starttime the 22nd
+        fields = ['S', '1'] + ['0'] * 9 + [str(cpu_ticks), '0'] + ['0'] * 6 + [str(start_ticks), '0', '0']
+        self._write(f'{pid}/stat', f"{pid} ({name}) {' '.join(fields)}\n")
+        self._write(f'{pid}/statm', f"1000 {rss_pages} 10 1 0 100 0\n")
+
+    def test_top_rss_and_cpu(self):
+        """
+        tests if only the top N processes by memory and cpu are reported
+        """
+        self._add_process(1, 'init', cpu_ticks=100, rss_pages=50)
+        self._add_process(20, 'web (worker) 1', cpu_ticks=5000, rss_pages=10)
+        self._add_process(300, 'db', cpu_ticks=2000, rss_pages=900)
+
+        with patch('src.probes.process.PROC_PATH', self.tmp.name), \
+             patch('src.probes.process.CLOCK_TICKS', 100), \
+             patch('src.probes.process.PAGE_SIZE', 4096):
+            result = ProcessProbe(top=2).run_probe()
+
+        self.assertEqual(3, result['process_count'])
+        self.assertEqual(['db', 'init'], [p['name'] for p in result['top_rss']])
+        self.assertEqual(900 * 4096, result['top_rss'][0]['rss_bytes'])
+        self.assertEqual(['web (worker) 1', 'db'], [p['name'] for p in result['top_cpu']])
+        # 5000 ticks over 1000 seconds of lifetime
+        self.assertEqual(5.0, result['top_cpu'][0]['cpu_percent'])
+
+    @patch('src.probes.process.time.sleep')
+    @patch('src.probes.process.time.monotonic')
+    def test_cpu_delta_sampling(self, mock_monotonic, mock_sleep):
+        self._add_process(1, 'idle', cpu_ticks=100, rss_pages=50)
+        self._add_process(2, 'busy', cpu_ticks=100, rss_pages=50)
+        mock_monotonic.side_effect = [0.0, 2.0]
+
+        def sleep(seconds):
+            self._add_process(2, 'busy', cpu_ticks=250, rss_pages=50)
+
+        mock_sleep.side_effect = sleep
+
+        with patch('src.probes.process.PROC_PATH', self.tmp.name), \
+             patch('src.probes.process.CLOCK_TICKS', 100):
+            result = ProcessProbe(top=1, sample_interval=2).run_probe()
+
+        self.assertEqual('interval', result['cpu_mode'])
+        self.assertEqual('busy', result['top_cpu'][0]['name'])
+        self.assertEqual(75.0, result['top_cpu'][0]['cpu_percent'])
+
+    def test_top_n_is_bounded(self):
+        top = TopN(3)
+        for value in range(1000):
+            top.push(value, value, value)
+
+        self.assertEqual([999, 998, 997], top.items())
+        self.assertEqual(3, len(top._heap))
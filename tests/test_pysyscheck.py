@@ -0,0 +1,134 @@
+import unittest
+from unittest.mock import MagicMock
+import time
+import json
+import io
+import subprocess
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pysyscheck import PySysCheck
+from src.core.stream import NdjsonWriter
+
+
+class TestPySysCheck(unittest.TestCase):
+
+    def _make_app(self, **kwargs):
+        app = PySysCheck(**kwargs)
+
+        fast = MagicMock()
+        fast.run_probe.return_value = {'state': 'ok'}
+
+        slow = MagicMock()
+        slow.run_probe.side_effect = lambda: time.sleep(1) or {'state': 'late'}
+
+        app.probes = {'fast': fast, 'slow': slow}
+        return app
+
+    def test_parallel_run_timeout(self):
+        """
+        tests if a probe missing its deadline gets a timeout entry
+        """
+        app = self._make_app(jobs=2, timeout=0.2)
+
+        start = time.monotonic()
+        app.run_check('all')
+        elapsed = time.monotonic() - start
+
+        device_info = app.report['device_info']
+        self.assertEqual({'state': 'ok'}, device_info['fast'])
+        self.assertTrue(device_info['slow']['timed_out'])
+        self.assertIn('error', device_info['slow'])
+        self.assertLess(elapsed, 1)
+
+    def test_timed_out_probe_does_not_block_exit(self):
+        """
+        tests if the process exits right after the report, without waiting for a stalled probe
+        """
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        code = (
+            'import time\n'
+            'from unittest.mock import MagicMock\n'
+            'from pysyscheck import PySysCheck\n'
+            'app = PySysCheck(jobs=2, timeout=0.2)\n'
+            'slow = MagicMock()\n'
+            'slow.run_probe.side_effect = lambda: time.sleep(5)\n'
+            "app.probes = {'slow': slow}\n"
+            "app.run_check('all')\n"
+            "assert app.report['device_info']['slow']['timed_out']\n"
+        )
+
+        start = time.monotonic()
+        subprocess.run([sys.executable, '-c', code], cwd=root, check=True, capture_output=True)
+
+        self.assertLess(time.monotonic() - start, 3)
+
+    def test_stalled_probe_not_restarted(self):
+        """
+        tests if a probe still running from a timed out run is reported as stalled instead of started again
+        """
+        app = self._make_app(jobs=2, timeout=0.2)
+
+        app.run_check('all')
+        app.run_check('all')
+
+        self.assertEqual(1, app.probes['slow'].run_probe.call_count)
+        self.assertEqual(2, app.probes['fast'].run_probe.call_count)
+        self.assertTrue(app.report['device_info']['slow']['stalled'])
+
+    def test_close_releases_loaded_probes(self):
+        """
+        tests if closing the app closes only the probes that were loaded
+        """
+        app = PySysCheck(net_backend='netlink')
+        network = app.probes['network']
+        network._monitor = MagicMock()
+        monitor = network._monitor
+
+        app.close()
+
+        monitor.close.assert_called_once()
+        self.assertIsNone(network._monitor)
+        self.assertEqual(['network'], app.probes.loaded())
+
+    def test_parallel_run_keeps_probe_order(self):
+        app = self._make_app(jobs=2)
+        app.run_check('all')
+
+        self.assertEqual(['fast', 'slow'], list(app.report['device_info']))
+        self.assertEqual({'state': 'late'}, app.report['device_info']['slow'])
+
+    def test_probe_exception_is_reported(self):
+        app = self._make_app(jobs=2)
+        app.probes['fast'].run_probe.side_effect = RuntimeError('boom')
+        app.run_check('fast')
+
+        self.assertEqual({'error': 'boom'}, app.report['device_info']['fast'])
+
+    def test_ndjson_streams_in_completion_order(self):
+        """
+        tests if every probe result is written as its own line as soon as it completes
+        """
+        app = self._make_app(jobs=2)
+        stream = io.StringIO()
+        app.run_check('all', writer=NdjsonWriter(stream))
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(['report', 'probe', 'probe', 'test_results'], [line['type'] for line in lines])
+        self.assertEqual(['fast', 'slow'], [line['probe'] for line in lines if line['type'] == 'probe'])
+        self.assertEqual({'state': 'late'}, lines[2]['data'])
+        # compact separators, one object per line
+        self.assertNotIn(', ', stream.getvalue())
+
+    def test_profile_section(self):
+        """
+        tests if --profile adds per probe counters under _perf
+        """
+        app = self._make_app(jobs=2, profile=True)
+        app.run_check('all')
+
+        self.assertIn('_perf', app.report)
+        self.assertGreaterEqual(app.report['_perf']['probes']['slow']['wall_ms'], 1000)
+        self.assertIn('health_checks', app.report['_perf']['probes'])
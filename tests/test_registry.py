@@ -0,0 +1,62 @@
+import unittest
+import subprocess
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.probes.registry import ProbeRegistry, PROBE_MODULES
+from pysyscheck import PySysCheck
+
+
+class TestProbeRegistry(unittest.TestCase):
+
+    def test_probe_constructed_on_access(self):
+        """
+        tests if a probe is only constructed when accessed, with its options
+        """
+        registry = ProbeRegistry({'memory': {'raw': True}})
+
+        self.assertIn('memory', registry)
+        self.assertEqual([], registry.loaded())
+        self.assertEqual(list(PROBE_MODULES), list(registry))
+
+        probe = registry['memory']
+        self.assertTrue(probe.raw)
+        self.assertIs(probe, registry['memory'])
+        self.assertEqual(['memory'], registry.loaded())
+        self.assertEqual({'import_ms', 'construct_ms'}, set(registry.timings['memory']))
+
+    def test_unknown_probe(self):
+        registry = ProbeRegistry()
+        self.assertNotIn('floppy', registry)
+        with self.assertRaises(KeyError):
+            registry['floppy']
+
+    def test_single_check_loads_one_probe(self):
+        """
+        tests if a single probe run constructs only that probe and reports its startup time
+        """
+        app = PySysCheck(startup_profile=True)
+        app.run_check('os')
+
+        self.assertEqual(['os'], app.probes.loaded())
+        self.assertEqual(['os'], list(app.report['startup']['probes']))
+        self.assertGreater(app.report['startup']['orchestrator_import_ms'], 0)
+
+    def test_orchestrator_imports(self):
+        """
+        tests if importing the orchestrator doesn't import what only some modes need
+        """
+        lazy = ['concurrent.futures', 'tempfile', 'tarfile', 'src.core.cache', 'src.core.kmsg', 'src.core.sampler',
+                'src.core.stream', 'src.core.timeseries', 'src.core.snapshot', 'src.probes.cpu']
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        code = f'import sys, pysyscheck; print([name for name in {lazy!r} if name in sys.modules])'
+
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+
+        self.assertEqual('[]', output.stdout.strip())
+
+
+if __name__ == '__main__':
+    unittest.main()
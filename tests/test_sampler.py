@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.sampler import Sampler
+
+
+class TestSampler(unittest.TestCase):
+
+    def test_ring_buffer_keeps_last_samples(self):
+        """
+        tests if only the last `history` samples are kept per probe
+        """
+        ticks = iter(range(100))
+
+        def collect(names, on_result):
+            tick = next(ticks)
+            return {name: {'tick': tick} for name in names}
+
+        sampler = Sampler(['cpu', 'memory'], collect, interval=0, history=3)
+        sampler.run(count=5)
+
+        self.assertEqual(3, len(sampler.history['cpu']))
+        self.assertEqual([2, 3, 4], [s['data']['tick'] for s in sampler.history['cpu']])
+        self.assertEqual('memory', sampler.history['memory'][-1]['probe'])
+
+    def test_samples_are_emitted(self):
+        emitted = []
+        sampler = Sampler(['cpu'], lambda names, on_result: {'cpu': {}}, interval=0, emit=emitted.append)
+        sampler.run(count=2)
+
+        self.assertEqual(2, len(emitted))
+        self.assertIn('timestamp', emitted[0])
+
+    def test_samples_emitted_as_probes_complete(self):
+        """
+        tests if a probe's sample is emitted before the other probes of the tick have completed
+        """
+        emitted = []
+
+        def collect(names, on_result):
+            on_result('memory', {'fast': True})
+            # the memory sample is already out while cpu is still running
+            self.assertEqual(['memory'], [sample['probe'] for sample in emitted])
+            on_result('cpu', {'fast': False})
+            return {'memory': {'fast': True}, 'cpu': {'fast': False}}
+
+        sampler = Sampler(['cpu', 'memory'], collect, interval=0, emit=emitted.append)
+        sampler.run(count=1)
+
+        self.assertEqual(['memory', 'cpu'], [sample['probe'] for sample in emitted])
+        self.assertEqual(1, len(sampler.history['cpu']))
@@ -0,0 +1,149 @@
+import unittest
+from unittest.mock import patch
+from contextlib import redirect_stderr
+import tempfile
+import io
+import struct
+import math
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.timeseries import TimeSeriesWriter, TimeSeriesReader, flatten_metrics
+from pysyscheck import main
+
+
+class TestTimeSeries(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'metrics.bin')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, samples):
+        with TimeSeriesWriter(self.path) as writer:
+            for timestamp, metrics in samples:
+                writer.append(timestamp, metrics)
+
+    def test_flatten_metrics(self):
+        """
+        tests if only numeric leaves are kept, with dotted names
+        """
+        data = {'cpu': {'model_name': 'x', 'utilization': {'busy_percent': 12.5}, 'flags': ['sse'], 'vmx': True},
+                'memory': {'total': 1024}}
+        self.assertEqual({'cpu.utilization.busy_percent': 12.5, 'memory.total': 1024.0}, flatten_metrics(data))
+
+    def test_flatten_per_core_columns(self):
+        """
+        tests if lists of numbers are indexed by position and lists of records are skipped
+        """
+        data = {'per_core': {'busy': [10.0, 20.5]}, 'gpu': [{'vendor_id': 4318}]}
+        self.assertEqual({'per_core.busy.0': 10.0, 'per_core.busy.1': 20.5}, flatten_metrics(data))
+
+    def test_write_and_slice(self):
+        """
+        tests if a time range is sliced from the mapped file
+        """
+        self._write([(float(t), {'a': t * 2, 'b': t * 3}) for t in range(10)])
+
+        with TimeSeriesReader(self.path) as reader:
+            self.assertEqual(['a', 'b'], reader.fields)
+            self.assertEqual(10, len(reader))
+
+            records = list(reader.records(start=3, end=5))
+            self.assertEqual([3.0, 4.0, 5.0], [timestamp for timestamp, _ in records])
+            self.assertEqual({'a': 6.0, 'b': 9.0}, records[0][1])
+
+            timestamps, values = reader.column('b', start=7.5)
+            self.assertEqual([8.0, 9.0], list(timestamps))
+            self.assertEqual([24.0, 27.0], list(values))
+
+            self.assertEqual([], list(reader.records(start=20)))
+
+    def test_append_keeps_fields(self):
+        """
+        tests if reopening appends with the stored fields and missing values become NaN
+        """
+        self._write([(1.0, {'a': 1, 'b': 2})])
+        self._write([(2.0, {'a': 3, 'c': 4})])
+
+        with TimeSeriesReader(self.path) as reader:
+            self.assertEqual(['a', 'b'], reader.fields)
+            records = list(reader.records())
+
+        self.assertEqual(2, len(records))
+        self.assertEqual(3.0, records[1][1]['a'])
+        self.assertTrue(math.isnan(records[1][1]['b']))
+
+    def test_new_fields_reported_once(self):
+        """
+        tests if fields appearing after the first sample are returned once so the caller can warn
+        """
+        with TimeSeriesWriter(self.path) as writer:
+            self.assertEqual([], writer.append(1.0, {'a': 1}))
+            self.assertEqual(['disk.sdb', 'net.eth1'], writer.append(2.0, {'a': 2, 'net.eth1': 3, 'disk.sdb': 4}))
+            self.assertEqual([], writer.append(3.0, {'a': 3, 'net.eth1': 5}))
+
+    def test_requires_watch(self):
+        """
+        tests if --timeseries without --watch is rejected instead of silently ignored
+        """
+        with patch.object(sys, 'argv', ['pysyscheck.py', '--timeseries', self.path]):
+            with redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    main()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_partial_record_is_dropped(self):
+        """
+        tests if a record cut by an interrupted write is truncated before appending
+        """
+        self._write([(1.0, {'a': 1})])
+        with open(self.path, 'ab') as f:
+            f.write(b'\x00\x01\x02')
+        self._write([(2.0, {'a': 2})])
+
+        with TimeSeriesReader(self.path) as reader:
+            self.assertEqual([(1.0, {'a': 1.0}), (2.0, {'a': 2.0})], list(reader.records()))
+
+    def test_more_than_65535_fields(self):
+        """
+        tests if a field set past the uint16 range of version 1 is stored and read back
+        """
+        metrics = {f'net.veth{index}.rx_bytes_per_sec': float(index) for index in range(70000)}
+        self._write([(1.0, metrics)])
+
+        with TimeSeriesReader(self.path) as reader:
+            self.assertEqual(70000, len(reader.fields))
+            self.assertEqual([69999.0], list(reader.column('net.veth69999.rx_bytes_per_sec')[1]))
+
+    def test_version_1_file(self):
+        """
+        tests if files written with the uint16 field count header are still read and appended to
+        """
+        names = b'a\nb'
+        header = struct.pack('<4sHHI', b'PSTS', 1, 2, len(names)) + names
+        with open(self.path, 'wb') as f:
+            f.write(header.ljust(16, b'\0') + struct.pack('<3d', 1.0, 1.0, 2.0))
+        self._write([(2.0, {'a': 3, 'b': 4})])
+
+        with TimeSeriesReader(self.path) as reader:
+            self.assertEqual(['a', 'b'], reader.fields)
+            self.assertEqual([(1.0, {'a': 1.0, 'b': 2.0}), (2.0, {'a': 3.0, 'b': 4.0})], list(reader.records()))
+
+    def test_invalid_file(self):
+        """
+        tests if files without the header are rejected
+        """
+        with open(self.path, 'wb') as f:
+            f.write(b'{"not": "binary"}')
+
+        with self.assertRaises(ValueError):
+            TimeSeriesReader(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import tempfile
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.ids import IdsDatabase
+from src.probes.usb import UsbProbe
+
+
+class TestUsbProbe(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.devices_path = os.path.join(self.tmp.name, 'devices')
+        devices = {
+            'usb1': {'idVendor': '1d6b', 'idProduct': '0002', 'manufacturer': 'Linux 6.1.0 xhci-hcd',
+                     'product': 'xHCI Host Controller', 'speed': '480', 'busnum': '1', 'devnum': '1'},
+            '1-2': {'idVendor': '046d', 'idProduct': 'c52b', 'speed': '12', 'busnum': '1', 'devnum': '4'},
+            '1-2:1.0': {'bInterfaceClass': '03'},
+        }
+        for entry, attributes in devices.items():
+            os.makedirs(os.path.join(self.devices_path, entry))
+            for attribute, value in attributes.items():
+                with open(os.path.join(self.devices_path, entry, attribute), 'w') as f:
+                    f.write(value + '\n')
+
+        ids_path = os.path.join(self.tmp.name, 'usb.ids')
+        with open(ids_path, 'w') as f:
+            f.write("046d  Logitech, Inc.\n"
+                    "\tc52b  Unifying Receiver\n"
+                    "C 00  (Defined at Interface level)\n")
+        self.ids = IdsDatabase([ids_path])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch('src.probes.usb.run_command')
+    def test_usb_sysfs_scan(self, mock_run_command):
+        """
+        tests if devices are enumerated from sysfs without running lsusb
+        """
+        with patch('src.probes.usb.USB_DEVICES_PATH', self.devices_path):
+            result = UsbProbe(usb_ids=self.ids).run_probe()
+
+        mock_run_command.assert_not_called()
+        self.assertEqual(2, len(result))
+
+        self.assertEqual('Linux 6.1.0 xhci-hcd xHCI Host Controller', result[0]['name'])
+        self.assertEqual(480, result[0]['speed_mbps'])
+
+        # no string descriptors, name comes from usb.ids
+        self.assertEqual('Logitech, Inc. Unifying Receiver', result[1]['name'])
+        self.assertIsNone(result[1]['product'])
+        self.assertEqual((1, 4), (result[1]['bus'], result[1]['device']))
+
+    @patch('src.probes.usb.UsbProbe._scan_sysfs', return_value=None)
+    @patch('src.probes.usb.run_command')
+    def test_usb_lsusb_fallback(self, mock_run_command, mock_scan_sysfs):
+        mock_run_command.return_value = (
+            "Bus 002 Device 001: ID 1d6b:0003 Linux Foundation 3.0 root hub\n"
+            "Bus 001 Device 003: ID 8087:0033\n"
+        )
+
+        result = UsbProbe().run_probe()
+
+        self.assertEqual(2, len(result))
+        self.assertEqual('Linux Foundation 3.0 root hub', result[0]['name'])
+        self.assertEqual(('1d6b', '0003'), (result[0]['vendor_id'], result[0]['product_id']))
+        self.assertEqual((2, 1), (result[0]['bus'], result[0]['device']))
+        self.assertEqual('8087:0033', result[1]['name'])
+
+    @patch('src.probes.usb.UsbProbe._scan_sysfs', return_value=None)
+    @patch('src.probes.usb.run_command', return_value=None)
+    def test_usb_lsusb_failed(self, mock_run_command, mock_scan_sysfs):
+        result = UsbProbe().run_probe()
+
+        self.assertIn('error', result[0])
@@ -0,0 +1,220 @@
+import unittest
+from unittest.mock import patch
+import errno
+import subprocess
+import tempfile
+import threading
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.utils import (CachedFileReader, default_max_handles, disable_handle_cache, enable_handle_cache, read_file,
+                            read_files, iter_lines, run_command, set_root, start_recording, stop_recording)
+from src.core.snapshot import write_snapshot, extract_snapshot, is_snapshot
+
+
+class TestCachedFileReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reader = CachedFileReader(max_handles=2, buffer_size=8)
+
+    def tearDown(self):
+        self.reader.close()
+        self.tmp.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_reread_sees_new_content(self):
+        """
+        tests if a cached descriptor re-reads the file from offset 0
+        """
+        path = self._write('stat', 'first value longer than the buffer\n')
+        self.assertEqual('first value longer than the buffer\n', self.reader.read(path))
+
+        with open(path, 'w') as f:
+            f.write('second\n')
+        self.assertEqual('second\n', self.reader.read(path))
+
+    def test_lru_eviction(self):
+        paths = [self._write(name, name) for name in ('a', 'b', 'c')]
+        for path in paths:
+            self.reader.read(path)
+
+        self.assertEqual(paths[1:], list(self.reader._handles))
+
+    def test_stale_handle_is_reopened(self):
+        """
+        tests if ENODEV on a cached descriptor drops it and retries
+        """
+        path = self._write('operstate', 'up\n')
+        self.reader.read(path)
+
+        real_preadv = os.preadv
+        calls = []
+
+        def flaky_preadv(*args):
+            if not calls:
+                calls.append(1)
+                raise OSError(errno.ENODEV, 'No such device')
+            return real_preadv(*args)
+
+        with patch('src.core.utils.os.preadv', side_effect=flaky_preadv):
+            self.assertEqual('up\n', self.reader.read(path))
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            self.reader.read(os.path.join(self.tmp.name, 'gone'))
+
+    def test_failed_handle_is_dropped(self):
+        """
+        tests if a descriptor is closed after any read error, stale or not
+        """
+        path = self._write('stat', 'value\n')
+        self.reader.read(path)
+
+        with patch('src.core.utils.os.preadv', side_effect=OSError(errno.EIO, 'Input/output error')):
+            with self.assertRaises(OSError):
+                self.reader.read(path)
+        self.assertNotIn(path, self.reader._handles)
+
+        with patch('src.core.utils.os.preadv', side_effect=OSError(errno.ESRCH, 'No such process')):
+            with self.assertRaises(OSError):
+                self.reader.read(path)
+        self.assertNotIn(path, self.reader._handles)
+
+    def test_exited_process_not_cached(self):
+        """
+        tests if per process files are read without a cached descriptor, so an exited pid isn't read again
+        """
+        process = subprocess.Popen(['sleep', '30'])
+        path = f'/proc/{process.pid}/stat'
+        try:
+            self.assertIn('sleep', self.reader.read(path))
+            self.assertNotIn(path, self.reader._handles)
+        finally:
+            process.kill()
+            process.wait()
+
+        with self.assertRaises(FileNotFoundError):
+            self.reader.read(path)
+
+    @patch('src.core.utils.resource.getrlimit', return_value=(1024, 4096))
+    @patch('src.core.utils.os.cpu_count', return_value=256)
+    def test_default_size_fits_per_cpu_files(self, mock_cpu_count, mock_getrlimit):
+        """
+        tests if the default cache holds one cpufreq file per CPU on a 256 thread host
+        """
+        self.assertGreater(default_max_handles(), 256 + 32)
+        self.assertLessEqual(default_max_handles(), 512)
+
+        try:
+            self.assertEqual(default_max_handles(), enable_handle_cache().max_handles)
+        finally:
+            disable_handle_cache()
+
+    def test_reads_run_in_parallel(self):
+        """
+        tests if a slow read doesn't block reads of other threads, and a descriptor evicted while
+        it is being read is only closed once the read is done
+        """
+        slow, *others = [self._write(name, name) for name in ('slow', 'a', 'b')]
+        slow_fd = self.reader._acquire(slow)
+        self.reader._release(slow, slow_fd)
+
+        real_preadv = os.preadv
+        entered, resume = threading.Event(), threading.Event()
+
+        def blocking_preadv(fd, buffers, offset):
+            if fd == slow_fd and offset == 0:
+                entered.set()
+                resume.wait(5)
+            return real_preadv(fd, buffers, offset)
+
+        results = {}
+        with patch('src.core.utils.os.preadv', side_effect=blocking_preadv):
+            thread = threading.Thread(target=lambda: results.setdefault('slow', self.reader.read(slow)))
+            thread.start()
+            self.assertTrue(entered.wait(5))
+
+            # both reads evict the slow descriptor from the 2 entry cache while it is in use
+            self.assertEqual(['a', 'b'], [self.reader.read(path) for path in others])
+            self.assertNotIn(slow, self.reader._handles)
+            self.assertTrue(thread.is_alive())
+
+            resume.set()
+            thread.join(5)
+
+        self.assertEqual('slow', results['slow'])
+        with self.assertRaises(OSError):
+            os.fstat(slow_fd)
+
+
+class TestReadFiles(unittest.TestCase):
+
+    def test_batch_read(self):
+        """
+        tests if every file is read through the shared buffer, missing ones as None
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name, content in (('size', '976773168\n'), ('rotational', '0\n')):
+                path = os.path.join(tmp, name)
+                with open(path, 'w') as f:
+                    f.write(content)
+                paths.append(path)
+            paths.insert(1, os.path.join(tmp, 'missing'))
+
+            self.assertEqual(['976773168\n', None, '0\n'], read_files(paths))
+
+
+class TestFilesystemRoot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, 'proc', 'net'))
+        with open(os.path.join(self.tmp.name, 'proc', 'version'), 'w') as f:
+            f.write('Linux version 6.1.0\n')
+        with open(os.path.join(self.tmp.name, 'proc', 'net', 'dev'), 'w') as f:
+            f.write('header\nheader\n')
+
+    def tearDown(self):
+        set_root(None)
+        stop_recording()
+        self.tmp.cleanup()
+
+    def test_paths_resolved_under_root(self):
+        """
+        tests if host paths are read under the configured root and commands are disabled
+        """
+        set_root(self.tmp.name)
+
+        self.assertEqual('Linux version 6.1.0\n', read_file('/proc/version'))
+        self.assertEqual(['header\nheader\n', None], read_files(['/proc/net/dev', '/proc/missing']))
+        self.assertEqual(['header', 'header'], list(iter_lines('/proc/net/dev')))
+        self.assertIsNone(run_command(['true']))
+
+    def test_snapshot_round_trip(self):
+        """
+        tests if recorded reads are archived and can be replayed as a root
+        """
+        set_root(self.tmp.name)
+        start_recording()
+        read_file('/proc/version')
+        list(iter_lines('/proc/net/dev'))[:1]
+        recorded = stop_recording()
+        self.assertEqual({'/proc/version', '/proc/net/dev'}, set(recorded))
+
+        archive = os.path.join(self.tmp.name, 'snapshot.tar.gz')
+        self.assertEqual(2, write_snapshot(archive, recorded))
+        self.assertTrue(is_snapshot(archive))
+
+        replay = os.path.join(self.tmp.name, 'replay')
+        set_root(extract_snapshot(archive, replay))
+        self.assertEqual('Linux version 6.1.0\n', read_file('/proc/version'))
+        self.assertEqual('header\nheader\n', read_file('/proc/net/dev'))